@@ -0,0 +1,249 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+import pygame
+from constants import ASSET_MEMORY_BUDGET, BAKED_ASSETS_DIR, BAKED_INDEX_FILE, BAKED_ATLAS_FILE
+from texture_atlas import TextureAtlas
+
+
+def surface_bytes(surface):
+    """サーフェスが使っているピクセルメモリのバイト数"""
+    return surface.get_pitch() * surface.get_height()
+
+
+def to_display_format(surface):
+    """画面と同じピクセルフォーマットに変換（画面がなければそのまま）"""
+    if pygame.display.get_surface() is None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+class AssetManager:
+    """デコード済み画像を (パス, サイズ) をキーに共有するアセットマネージャ
+
+    bake_assets.py で縮小済みの画像があれば、元画像の代わりに一番近い大きさのものを読み込む。
+    """
+    # 縮小済み画像の縦横比がこの割合以上ずれていたら使わない
+    ASPECT_TOLERANCE = 0.02
+
+    def __init__(self, budget_bytes=ASSET_MEMORY_BUDGET, baked_dir=BAKED_ASSETS_DIR):
+        self.budget_bytes = budget_bytes
+        self.baked_dir = baked_dir
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.evictions = 0
+        self.baked_loads = 0
+        self._surfaces = OrderedDict()
+        # 各画像を予算に数えたバイト数（アトラスの画像をそのまま登録したものは0）
+        self._entry_bytes = {}
+        self._source_sizes = {}
+        self._baked_index = None
+        self._atlas = None
+        # アトラスの画像（画素はメモリマップ上にあるので予算には数えない）
+        self._atlas_surfaces = {}
+        # 先読みスレッドからも使うのでロックで保護
+        self._lock = threading.RLock()
+
+    def _get(self, key):
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def _put(self, key, surface, size=None):
+        """画像を登録する（size はピクセルのバイト数。省略するとサーフェスから計算）"""
+        if size is None:
+            size = surface_bytes(surface)
+        # 予算の1/4を超える大きな画像（元解像度のカード画像など）は保持しない
+        if size > self.budget_bytes // 4:
+            return surface
+
+        if self._surfaces.pop(key, None) is not None:
+            self.resident_bytes -= self._entry_bytes.pop(key)
+        self._surfaces[key] = surface
+        self._entry_bytes[key] = size
+        self.resident_bytes += size
+
+        while self.resident_bytes > self.budget_bytes and self._surfaces:
+            evicted_key, _ = self._surfaces.popitem(last=False)
+            self.resident_bytes -= self._entry_bytes.pop(evicted_key)
+            self.evictions += 1
+        return surface
+
+    def _load_source(self, path):
+        """元画像を読み込む（キャッシュ済みならデコードしない）"""
+        key = (path, None)
+        surface = self._get(key)
+        if surface is not None:
+            return surface
+
+        self.misses += 1
+        surface = to_display_format(pygame.image.load(path))
+        self.decodes += 1
+        self._source_sizes[path] = surface.get_size()
+        return self._put(key, surface)
+
+    def _load_baked_index(self):
+        """焼き込みインデックスとアトラスを読み込む（最初の1回だけ）"""
+        self._baked_index = {}
+        if not self.baked_dir:
+            return
+        index_path = os.path.join(self.baked_dir, BAKED_INDEX_FILE)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    self._baked_index = json.load(f)["entries"]
+            except Exception as e:
+                print(f"焼き込みインデックス読み込みエラー: {e}")
+        self._atlas = TextureAtlas.open(os.path.join(self.baked_dir, BAKED_ATLAS_FILE))
+
+    def _baked_entry(self, path):
+        """縮小済み画像の記録（元画像が焼き込み後に変わっていたらNone）"""
+        if self._baked_index is None:
+            self._load_baked_index()
+
+        # アトラスに入っていればそちらを優先する（ファイルを開かずデコードもしない）
+        key = os.path.normpath(path)
+        entry = self._atlas.entries.get(key) if self._atlas else None
+        if entry is None:
+            entry = self._baked_index.get(key)
+        if entry is None:
+            return None
+        try:
+            if os.stat(path).st_mtime_ns != entry["mtime_ns"]:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def _closest_baked(self, path, size):
+        """要求された大きさ以上で一番小さい縮小済み画像（縦横比が違うものは除く）"""
+        entry = self._baked_entry(path)
+        if entry is None:
+            return None
+        width, height = size
+        best = None
+        best_area = None
+        for variant in entry["variants"]:
+            variant_width, variant_height = variant["size"]
+            if variant_width < width or variant_height < height:
+                continue
+            if abs(variant_width * height - variant_height * width) > self.ASPECT_TOLERANCE * variant_height * height:
+                continue
+            area = variant_width * variant_height
+            if best_area is None or area < best_area:
+                best = variant
+                best_area = area
+        return best
+
+    def _load_baked(self, variant):
+        """縮小済み画像を読み込む（アトラスにあればメモリマップから、なければPNGから）"""
+        if "offset" in variant:
+            surface = self._atlas_surfaces.get(variant["offset"])
+            if surface is None:
+                surface = self._atlas.surface(variant)
+                self._atlas_surfaces[variant["offset"]] = surface
+            return surface
+        if not os.path.exists(variant["path"]):
+            return None
+        return self._load_source(variant["path"])
+
+    def _source_size(self, path):
+        """元画像の大きさ（焼き込み時の記録があればデコードしない）"""
+        if path not in self._source_sizes:
+            entry = self._baked_entry(path)
+            if entry is not None:
+                self._source_sizes[path] = tuple(entry["size"])
+            else:
+                self._load_source(path)
+        return self._source_sizes[path]
+
+    def load(self, path, size=None):
+        """画像を読み込む（sizeを指定するとその大きさにリサイズ）
+
+        返り値は共有されるので書き換えないこと。
+        """
+        with self._lock:
+            if size is None:
+                return self._load_source(path)
+            return self._load_scaled(path, (int(size[0]), int(size[1])))
+
+    def _load_scaled(self, path, size, source=None):
+        key = (path, size)
+        surface = self._get(key)
+        if surface is not None:
+            return surface
+
+        variant = None
+        if source is None:
+            # 縮小済み画像があれば、数メガピクセルの元画像はデコードしない
+            variant = self._closest_baked(path, size)
+            if variant is not None:
+                source = self._load_baked(variant)
+            if source is not None:
+                self.baked_loads += 1
+            else:
+                source = self._load_source(path)
+        self.misses += 1
+        if source.get_size() == size:
+            # ちょうどの大きさの画像も登録し、次からは焼き込みの記録を引かずに返す
+            # （アトラスの画像はメモリマップ上にあるので予算には数えない）
+            in_atlas = variant is not None and "offset" in variant
+            return self._put(key, source, 0 if in_atlas else None)
+        surface = to_display_format(pygame.transform.scale(source, size))
+        return self._put(key, surface)
+
+    def source_size(self, path):
+        """元画像の大きさ (幅, 高さ) を返す"""
+        with self._lock:
+            return self._source_size(path)
+
+    def load_with_height(self, path, height):
+        """縦横比を維持して指定の高さにリサイズした画像を返す"""
+        with self._lock:
+            # 縮小済み画像がなければ元画像を1回だけデコードして大きさの取得とリサイズに使う
+            source = None
+            if path not in self._source_sizes and self._baked_entry(path) is None:
+                source = self._load_source(path)
+            source_width, source_height = self._source_size(path)
+            width = int(height * source_width / source_height)
+            return self._load_scaled(path, (width, int(height)), source)
+
+    def has_baked(self, path):
+        """縮小済み画像があるか"""
+        with self._lock:
+            return self._baked_entry(path) is not None
+
+    def clear(self):
+        """保持している画像をすべて破棄"""
+        with self._lock:
+            self._surfaces.clear()
+            self._entry_bytes.clear()
+            self.resident_bytes = 0
+            # 焼き込みし直した場合に備えてインデックスとアトラスも読み直す
+            self._baked_index = None
+            self._atlas = None
+            self._atlas_surfaces.clear()
+
+    def stats(self):
+        """メモリ使用量とヒット/ミス数を返す"""
+        return {
+            "resident_bytes": self.resident_bytes,
+            "budget_bytes": self.budget_bytes,
+            "entries": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "decodes": self.decodes,
+            "evictions": self.evictions,
+            "baked_loads": self.baked_loads,
+        }
+
+
+# プロセス全体で共有するアセットマネージャ
+assets = AssetManager()
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+from constants import DEFAULT_SCREEN_HEIGHT, BAKED_ASSETS_DIR, BAKED_INDEX_FILE, BAKED_ATLAS_FILE
+from texture_atlas import build_atlas
+from utils import load_card_images, load_pack_images
+
+
+# 焼き込む画面スケール（400x300〜1600x1200のウィンドウに相当）
+DEFAULT_SCALES = (0.5, 0.75, 1.0, 1.5, 2.0)
+INDEX_VERSION = 1
+
+
+class UndecodableImage(Exception):
+    """元画像をデコードできない（壊れている）ときの例外
+
+    書き出しの失敗などと区別するため、pygame.image.load の失敗だけをこの例外にする。
+    """
+
+
+# ゲームが実際に使う大きさ（source_sizeは元画像の (幅, 高さ)）
+def pack_field_size(source_size, scale):
+    """射撃シーンのパック（高さ80、縦横比は元画像のまま）"""
+    height = int(80 * scale)
+    return int(height * source_size[0] / source_size[1]), height
+
+
+def pack_opening_size(source_size, scale):
+    """開封シーンのパック"""
+    return int(200 * scale), int(280 * scale)
+
+
+def card_size(source_size, scale):
+    """パックから出てくるカード（画面の高さの35%）"""
+    height = int(DEFAULT_SCREEN_HEIGHT * scale * 0.35)
+    return int(height * 2 / 3), height
+
+
+def collection_size(source_size, scale):
+    """獲得カード一覧の最小サイズの縮小画像"""
+    height = int(60 * scale)
+    return int(height * 2 / 3), height
+
+
+CARD_ROLES = (card_size, collection_size)
+PACK_ROLES = (pack_field_size, pack_opening_size)
+
+
+def collect_sources():
+    """焼き込み対象の画像と、その画像に必要な大きさの種類を返す"""
+    sources = [(path, CARD_ROLES) for path in load_card_images()]
+    back_image_path = os.path.join("images", "card_ura.jpg")
+    if os.path.exists(back_image_path):
+        sources.append((back_image_path, (card_size,)))
+    sources.extend((path, PACK_ROLES) for path in load_pack_images())
+    return sources
+
+
+def baked_path(output_dir, source_path, size):
+    """焼き込み画像の出力先 baked/images/xxx_140x210.png"""
+    source_path = os.path.normpath(source_path)
+    if os.path.isabs(source_path) or source_path.startswith(os.pardir):
+        # 出力先の外に書き出さないよう、絶対パスはルートからの相対パスとして扱う
+        source_path = os.path.splitdrive(os.path.abspath(source_path))[1].lstrip(os.sep)
+    stem = os.path.splitext(source_path)[0]
+    return os.path.join(output_dir, f"{stem}_{size[0]}x{size[1]}.png")
+
+
+def is_up_to_date(output_path, source_mtime_ns):
+    """出力が元画像より新しければ作り直さない"""
+    try:
+        return os.stat(output_path).st_mtime_ns >= source_mtime_ns
+    except OSError:
+        return False
+
+
+def plan_sizes(source_size, roles, scales):
+    """書き出す大きさの一覧（同じ大きさは1回だけ。元画像より大きくはしない）"""
+    sizes = []
+    for scale in scales:
+        for role in roles:
+            size = role(source_size, scale)
+            if size[0] <= 0 or size[1] <= 0 or size[0] > source_size[0] or size[1] > source_size[1]:
+                continue
+            if size not in sizes:
+                sizes.append(size)
+    return sizes
+
+
+def bake_one(source_path, roles, scales, output_dir, force=False):
+    """1枚の元画像から必要な大きさの画像をすべて書き出す（ワーカープロセスで実行）
+
+    返り値は (インデックスの項目, 書き出した枚数)。
+    """
+    mtime_ns = os.stat(source_path).st_mtime_ns
+    try:
+        source = pygame.image.load(source_path)
+    except (pygame.error, ValueError) as e:
+        raise UndecodableImage(str(e)) from e
+    # smoothscaleは24/32ビットのサーフェスしか扱えない
+    if source.get_bitsize() not in (24, 32):
+        converted = pygame.Surface(source.get_size(), pygame.SRCALPHA, 32)
+        converted.blit(source, (0, 0))
+        source = converted
+
+    variants = []
+    written = 0
+    for size in plan_sizes(source.get_size(), roles, scales):
+        output_path = baked_path(output_dir, source_path, size)
+        variants.append({"path": output_path, "size": list(size)})
+        if not force and is_up_to_date(output_path, mtime_ns):
+            continue
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if size == source.get_size():
+            scaled = source
+        else:
+            scaled = pygame.transform.smoothscale(source, size)
+        # 書きかけのファイルを読まれないよう、一時ファイルに書いてから置き換える
+        temp_path = output_path + ".tmp.png"
+        pygame.image.save(scaled, temp_path)
+        os.replace(temp_path, output_path)
+        written += 1
+
+    entry = {"mtime_ns": mtime_ns, "size": list(source.get_size()), "variants": variants}
+    return entry, written
+
+
+def load_index(output_dir):
+    """前回の焼き込みインデックスを読み込む"""
+    index_path = os.path.join(output_dir, BAKED_INDEX_FILE)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data["entries"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_index(output_dir, entries):
+    """焼き込みインデックスを書き出す"""
+    os.makedirs(output_dir, exist_ok=True)
+    index_path = os.path.join(output_dir, BAKED_INDEX_FILE)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "entries": entries}, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, index_path)
+
+
+def remove_missing_sources(index):
+    """元画像がなくなったものをインデックスから外し、縮小画像も消す（外した件数を返す）"""
+    missing = [key for key in index if not os.path.exists(key)]
+    for key in missing:
+        for variant in index.pop(key)["variants"]:
+            if os.path.exists(variant["path"]):
+                os.remove(variant["path"])
+    return len(missing)
+
+
+def bake_assets(scales=DEFAULT_SCALES, output_dir=BAKED_ASSETS_DIR, jobs=None, force=False, atlas=True):
+    """images/ と pack_images/ の画像をゲームで使う大きさに縮小して保存する"""
+    start = time.perf_counter()
+    old_index = load_index(output_dir)
+    new_index = {}
+    tasks = []
+    skipped = 0
+
+    for source_path, roles in collect_sources():
+        key = os.path.normpath(source_path)
+        try:
+            mtime_ns = os.stat(source_path).st_mtime_ns
+        except OSError as e:
+            print(f"読み込みエラー: {source_path} ({e})")
+            continue
+
+        # 前回から元画像が変わっておらず出力もそろっていれば、デコードせずに済ませる
+        entry = old_index.get(key)
+        if not force and entry and entry["mtime_ns"] == mtime_ns:
+            sizes = plan_sizes(tuple(entry["size"]), roles, scales)
+            paths = [baked_path(output_dir, source_path, size) for size in sizes]
+            if all(is_up_to_date(path, mtime_ns) for path in paths):
+                new_index[key] = {
+                    "mtime_ns": mtime_ns,
+                    "size": entry["size"],
+                    "variants": [{"path": path, "size": list(size)} for path, size in zip(paths, sizes)],
+                }
+                skipped += len(paths)
+                continue
+        tasks.append((key, source_path, roles))
+
+    written = 0
+    if tasks:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(bake_one, source_path, roles, scales, output_dir, force)
+                       for _, source_path, roles in tasks]
+            for (key, source_path, _), future in zip(tasks, futures):
+                try:
+                    entry, count = future.result()
+                except Exception as e:
+                    # 失敗した画像はインデックスに載せない（実行時は元画像から読み込む）
+                    print(f"焼き込みエラー: {source_path} ({e})")
+                    continue
+                new_index[key] = entry
+                written += count
+                skipped += len(entry["variants"]) - count
+                print(f"焼き込み: {source_path} ({count} 枚)")
+
+    save_index(output_dir, new_index)
+
+    # 縮小画像をアトラスにまとめる（何も変わっていなければ作り直さない）
+    atlas_path = os.path.join(output_dir, BAKED_ATLAS_FILE)
+    if atlas:
+        if written or new_index != old_index or not os.path.exists(atlas_path):
+            atlas_bytes = build_atlas(new_index, atlas_path)
+            print(f"アトラスを作成しました: {atlas_path} ({atlas_bytes / 1024 / 1024:.1f}MB)")
+    elif os.path.exists(atlas_path):
+        # 古いアトラスが残っていると、そちらが優先して使われてしまう
+        os.remove(atlas_path)
+
+    # 元画像が削除されたものの縮小画像を消す（新しいインデックスとアトラスには入っていない）
+    removed = remove_missing_sources(old_index)
+    if removed:
+        print(f"元画像がなくなった {removed} 枚分の縮小画像を削除しました")
+
+    elapsed = time.perf_counter() - start
+    print(f"完了: {len(new_index)} 枚の元画像, {written} 枚書き出し, {skipped} 枚は最新のためスキップ ({elapsed:.1f}秒)")
+    return new_index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="画像をゲームで使う大きさに事前に縮小して保存する")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="焼き込む画面スケール（カンマ区切り）")
+    parser.add_argument("--output", default=BAKED_ASSETS_DIR, help="出力先フォルダ")
+    parser.add_argument("--jobs", type=int, default=None, help="ワーカープロセス数（省略時はCPU数）")
+    parser.add_argument("--force", action="store_true", help="最新の出力も作り直す")
+    parser.add_argument("--no-atlas", action="store_true", help="アトラスファイルを作らない")
+    args = parser.parse_args(argv)
+
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    bake_assets(scales, args.output, args.jobs, args.force, not args.no_atlas)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""カードの一覧をフォルダの glob とカードカタログ（SQLite）で比較するベンチマーク
+
+カード数を増やしながら、起動時の一覧の取得、1パック分のカード選び（名前・パスの取得込み）、
+レアリティでの絞り込みにかかる時間を計測する。画像ファイルは空のファイルで代用する。
+
+使い方:
+    python benchmarks/bench_card_catalog.py --counts 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from card_catalog import CardCatalog, build_catalog
+from card_sync import MANIFEST_FILE, SyncManifest
+from constants import CARDS_PER_PACK
+from utils import load_images_from_dir
+
+RARITIES = ["C", "U", "R", "RR", "ex", "SR", "SAR", "UR"]
+
+
+def make_cards(images_dir, count, rng):
+    """空の画像ファイルと、それを記録したマニフェストを作る"""
+    manifest = SyncManifest(os.path.join(images_dir, MANIFEST_FILE))
+    for i in range(count):
+        filename = f"rare_card_{i + 1:03d}_{i}.png"
+        open(os.path.join(images_dir, filename), "wb").close()
+        manifest.set(str(i), {
+            "url": f"https://example.com/{i}.png",
+            "file": filename,
+            "name": f"Card {i}",
+            "rarity": rng.choice(RARITIES),
+            "set": f"set {i // 200}",
+            "size": 0,
+        })
+    return manifest
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=200, help="パック選び・絞り込みの繰り返し回数")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.counts:
+        images_dir = tempfile.mkdtemp(prefix="catalog_")
+        try:
+            manifest = make_cards(images_dir, count, rng)
+            start = time.perf_counter()
+            build_catalog(manifest, images_dir)
+            build_time = time.perf_counter() - start
+            catalog_path = os.path.join(images_dir, "card_catalog.db")
+
+            # 起動時の一覧の取得
+            patterns = ["rare_card_*.png", "rare_card_*.jpg", "rare_card_*.webp"]
+            glob_time = timed(lambda: load_images_from_dir(images_dir, patterns), 3)
+            open_time = timed(lambda: CardCatalog(catalog_path).close(), 3)
+
+            # 1パック分のカード選び
+            files = load_images_from_dir(images_dir, patterns)
+            catalog = CardCatalog(catalog_path)
+            glob_pick = timed(lambda: random.sample(files, CARDS_PER_PACK), args.repeat)
+            catalog_pick = timed(lambda: catalog.get_many(catalog.sample(CARDS_PER_PACK)), args.repeat)
+
+            # レアリティでの絞り込み（フォルダには情報がないので、マニフェストの全件を走査する場合と比べる）
+            cards = [manifest.get(card_id) for card_id in manifest.ids()]
+            scan_filter = timed(lambda: random.choice([c for c in cards if c["rarity"] == "SAR"]), args.repeat)
+            catalog_filter = timed(lambda: catalog.sample(1, rarity="SAR"), args.repeat)
+            catalog.close()
+
+            print(f"{count:>6} 枚: 作成 {build_time * 1000:7.1f}ms | 起動 glob {glob_time * 1000:7.1f}ms "
+                  f"カタログ {open_time * 1000:7.1f}ms | パック選び glob {glob_pick * 1e6:6.1f}us "
+                  f"カタログ {catalog_pick * 1e6:6.1f}us | 絞り込み 走査 {scan_filter * 1e6:8.1f}us "
+                  f"カタログ {catalog_filter * 1e6:6.1f}us")
+        finally:
+            shutil.rmtree(images_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""重複チェックの知覚ハッシュ比較を、1組ずつのループと配列演算で比較するベンチマーク
+
+画像の枚数を増やしながら、全組み合わせのハミング距離を求めて近い組を探す時間を計測する。
+1組ずつのループは枚数の2乗で遅くなるので、--loop-limit より多い枚数では一部の行だけ測って推定する。
+
+使い方:
+    python benchmarks/bench_dedup.py --counts 500 2000 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dedup_cards import DEFAULT_THRESHOLD, HASH_BYTES, near_pairs
+
+
+def make_hashes(count, duplicates, rng):
+    """ランダムなハッシュに、数ビットだけ違う「ほぼ同じ画像」を混ぜる"""
+    hashes = [rng.getrandbits(HASH_BYTES * 8) for _ in range(count)]
+    for _ in range(duplicates):
+        i, j = rng.sample(range(count), 2)
+        flipped = hashes[i]
+        for bit in rng.sample(range(HASH_BYTES * 8), DEFAULT_THRESHOLD // 2):
+            flipped ^= 1 << bit
+        hashes[j] = flipped
+    return [value.to_bytes(HASH_BYTES, "big") for value in hashes]
+
+
+def loop_pairs(hashes, threshold, rows=None):
+    """1組ずつ比べる（rows を指定すると先頭の rows 行だけ）"""
+    values = [int.from_bytes(value, "big") for value in hashes]
+    pairs = []
+    for i in range(rows if rows is not None else len(values)):
+        for j in range(i + 1, len(values)):
+            if (values[i] ^ values[j]).bit_count() <= threshold:
+                pairs.append((i, j))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--duplicates", type=int, default=20, help="混ぜるほぼ同じ画像の組数")
+    parser.add_argument("--loop-limit", type=int, default=2000, help="ループで全組み合わせを測る最大枚数")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.counts:
+        hashes = make_hashes(count, args.duplicates, rng)
+
+        start = time.perf_counter()
+        found = near_pairs(hashes, DEFAULT_THRESHOLD)
+        vector_time = time.perf_counter() - start
+
+        if count <= args.loop_limit:
+            start = time.perf_counter()
+            expected = loop_pairs(hashes, DEFAULT_THRESHOLD)
+            loop_time = time.perf_counter() - start
+            check = "一致" if sorted(found) == sorted(expected) else "不一致"
+        else:
+            # 先頭の行ほど比べる相手が多いので、比べた組数の割合で全体を推定する
+            rows = max(1, args.loop_limit * args.loop_limit // (2 * count))
+            start = time.perf_counter()
+            loop_pairs(hashes, DEFAULT_THRESHOLD, rows)
+            compared = sum(count - 1 - i for i in range(rows))
+            loop_time = (time.perf_counter() - start) * (count * (count - 1) / 2) / compared
+            check = "推定"
+
+        print(f"{count:>6} 枚: ループ {loop_time:8.3f}秒 ({check})  配列演算 {vector_time:8.3f}秒  "
+              f"{loop_time / vector_time:6.1f}倍  近い組 {len(found)}")
+
+
+if __name__ == "__main__":
+    main()
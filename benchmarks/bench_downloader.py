@@ -0,0 +1,93 @@
+"""カード画像のダウンロードを、ローカルの偽サーバー相手に計測するベンチマーク
+
+以前と同じ「1枚ずつ + 0.3秒待ち」に相当する設定と、並列ダウンロードを比べる。
+偽サーバーは応答に遅延を入れ、一部のリクエストに 503 を返すので、再試行も確認できる。
+続けて、同じフォルダへの2回目の同期（変更なし）と、カードの差し替え・削除後の同期も計測する。
+--bake をつけると、ダウンロードと並行した縮小（card_pipeline.py）も含めて計測する
+（縮小画像は一時フォルダに書き出す）。
+
+使い方:
+    python benchmarks/bench_downloader.py --cards 200 --latency 0.05 --fail-rate 0.05
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_card_server import start_server
+from scrape_cards import scrape_card_images_from_json
+
+
+def run(server, workers, rate, quiet, images_dir=None, bake=False):
+    keep = images_dir is not None
+    images_dir = images_dir or tempfile.mkdtemp(prefix="cards_")
+    try:
+        start = time.perf_counter()
+        output = io.StringIO() if quiet else sys.stdout
+        with contextlib.redirect_stdout(output):
+            downloaded = scrape_card_images_from_json(server.catalog_url, images_dir, workers, rate, bake=bake)
+        return downloaded, time.perf_counter() - start
+    finally:
+        if not keep:
+            shutil.rmtree(images_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200, help="カタログのカード数（約半分がexカード）")
+    parser.add_argument("--latency", type=float, default=0.05, help="偽サーバーの応答遅延（秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="偽サーバーが503を返す割合")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0, help="1秒あたりの最大リクエスト数（0で無制限）")
+    parser.add_argument("--skip-sequential", action="store_true", help="1枚ずつの計測を省く")
+    parser.add_argument("--bake", action="store_true", help="ダウンロードと並行した縮小も行う")
+    parser.add_argument("--verbose", action="store_true", help="ダウンロードの出力を表示する")
+    args = parser.parse_args()
+
+    if args.bake:
+        # 縮小画像（baked/）はカレントディレクトリに書き出されるので、一時フォルダで実行する
+        os.chdir(tempfile.mkdtemp(prefix="bake_"))
+
+    server = start_server(args.cards, latency=args.latency, fail_rate=args.fail_rate)
+    configs = [("並列", args.workers, args.rate)]
+    if not args.skip_sequential:
+        # 以前の実装（1枚ずつ、0.3秒待ち）に相当
+        configs.insert(0, ("1枚ずつ", 1, 1 / 0.3))
+
+    for label, workers, rate in configs:
+        requests_before = server.requests
+        downloaded, elapsed = run(server, workers, rate, not args.verbose, bake=args.bake)
+        print(f"{label:>6}: workers={workers:<3} rate={rate:5.1f}/秒  {downloaded} 枚  {elapsed:6.2f}秒  "
+              f"リクエスト {server.requests - requests_before}")
+
+    # 差分同期: 同じフォルダに対して、変更なし・一部変更ありで同期し直す
+    images_dir = tempfile.mkdtemp(prefix="cards_")
+    try:
+        steps = [("初回", None), ("変更なし", None), ("差し替え5・削除3", "change")]
+        for label, action in steps:
+            if action == "change":
+                ids = server.ex_card_ids()
+                for card_id in ids[:5]:
+                    server.update_card(card_id)
+                for card_id in ids[-3:]:
+                    server.remove_card(card_id)
+            requests_before = server.requests
+            downloaded, elapsed = run(server, args.workers, args.rate, not args.verbose, images_dir, args.bake)
+            files = len([name for name in os.listdir(images_dir) if name.startswith("rare_card_")])
+            print(f"同期({label}): {downloaded} 枚ダウンロード  {elapsed:6.2f}秒  "
+                  f"リクエスト {server.requests - requests_before}  ファイル {files} 枚")
+    finally:
+        shutil.rmtree(images_dir, ignore_errors=True)
+
+    print(f"503を返した回数: {server.failures}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""HUD文字列の描画速度を font.render・テキストキャッシュ・グリフアトラスで比較するベンチマーク
+
+最後の列は GlyphAtlasCache.draw_text（ゲームが使う経路。速い方を選ぶ）。
+
+使い方:
+    python benchmarks/bench_glyph_atlas.py --iterations 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+
+from constants import DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT, WHITE
+from font_cache import TextCache, font_cache
+from glyph_atlas import GlyphAtlasCache
+
+
+def hud_strings(iterations):
+    """毎フレーム変化するHUD文字列を生成"""
+    for i in range(iterations):
+        remaining = 45 - i / 60
+        yield f"のこりじかん: {remaining:.1f}びょう"
+        yield f"のこりのたま: {i % 11}"
+        yield f"ゲットしたパック: {i % 11}/10"
+
+
+def bench_font_render(screen, font, iterations):
+    start = time.perf_counter()
+    for text in hud_strings(iterations):
+        screen.blit(font.render(text, True, WHITE), (10, 10))
+    return time.perf_counter() - start
+
+
+def bench_text_cache(screen, font, iterations):
+    cache = TextCache()
+    start = time.perf_counter()
+    for text in hud_strings(iterations):
+        screen.blit(cache.render(font, text, WHITE), (10, 10))
+    return time.perf_counter() - start
+
+
+def bench_atlas(screen, font, iterations):
+    """常にアトラスで描く"""
+    atlas = GlyphAtlasCache().get(font, WHITE)
+    start = time.perf_counter()
+    for text in hud_strings(iterations):
+        parts = atlas.split_text(text)
+        if parts is not None:
+            atlas.draw_parts(screen, parts, (10, 10))
+        else:
+            screen.blit(font.render(text, True, WHITE), (10, 10))
+    return time.perf_counter() - start
+
+
+def bench_draw_text(screen, font, iterations):
+    atlases = GlyphAtlasCache()
+    start = time.perf_counter()
+    for text in hud_strings(iterations):
+        atlases.draw_text(screen, font, text, WHITE, (10, 10))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--font", default=None, help="フォントファイル（省略時は日本語フォントを自動検出）")
+    parser.add_argument("--scales", type=float, nargs="+", default=[0.5, 1.0, 1.5, 2.0, 3.0])
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+
+    print(f"{'scale':>6} {'size':>5} {'font.render':>14} {'text cache':>14} {'atlas':>14} {'draw_text':>14}")
+    for scale in args.scales:
+        # Game._get_scale と同じ計算で画面サイズを決める
+        width = int(DEFAULT_SCREEN_WIDTH * scale)
+        height = int(DEFAULT_SCREEN_HEIGHT * scale)
+        screen = pygame.display.set_mode((width, height))
+        font = font_cache.get(int(22 * scale), args.font)
+
+        count = args.iterations * 3
+        times = [bench(screen, font, args.iterations) / count * 1e6
+                 for bench in (bench_font_render, bench_text_cache, bench_atlas, bench_draw_text)]
+        print(f"{scale:>6.2f} {int(22 * scale):>5} " + " ".join(f"{t:>11.2f} us" for t in times))
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""「ゲット！」エフェクトの更新・描画時間を、以前の実装とプール＋焼き込み済みフレームで比較するベンチマーク
+
+同時に出ているエフェクトの数を変えながら、その数を保つように出し続けたときの
+1フレームあたりの更新＋描画時間と、計測中のメモリ使用量の最大の増え方（tracemalloc）を比べる。
+以前の実装は、エフェクトごとにフォントを取り、毎フレーム文字列を取り出して set_alpha し、
+終わったものはリストのコピーを回しながら list.remove で消す。
+
+使い方:
+    python benchmarks/bench_hit_effects.py --counts 10 100 1000 --frames 600
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+
+from constants import DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT, YELLOW
+from hit_effect import HitEffect, HitEffectPool
+from utils import get_japanese_font, render_text
+
+
+class LegacyHitEffect:
+    """以前の HitEffect（毎フレーム文字列を取り出して set_alpha する）"""
+    def __init__(self, x, y, scale=1.0):
+        self.x = x
+        self.y = y
+        self.prev_y = y
+        self.scale = scale
+        self.lifetime = HitEffect.LIFETIME
+        self.age = 0
+        self.font = get_japanese_font(int(48 * scale))
+        self.active = True
+
+    def update(self):
+        self.age += 1
+        self.prev_y = self.y
+        self.y -= 2 * self.scale
+        if self.age >= self.lifetime:
+            self.active = False
+
+    def draw(self, screen, alpha=1.0):
+        if not self.active:
+            return
+        opacity = max(0, 255 - int(255 * self.age / self.lifetime))
+        text_surface = render_text(self.font, "ゲット！", YELLOW)
+        text_surface.set_alpha(opacity)
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        screen.blit(text_surface, text_surface.get_rect(center=(self.x, y)))
+
+
+def spawn_position(i):
+    return (37 * i) % DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT - (53 * i) % (DEFAULT_SCREEN_HEIGHT // 2)
+
+
+def run_legacy(screen, effects, count, frames):
+    spawn_every = max(1, HitEffect.LIFETIME // count)
+    per_frame = max(1, count // HitEffect.LIFETIME)
+    i = 0
+    for frame in range(frames):
+        if frame % spawn_every == 0 and len(effects) < count:
+            for _ in range(per_frame):
+                effects.append(LegacyHitEffect(*spawn_position(i)))
+                i += 1
+        for effect in effects[:]:
+            effect.update()
+            if not effect.active:
+                effects.remove(effect)
+        for effect in effects:
+            effect.draw(screen, 0.5)
+
+
+def run_pool(screen, pool, count, frames):
+    spawn_every = max(1, HitEffect.LIFETIME // count)
+    per_frame = max(1, count // HitEffect.LIFETIME)
+    i = 0
+    for frame in range(frames):
+        if frame % spawn_every == 0:
+            for _ in range(per_frame):
+                pool.spawn(*spawn_position(i))
+                i += 1
+        pool.update()
+        pool.draw(screen, 0.5)
+
+
+def measure(function, effects, screen, count, frames):
+    """(1フレームあたりの時間, 計測中のメモリ使用量の最大の増え方)"""
+    function(screen, effects, count, HitEffect.LIFETIME * 2)  # 文字列・フレーム画像を用意し、同時数を満たしておく
+    start = time.perf_counter()
+    function(screen, effects, count, frames)
+    elapsed = (time.perf_counter() - start) / frames
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    function(screen, effects, count, frames)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000], help="同時に出すエフェクトの数")
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT))
+    for count in args.counts:
+        legacy_time, legacy_bytes = measure(run_legacy, [], screen, count, args.frames)
+        pool_time, pool_bytes = measure(run_pool, HitEffectPool(count), screen, count, args.frames)
+        print(f"同時 {count:>5} 個: 以前 {legacy_time * 1000:7.3f}ms/フレーム (メモリ最大 +{legacy_bytes / 1024:7.1f}KB) | "
+              f"プール {pool_time * 1000:7.3f}ms/フレーム (メモリ最大 +{pool_bytes / 1024:7.1f}KB) "
+              f"({legacy_time / pool_time:4.1f}倍)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""パック画像のグラデーションを、図形を1本ずつ描く方法と配列演算で比較するベンチマーク
+
+画像の大きさを変えながら、縦のグラデーション（1行ずつ draw.line）と円形のグラデーション
+（1画素ずつ半径を変えた draw.circle）を、generate_pack_images.py の配列演算と比べる。
+最後に1枚あたりの生成時間（描画・PNG保存）も計測する。
+
+使い方:
+    python benchmarks/bench_pack_art.py --sizes 200x280 400x560 800x1120
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+
+from generate_pack_images import linear_gradient, pack_design, radial_gradient, render_pack
+
+COLOR = (200, 50, 30)
+
+
+def loop_linear(width, height, color, darken=0.3):
+    surface = pygame.Surface((width, height), 0, 24)
+    for y in range(height):
+        factor = 1 - y / height * darken
+        pygame.draw.line(surface, tuple(int(c * factor) for c in color), (0, y), (width, y))
+    return surface
+
+
+def loop_radial(width, height, color, lighten=0.3):
+    surface = pygame.Surface((width, height), 0, 24)
+    surface.fill(color)
+    max_radius = min(width, height) // 2
+    for radius in range(max_radius, 0, -1):
+        weight = (1 - radius / max_radius) * lighten
+        pygame.draw.circle(surface, tuple(int(c + (255 - c) * weight) for c in color),
+                           (width // 2, height // 2), radius)
+    return surface
+
+
+def vector_linear(width, height, color):
+    surface = pygame.Surface((width, height), 0, 24)
+    pygame.surfarray.blit_array(surface, linear_gradient(width, height, color))
+    return surface
+
+
+def vector_radial(width, height, color):
+    surface = pygame.Surface((width, height), 0, 24)
+    pygame.surfarray.blit_array(surface, radial_gradient(width, height, color))
+    return surface
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[(200, 280), (400, 560), (800, 1120)])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for width, height in args.sizes:
+        times = [timed(lambda f=f: f(width, height, COLOR), args.repeat)
+                 for f in (loop_linear, vector_linear, loop_radial, vector_radial)]
+        print(f"{width:>4}x{height:<5}: 縦 ループ {times[0] * 1000:7.2f}ms 配列演算 {times[1] * 1000:6.2f}ms | "
+              f"円形 ループ {times[2] * 1000:7.2f}ms 配列演算 {times[3] * 1000:6.2f}ms "
+              f"({times[2] / times[3]:5.1f}倍)")
+
+    # 1枚あたりの生成時間（描画とPNG保存）
+    output_dir = tempfile.mkdtemp(prefix="pack_art_")
+    path = os.path.join(output_dir, "pack.png")
+    designs = [pack_design(0, index) for index in range(args.repeat)]
+    for width, height in args.sizes:
+        start = time.perf_counter()
+        surfaces = [render_pack(design, (width, height)) for design in designs]
+        render_time = (time.perf_counter() - start) / len(designs)
+        save_time = timed(lambda: pygame.image.save(surfaces[0], path), args.repeat)
+        print(f"{width:>4}x{height:<5}: 1枚 描画 {render_time * 1000:6.2f}ms 保存 {save_time * 1000:6.2f}ms")
+    os.remove(path)
+    os.rmdir(output_dir)
+
+
+if __name__ == "__main__":
+    main()
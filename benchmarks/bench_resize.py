@@ -0,0 +1,160 @@
+"""ウィンドウサイズ変更の処理時間を、作り直す方法と大きさを合わせる方法で比較するベンチマーク
+
+SDLのdummyビデオドライバ上で、ウィンドウの端をドラッグしたときのように VIDEORESIZE を
+1フレームに1回ずつ送り、以前の処理（毎回パックを作り直し、画像を選び直す）と、
+毎回今のパックの大きさだけを合わせる処理、イベントをまとめてから1回だけ合わせる処理の
+合計時間と最悪フレームを計測する。
+
+使い方:
+    python benchmarks/bench_resize.py --events 60 --packs 10 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+
+import pygame
+
+from constants import RESIZE_DEBOUNCE_MS, STATE_PACK_OPENING, STATE_SHOOTING
+from font_cache import text_cache
+from glyph_atlas import glyph_atlases
+from utils import get_japanese_font
+
+
+def rebuild_resize(game, width, height):
+    """以前の VIDEORESIZE の処理（パックを作り直し、開封中のパック画像も選び直す）"""
+    old_scale = game._get_scale()
+    game.screen_width = width
+    game.screen_height = height
+    game.screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+    scale = game._get_scale()
+    if scale != old_scale:
+        text_cache.clear()
+        glyph_atlases.clear()
+    if game.dirty_renderer:
+        game.dirty_renderer.invalidate()
+    game.crosshair.update_screen_size(width, height)
+    game.card_packs.clear()
+    game._setup_card_packs()
+    opening = game.pack_opening
+    if opening:
+        opening.screen_width = width
+        opening.screen_height = height
+        opening.pack_width = int(200 * scale)
+        opening.pack_height = int(280 * scale)
+        opening.pack_x = width // 2 - opening.pack_width // 2
+        opening.pack_y = height // 2 - opening.pack_height // 2
+        opening.pack_image = opening._load_random_pack_image()
+        opening.card_width = int(80 * scale)
+        opening.card_height = int(120 * scale)
+        opening.font = get_japanese_font(int(28 * scale))
+        opening.small_font = get_japanese_font(int(18 * scale))
+
+
+def drag_sizes(count):
+    """800x600 から 1400x1000 までドラッグしたときのサイズの並び"""
+    return [(800 + 600 * i // count, 600 + 400 * i // count) for i in range(1, count + 1)]
+
+
+def make_game(pack_count, state):
+    from game import Game
+    from pack_opening import PackOpening
+
+    game = Game(pack_count=pack_count)
+    game._finish_startup(wait=True)
+    game.state = state
+    if state == STATE_PACK_OPENING:
+        game.pack_opening = PackOpening(3, game.screen_width, game.screen_height, game.card_image_files,
+                                        game.pack_image_files, game.card_catalog)
+    # 半分を破壊しておく（大きさを合わせても残ることを確かめる）
+    for pack in game.card_packs[::2]:
+        pack.destroy()
+    game._rebuild_pack_index()
+    return game
+
+
+def pack_state(game):
+    return [(pack.destroyed, pack.pack_image_path if not game.swarm else
+             game.swarm.image_paths[game.swarm.image_index[pack.index]]) for pack in game.card_packs]
+
+
+def measure_rebuild(game, sizes):
+    times = []
+    for width, height in sizes:
+        start = time.perf_counter()
+        rebuild_resize(game, width, height)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure_inplace(game, sizes):
+    """まとめずに毎回大きさだけを合わせる"""
+    times = []
+    for width, height in sizes:
+        start = time.perf_counter()
+        game.resize(width, height)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure_debounced(game, sizes):
+    """1フレームに1回 VIDEORESIZE を送り、最後に待ち時間が過ぎてから反映させる"""
+    times = []
+    pygame.event.clear()
+    for width, height in sizes:
+        pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, w=width, h=height, size=(width, height)))
+        start = time.perf_counter()
+        game.handle_events()
+        times.append(time.perf_counter() - start)
+    # 待ち時間はシミュレーション時間で数えるので、その分ゲームを進める
+    game.step(RESIZE_DEBOUNCE_MS + game.sim_clock.step_ms)
+    start = time.perf_counter()
+    game.handle_events()
+    times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label, times):
+    print(f"  {label:<8}: 合計 {sum(times) * 1000:8.1f}ms  最悪フレーム {max(times) * 1000:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=60, help="ドラッグ中に届く VIDEORESIZE の数")
+    parser.add_argument("--packs", type=int, nargs="+", default=[10, 2000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)
+    pygame.init()
+    sizes = drag_sizes(args.events)
+    for pack_count in args.packs:
+        for state in (STATE_SHOOTING, STATE_PACK_OPENING):
+            print(f"パック {pack_count} 個, {state}:")
+            random.seed(args.seed)
+            game = make_game(pack_count, state)
+            report("作り直し", measure_rebuild(game, sizes))
+
+            random.seed(args.seed)
+            game = make_game(pack_count, state)
+            report("毎回合わせる", measure_inplace(game, sizes))
+
+            random.seed(args.seed)
+            game = make_game(pack_count, state)
+            before = pack_state(game)
+            pack_path = game.pack_opening.pack_path if game.pack_opening else None
+            report("まとめて反映", measure_debounced(game, sizes))
+            kept = pack_state(game) == before and (not game.pack_opening or game.pack_opening.pack_path == pack_path)
+            print(f"  画面 {game.screen_width}x{game.screen_height}, パックの状態と画像を保持: {'はい' if kept else 'いいえ'}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
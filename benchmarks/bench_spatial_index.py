@@ -0,0 +1,102 @@
+"""照準のヒット判定を線形探索と一様グリッドで比較するベンチマーク
+
+パック数を 10 から 10,000 まで増やし、1回の検索時間と、
+毎ステップの位置更新（グリッドの登録し直し）にかかる時間を計測する。
+
+使い方:
+    python benchmarks/bench_spatial_index.py --counts 10 100 1000 10000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+
+from card_pack import CardPack
+from spatial_index import UniformGrid
+
+
+def make_packs(count, rng):
+    """パックを count 個、密度が一定になる広さの領域に並べる"""
+    side = int(math.sqrt(count) * 150) + 200
+    packs = []
+    for _ in range(count):
+        pack = CardPack(rng.uniform(0, side), rng.uniform(0, side))
+        packs.append(pack)
+    return packs, side
+
+
+def linear_query(packs, rect):
+    for pack in packs:
+        if not pack.destroyed and rect.colliderect(pack.get_rect()):
+            return pack
+    return None
+
+
+def grid_query(grid, rect):
+    for pack in grid.query(rect):
+        if rect.colliderect(pack.get_rect()):
+            return pack
+    return None
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'packs':>7} {'linear query':>14} {'grid query':>12} {'speedup':>8} {'grid update/step':>18}")
+    for count in args.counts:
+        rng = random.Random(args.seed)
+        random.seed(args.seed)
+        packs, side = make_packs(count, rng)
+
+        grid = UniformGrid(120)
+        for pack in packs:
+            grid.insert(pack, pack.get_rect())
+
+        # 照準と同じ大きさの矩形でランダムな位置を検索
+        rects = [pygame.Rect(rng.uniform(0, side), rng.uniform(0, side), 20, 20) for _ in range(args.queries)]
+        for rect in rects[:10]:
+            assert linear_query(packs, rect) is grid_query(grid, rect)
+
+        start = time.perf_counter()
+        for rect in rects:
+            linear_query(packs, rect)
+        linear_time = (time.perf_counter() - start) / len(rects)
+
+        start = time.perf_counter()
+        for rect in rects:
+            grid_query(grid, rect)
+        grid_time = (time.perf_counter() - start) / len(rects)
+
+        def step():
+            for pack in packs:
+                pack.update()
+                grid.update(pack, pack.get_rect())
+        update_time = timed(step, max(1, 2000 // count))
+
+        print(f"{count:>7} {linear_time * 1e6:>11.2f} us {grid_time * 1e6:>9.2f} us "
+              f"{linear_time / grid_time:>7.1f}x {update_time * 1e3:>15.3f} ms")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
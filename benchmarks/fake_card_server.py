@@ -0,0 +1,194 @@
+"""ダウンローダーの動作確認用のローカルHTTPサーバー
+
+本物と同じ形の pokemon_card.json と、カードごとに違う模様のPNG画像を返す。
+応答の遅延と、一定の割合で 503 を返す設定があるので、並列化や再試行の確認に使える。
+画像には ETag/Last-Modified を付け、条件付きGETには 304 を返す。
+update_card / remove_card でカードの差し替えや削除も再現できる。
+duplicate_ratio を指定すると、一部のカードがほかのカードと同じ画像（半分は同じファイル、
+半分は大きさ違い）を返すので、重複チェック（dedup_cards.py）の確認に使える。
+
+使い方:
+    python benchmarks/fake_card_server.py --cards 300 --latency 0.05 --fail-rate 0.05
+    python scrape_cards.py --catalog-url http://127.0.0.1:8765/pokemon_card.json --images-dir /tmp/images
+"""
+import argparse
+import email.utils
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_png(width, height, seed, blocks=(12, 16)):
+    """seed ごとに違う色のブロックを並べたPNG画像のバイト列を作る（大きさが違っても同じ模様）"""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    rng = random.Random(seed)
+    columns, rows = blocks
+    colors = [[bytes(rng.randrange(256) for _ in range(3)) for _ in range(columns)] for _ in range(rows)]
+    pixels = []
+    for y in range(height):
+        block_row = colors[y * rows // height]
+        pixels.append(b"\0" + b"".join(block_row[x * columns // width] for x in range(width)))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(pixels))) + chunk(b"IEND", b""))
+
+
+def make_catalog(cards, host, ex_ratio=0.5, seed=0):
+    """カード一覧JSON（カテゴリごとに db_data を持つ入れ子の構造）を作る"""
+    rng = random.Random(seed)
+    categories = []
+    for category_id in range(0, cards, 50):
+        db_data = []
+        for card_id in range(category_id + 1, min(cards, category_id + 50) + 1):
+            db_data.append({
+                "id": card_id,
+                "title": f"Card {card_id}",
+                "col_19": "ex" if rng.random() < ex_ratio else "C",
+                "image_url": f"http://{host}/img/show/{card_id}.png",
+            })
+        categories.append({"name": f"category {category_id // 50}", "db_data": db_data})
+    return categories
+
+
+class FakeCardServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, cards=100, image_size=(300, 420), latency=0.0, fail_rate=0.0, seed=0,
+                 duplicate_ratio=0.0):
+        super().__init__(address, FakeCardHandler)
+        self.host = f"{self.server_address[0]}:{self.server_address[1]}"
+        self.categories = make_catalog(cards, self.host, seed=seed)
+        # カードID -> (同じ画像を使う元のカードID, 大きさの倍率)
+        self.duplicates = {}
+        rng = random.Random(seed + 1)
+        for card_id in range(2, cards + 1):
+            if rng.random() < duplicate_ratio:
+                self.duplicates[card_id] = (rng.randrange(1, card_id), rng.choice((1.0, 0.75)))
+        self.catalog = json.dumps(self.categories).encode("utf-8")
+        # カードID -> 画像の版（差し替えるたびに増える）と更新時刻
+        self.versions = {}
+        self.started = time.time()
+        self.image_size = image_size
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def catalog_url(self):
+        return f"http://{self.host}/pokemon_card.json"
+
+    def ex_card_ids(self):
+        """exカードのIDの一覧"""
+        return [card["id"] for category in self.categories for card in category["db_data"]
+                if card["col_19"] == "ex"]
+
+    def update_card(self, card_id):
+        """カード画像を差し替える（ETagが変わる）"""
+        with self._lock:
+            version, _ = self.versions.get(card_id, (0, self.started))
+            self.versions[card_id] = (version + 1, time.time())
+
+    def remove_card(self, card_id):
+        """カードをカタログから削除する"""
+        with self._lock:
+            for category in self.categories:
+                category["db_data"] = [card for card in category["db_data"] if card["id"] != card_id]
+            self.catalog = json.dumps(self.categories).encode("utf-8")
+
+    def image_version(self, card_id):
+        with self._lock:
+            return self.versions.get(card_id, (0, self.started))
+
+
+class FakeCardHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/octet-stream", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            server.requests += 1
+            fail = server.rng.random() < server.fail_rate
+            if fail:
+                server.failures += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if fail:
+            self._send(503, b"busy", "text/plain")
+            return
+
+        if self.path == "/pokemon_card.json":
+            with server._lock:
+                catalog = server.catalog
+            etag = '"%08x"' % zlib.crc32(catalog)
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, headers={"ETag": etag})
+                return
+            self._send(200, catalog, "application/json", {"ETag": etag})
+        elif self.path.startswith("/img/original/") and self.path.endswith(".png"):
+            card_id = int(self.path.rsplit("/", 1)[1][:-4])
+            version, modified = server.image_version(card_id)
+            headers = {
+                "ETag": f'"{card_id}-{version}"',
+                "Last-Modified": email.utils.formatdate(modified, usegmt=True),
+            }
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                self._send(304, headers=headers)
+                return
+            source_id, scale = server.duplicates.get(card_id, (card_id, 1.0))
+            width, height = (int(side * scale) for side in server.image_size)
+            body = make_png(width, height, source_id * 1000 + server.image_version(source_id)[0])
+            self._send(200, body, "image/png", headers)
+        else:
+            self._send(404, b"not found", "text/plain")
+
+
+def start_server(cards=100, port=0, **kwargs):
+    """バックグラウンドスレッドでサーバーを起動して返す"""
+    server = FakeCardServer(("127.0.0.1", port), cards, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cards", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="1リクエストごとの遅延（秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503を返す割合")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0, help="ほかのカードと同じ画像を返すカードの割合")
+    args = parser.parse_args()
+
+    server = FakeCardServer(("127.0.0.1", args.port), args.cards, latency=args.latency, fail_rate=args.fail_rate,
+                            duplicate_ratio=args.duplicate_ratio)
+    print(f"カタログ: {server.catalog_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
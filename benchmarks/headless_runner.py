@@ -0,0 +1,310 @@
+"""画面なしでGameを決まった入力で動かし、フレーム時間を計測するベンチマーク
+
+SDLのdummyビデオドライバ上で、乱数シードと入力スクリプトを固定して
+スタート → 射撃 → パック開封 → カード一覧 を繰り返し、
+状態ごと・処理（handle_events / update / draw）ごとのフレーム時間をJSONに書き出す。
+
+使い方:
+    python benchmarks/headless_runner.py --frames 3000 --seed 1 --output bench.json
+    python benchmarks/headless_runner.py --compare bench.json   # 前回結果と比較
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+
+import pygame
+
+from constants import (
+    SIMULATION_HZ, CARD_PACKS_COUNT,
+    STATE_START, STATE_SHOOTING, STATE_PACK_OPENING,
+    STATE_CARD_COLLECTION, STATE_RESULT
+)
+
+PHASES = ["handle_events", "update", "draw"]
+
+
+class KeyState:
+    """pygame.key.get_pressed() の代わりに使うキー状態"""
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+def click_event(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+
+class InputScript:
+    """状態ごとの入力スクリプト（そのフレームのイベントと押しっぱなしのキーを返す）"""
+    def __init__(self, start_wait=10, fire_interval=8, collection_wait=30):
+        self.start_wait = start_wait
+        self.fire_interval = fire_interval
+        self.collection_wait = collection_wait
+
+    def __call__(self, game, frames_in_state):
+        handler = {
+            STATE_START: self._start,
+            STATE_SHOOTING: self._shooting,
+            STATE_PACK_OPENING: self._pack_opening,
+            STATE_CARD_COLLECTION: self._card_collection,
+        }.get(game.state)
+        if handler is None:
+            return [], KeyState()
+        return handler(game, frames_in_state)
+
+    def _start(self, game, frames_in_state):
+        if frames_in_state == self.start_wait:
+            return [key_event(pygame.K_SPACE)], KeyState()
+        return [], KeyState()
+
+    def _shooting(self, game, frames_in_state):
+        """一番近い残っているパックへ照準を動かし、一定間隔でうつ"""
+        crosshair = game.crosshair
+        targets = [pack for pack in game.card_packs if not pack.destroyed]
+        if not targets:
+            return [], KeyState()
+
+        def distance(pack):
+            rect = pack.get_rect()
+            return (rect.centerx - crosshair.x) ** 2 + (rect.centery - crosshair.y) ** 2
+        target = min(targets, key=distance).get_rect()
+
+        pressed = []
+        if target.centerx < crosshair.x - crosshair.speed:
+            pressed.append(pygame.K_LEFT)
+        elif target.centerx > crosshair.x + crosshair.speed:
+            pressed.append(pygame.K_RIGHT)
+        if target.centery < crosshair.y - crosshair.speed:
+            pressed.append(pygame.K_UP)
+        elif target.centery > crosshair.y + crosshair.speed:
+            pressed.append(pygame.K_DOWN)
+
+        events = []
+        if frames_in_state % self.fire_interval == self.fire_interval - 1 and target.colliderect(crosshair.get_rect()):
+            events.append(key_event(pygame.K_SPACE))
+        return events, KeyState(pressed)
+
+    def _pack_opening(self, game, frames_in_state):
+        opening = game.pack_opening
+        if not opening.is_opened:
+            return [], KeyState([pygame.K_UP])
+
+        for card, (x, y, w, h) in zip(opening.current_cards, getattr(opening, "card_positions", [])):
+            if not card.get("flipped", False):
+                return [click_event((x + w // 2, y + h // 2))], KeyState()
+
+        if opening.all_cards_flipped() and hasattr(opening, "card_positions"):
+            return [key_event(pygame.K_SPACE)], KeyState()
+        return [], KeyState()
+
+    def _card_collection(self, game, frames_in_state):
+        if frames_in_state == self.collection_wait:
+            return [key_event(pygame.K_SPACE)], KeyState()
+        return [], KeyState()
+
+
+def make_scripted_game(frame_ms, dirty_rects, pack_count, swarm):
+    """スクリプト入力で動くGameを作る（1フレームごとにframe_msだけ時間を進める）"""
+    from game import Game
+
+    class ScriptedGame(Game):
+        def __init__(self):
+            self.scripted_keys = KeyState()
+            self.frame_ms = frame_ms
+            super().__init__(dirty_rects=dirty_rects, pack_count=pack_count, swarm=swarm)
+
+        def get_pressed_keys(self):
+            return self.scripted_keys
+
+    return ScriptedGame()
+
+
+def percentile(sorted_values, fraction):
+    """最近傍順位法のパーセンタイル"""
+    if not sorted_values:
+        return 0.0
+    # 順位は ceil(fraction * n)。0.95 * 100 が 95.00000000000001 になるような浮動小数点の誤差は丸めて消す
+    index = min(len(sorted_values) - 1, max(0, math.ceil(round(fraction * len(sorted_values), 9)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples_ns):
+    """ナノ秒のサンプル列からミリ秒の統計を作る"""
+    values = sorted(sample / 1e6 for sample in samples_ns)
+    total = sum(values)
+    return {
+        "count": len(values),
+        "mean": total / len(values) if values else 0.0,
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": values[-1] if values else 0.0,
+    }
+
+
+def run(frames, seed, width, height, frame_ms, dirty_rects, pack_count=CARD_PACKS_COUNT, swarm=None):
+    """ゲームをframesフレーム動かして計測結果を返す"""
+    random.seed(seed)
+    pygame.init()
+
+    game = make_scripted_game(frame_ms, dirty_rects, pack_count, swarm)
+    if (width, height) != (game.screen_width, game.screen_height):
+        pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, w=width, h=height, size=(width, height)))
+
+    script = InputScript()
+    samples = {}
+    state = game.state
+    frames_in_state = 0
+    started = time.perf_counter()
+
+    for _ in range(frames):
+        if game.state != state:
+            state = game.state
+            frames_in_state = 0
+        if state == STATE_RESULT:
+            # 結果画面にはキー操作がないので直接やり直す
+            game._back_to_start()
+            continue
+
+        events, game.scripted_keys = script(game, frames_in_state)
+        for event in events:
+            pygame.event.post(event)
+
+        t0 = time.perf_counter_ns()
+        game.handle_events()
+        t1 = time.perf_counter_ns()
+        game.step(game.frame_ms)
+        t2 = time.perf_counter_ns()
+        game.draw()
+        t3 = time.perf_counter_ns()
+        timings = [t1 - t0, t2 - t1, t3 - t2]
+
+        state_samples = samples.setdefault(state, {"frame": [], **{phase: [] for phase in PHASES}})
+        state_samples["frame"].append(t3 - t0)
+        for phase, elapsed in zip(PHASES, timings):
+            state_samples[phase].append(elapsed)
+
+        frames_in_state += 1
+
+    wall_time = time.perf_counter() - started
+    pygame.quit()
+
+    states = {}
+    all_frames = []
+    for state_name, state_samples in samples.items():
+        frame_samples = state_samples["frame"]
+        all_frames.extend(frame_samples)
+        busy_seconds = sum(frame_samples) / 1e9
+        states[state_name] = {
+            "frames": len(frame_samples),
+            "fps": len(frame_samples) / busy_seconds if busy_seconds else 0.0,
+            "frame_ms": summarize(frame_samples),
+            "phases": {phase: summarize(state_samples[phase]) for phase in PHASES},
+        }
+
+    busy_seconds = sum(all_frames) / 1e9
+    return {
+        "config": {
+            "frames": frames,
+            "seed": seed,
+            "width": width,
+            "height": height,
+            "frame_ms": frame_ms,
+            "dirty_rects": dirty_rects,
+            "pack_count": pack_count,
+            "swarm": game.use_swarm,
+        },
+        "total": {
+            "frames": len(all_frames),
+            "wall_seconds": wall_time,
+            "fps": len(all_frames) / busy_seconds if busy_seconds else 0.0,
+            "frame_ms": summarize(all_frames),
+        },
+        "states": states,
+    }
+
+
+def print_report(result):
+    print(f"{'state':<16} {'frames':>7} {'fps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(result["states"].items()) + [("total", result["total"])]
+    for name, stats in rows:
+        frame_ms = stats["frame_ms"]
+        print(f"{name:<16} {stats['frames']:>7} {stats['fps']:>9.1f} "
+              f"{frame_ms['p50']:>8.3f} {frame_ms['p95']:>8.3f} {frame_ms['p99']:>8.3f}")
+
+
+def compare(result, baseline, tolerance):
+    """状態ごとのp95フレーム時間を比較し、悪化した状態のリストを返す"""
+    regressions = []
+    for name, stats in result["states"].items():
+        base = baseline.get("states", {}).get(name)
+        if not base:
+            continue
+        now_p95 = stats["frame_ms"]["p95"]
+        base_p95 = base["frame_ms"]["p95"]
+        change = (now_p95 - base_p95) / base_p95 if base_p95 else 0.0
+        print(f"{name:<16} p95 {base_p95:.3f} ms -> {now_p95:.3f} ms ({change:+.1%})")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000, help="計測するフレーム数")
+    parser.add_argument("--seed", type=int, default=1, help="乱数シード")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--frame-ms", type=float, default=1000 / SIMULATION_HZ,
+                        help="1フレームで進めるゲーム内時間（ミリ秒）")
+    parser.add_argument("--dirty-rects", action="store_true", help="差分描画を有効にする")
+    parser.add_argument("--packs", type=int, default=CARD_PACKS_COUNT, help="パックの数")
+    parser.add_argument("--swarm", choices=["auto", "on", "off"], default="auto",
+                        help="NumPyのスウォームモード（autoはパック数で決める）")
+    parser.add_argument("--output", help="結果を書き出すJSONファイル")
+    parser.add_argument("--compare", help="比較する前回の結果JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="p95の悪化をこの割合まで許容する（--compare時）")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    # 画像フォルダへの相対パスを解決するためにリポジトリ直下で実行する
+    os.chdir(ROOT_DIR)
+    swarm = {"auto": None, "on": True, "off": False}[args.swarm]
+    result = run(args.frames, args.seed, args.width, args.height, args.frame_ms, args.dirty_rects,
+                 args.packs, swarm)
+    print_report(result)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"結果を保存しました: {output}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"性能が悪化しました: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from constants import CARD_CATALOG_FILE
+
+
+# カタログの形式（列を変えたら上げる）
+CATALOG_VERSION = 1
+# 名前・パスを引いたカードを覚えておく枚数
+RECORD_CACHE_SIZE = 512
+
+_SCHEMA = """
+CREATE TABLE cards (
+    num INTEGER PRIMARY KEY,
+    card_id TEXT NOT NULL,
+    rarity TEXT NOT NULL,
+    set_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE TABLE rarities (
+    rarity TEXT PRIMARY KEY,
+    first INTEGER NOT NULL,
+    last INTEGER NOT NULL
+);
+"""
+# 索引は行を入れ終わってから作る（1行ずつ索引を更新するより速い）
+_INDEXES = """
+CREATE UNIQUE INDEX cards_card_id ON cards (card_id);
+CREATE INDEX cards_rarity ON cards (rarity);
+CREATE INDEX cards_set_name ON cards (set_name);
+"""
+
+
+def build_catalog(manifest, images_dir, path=None):
+    """同期の記録（SyncManifest）からカードカタログを作り直し、収録したカード数を返す
+
+    重複としてまとめたカードは、代表のカードの画像を指す。画像がないカードは入れない。
+    行はレアリティ順に並べるので、同じレアリティのカードは番号が連続する。
+    """
+    path = path or os.path.join(images_dir, CARD_CATALOG_FILE)
+    rows = []
+    for card_id in sorted(manifest.ids()):
+        entry = manifest.get(card_id)
+        target_id = manifest.alias_of(card_id)
+        image_entry = manifest.get(target_id) if target_id else entry
+        if image_entry is None:
+            continue
+        image_path = os.path.join(images_dir, image_entry["file"])
+        if not os.path.exists(image_path):
+            continue
+        rows.append((card_id, entry.get("rarity") or "", entry.get("set") or "",
+                     entry.get("name") or "", image_path))
+    rows.sort(key=lambda row: (row[1], row[2], row[0]))
+
+    # ゲームが読んでいる途中のファイルを書き換えないよう、別のファイルに作ってから置き換える
+    temp_path = path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT INTO cards (card_id, rarity, set_name, name, path) VALUES (?, ?, ?, ?, ?)", rows)
+        # 起動時はこの小さな表だけを読めばよい
+        conn.execute("INSERT INTO rarities SELECT rarity, MIN(num), MAX(num) FROM cards GROUP BY rarity")
+        conn.executescript(_INDEXES)
+        conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(temp_path, path)
+    return len(rows)
+
+
+class CardCatalog:
+    """カードカタログ（SQLite）を引くクラス
+
+    起動時はレアリティごとの番号の範囲だけを読み込む（カードが何万枚あっても数行）。
+    名前と画像パスは、パックに入るカードが決まったときにまとめて引く。
+    """
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CATALOG_VERSION:
+            self._conn.close()
+            raise ValueError(f"カードカタログの形式が違います: {path}")
+
+        # レアリティ順に並べて作ってあるので、レアリティごとに番号は連続している
+        self.by_rarity = {}
+        for rarity, first, last in self._conn.execute("SELECT rarity, first, last FROM rarities"):
+            self.by_rarity[rarity] = range(first, last + 1)
+        count = sum(len(numbers) for numbers in self.by_rarity.values())
+        first = min((numbers.start for numbers in self.by_rarity.values()), default=1)
+        self.numbers = range(first, first + count)
+        self._by_set = {}
+        self._records = OrderedDict()
+
+    @classmethod
+    def open(cls, path):
+        """カタログを開く（なければ、または壊れていればNone）"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except Exception as e:
+            print(f"カードカタログ読み込みエラー: {e}")
+            return None
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def rarities(self):
+        """レアリティごとの枚数"""
+        return {rarity: len(numbers) for rarity, numbers in self.by_rarity.items()}
+
+    def sets(self):
+        """収録セットごとの枚数（索引だけで数える）"""
+        with self._lock:
+            rows = self._conn.execute("SELECT set_name, COUNT(*) FROM cards GROUP BY set_name").fetchall()
+        return dict(rows)
+
+    def numbers_in(self, rarity=None, set_name=None):
+        """条件に合うカードの番号の並び（range またはリスト）"""
+        if set_name is None:
+            return self.numbers if rarity is None else self.by_rarity.get(rarity, range(0))
+        key = (rarity, set_name)
+        numbers = self._by_set.get(key)
+        if numbers is None:
+            # 収録セットの索引で引いて、結果を覚えておく
+            with self._lock:
+                rows = self._conn.execute("SELECT num FROM cards WHERE set_name = ?", (set_name,)).fetchall()
+            numbers = [row[0] for row in rows]
+            if rarity is not None:
+                in_rarity = self.by_rarity.get(rarity, range(0))
+                numbers = [number for number in numbers if number in in_rarity]
+            self._by_set[key] = numbers
+        return numbers
+
+    def sample(self, count, rarity=None, set_name=None):
+        """条件に合うカードを count 枚（重複なし、足りなければあるだけ）選んで番号を返す"""
+        numbers = self.numbers_in(rarity, set_name)
+        return random.sample(numbers, min(count, len(numbers)))
+
+    def get_many(self, numbers):
+        """番号のカードの情報（id, rarity, set, name, path の辞書）を同じ順で返す"""
+        missing = [number for number in numbers if number not in self._records]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT num, card_id, rarity, set_name, name, path FROM cards WHERE num IN ({placeholders})",
+                    missing).fetchall()
+            for number, card_id, rarity, set_name, name, path in rows:
+                self._records[number] = {
+                    'id': card_id, 'rarity': rarity, 'set': set_name, 'name': name, 'path': path,
+                }
+        records = []
+        for number in numbers:
+            self._records.move_to_end(number)
+            records.append(self._records[number])
+        while len(self._records) > RECORD_CACHE_SIZE:
+            self._records.popitem(last=False)
+        return records
+
+    def get(self, number):
+        return self.get_many([number])[0]
+
+    def find(self, card_id):
+        """カタログのカードIDから引く（なければNone）"""
+        with self._lock:
+            row = self._conn.execute("SELECT num FROM cards WHERE card_id = ?", (str(card_id),)).fetchone()
+        return self.get(row[0]) if row else None
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# ブラウザのように振る舞うためのヘッダー
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# ダウンロードした本体を書き出す単位（バイト）
+CHUNK_SIZE = 64 * 1024
+
+# 再試行するHTTPステータス（混雑・一時的なサーバーエラー）
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限（スレッドセーフ）
+
+    1秒あたり rate 個のトークンが貯まり、最大 capacity 個まで連続で使える。
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取る（足りなければ貯まるまで待つ）"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DownloadProgress:
+    """ダウンロードの進捗（件数・スループット・残り時間）を1行で表示する"""
+    def __init__(self, total, interval=0.5, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._last_print = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, nbytes=0, failed=False):
+        """1件終わるごとに呼ぶ"""
+        with self._lock:
+            self.done += 1
+            self.bytes += nbytes
+            if failed:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._last_print >= self.interval or self.done == self.total:
+                self._last_print = now
+                self.stream.write("\r" + self.format_line(now))
+                if self.done == self.total:
+                    self.stream.write("\n")
+                self.stream.flush()
+
+    def format_line(self, now=None):
+        elapsed = max(1e-9, (now or time.monotonic()) - self.started)
+        rate = self.done / elapsed
+        remaining = (self.total - self.done) / rate if rate > 0 else 0
+        percent = self.done * 100 / self.total if self.total else 100
+        return (f"進捗 {self.done}/{self.total} ({percent:.0f}%) "
+                f"{rate:.1f}枚/秒 {self.bytes / elapsed / 1024 / 1024:.2f}MB/秒 "
+                f"失敗 {self.failed} 残り約 {remaining:.0f}秒   ")
+
+
+class CardDownloader:
+    """コネクションを使い回しながら、複数スレッドで画像をダウンロードするクラス"""
+    def __init__(self, workers=8, rate=8.0, burst=None, retries=3, backoff=0.5,
+                 timeout=10, headers=None, session=None):
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+
+        if session is None:
+            session = requests.Session()
+            # ワーカー数ぶんの接続を保持して使い回す（再試行は自前で行う）
+            adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        session.headers.update(headers or DEFAULT_HEADERS)
+        self.session = session
+
+    def _retry_delay(self, attempt, response=None):
+        """再試行までの待ち時間（Retry-Afterがあればそれに従う）"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        # 指数バックオフ + ゆらぎ（一斉に再試行しないように）
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def get(self, url, **kwargs):
+        """レート制限と再試行つきでGETする（失敗したら例外）"""
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            response = None
+            try:
+                response = self.session.get(url, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} {response.reason}", response=response)
+            except requests.exceptions.SSLError:
+                # 証明書やプロトコルの誤りは再試行しても直らない
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if response is not None:
+                response.close()
+            if attempt == self.retries:
+                raise error
+            time.sleep(self._retry_delay(attempt, response))
+
+    def fetch(self, url, filepath, etag=None, last_modified=None):
+        """画像を保存する（ETag/Last-Modifiedがあれば条件付きGET）
+
+        本体はメモリに溜めずに一時ファイルへ書き出し、最後に置き換える。
+        返り値は {"status": "downloaded" か "not_modified", "etag", "last_modified", "size", "sha256"}。
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        response = self.get(url, headers=headers, stream=True)
+        try:
+            if response.status_code == 304:
+                return {"status": "not_modified", "etag": etag, "last_modified": last_modified, "size": 0}
+
+            digest = hashlib.sha256()
+            size = 0
+            # 書きかけのファイルを残さないよう、一時ファイルに書いてから置き換える
+            temp_path = filepath + ".part"
+            try:
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                os.replace(temp_path, filepath)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        finally:
+            response.close()
+
+        return {
+            "status": "downloaded",
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": size,
+            "sha256": digest.hexdigest(),
+        }
+
+    def run_all(self, items, func, progress=True):
+        """items の各要素に func を並列に適用し、結果のリストを返す（失敗した要素はNone）
+
+        func の返り値が辞書で "size" を持っていれば、転送量として進捗に数える。
+        """
+        items = list(items)
+        tracker = DownloadProgress(len(items)) if progress else None
+
+        def run(item):
+            try:
+                result = func(item)
+            except Exception as e:
+                print(f"\n画像のダウンロードに失敗: {item[0] if isinstance(item, tuple) else item}")
+                print(f"エラー: {e}")
+                if tracker:
+                    tracker.update(failed=True)
+                return None
+            if tracker:
+                tracker.update(result.get("size", 0) if isinstance(result, dict) else 0)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        self.session.close()
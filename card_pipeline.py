@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import BAKED_ASSETS_DIR, BAKED_ATLAS_FILE
+from bake_assets import (CARD_ROLES, DEFAULT_SCALES, UndecodableImage, bake_one, load_index, remove_missing_sources,
+                         save_index)
+from texture_atlas import build_atlas
+
+
+def _bake_timed(source_path, roles, scales, output_dir):
+    """bake_one を実行して処理時間も返す（ワーカープロセスで実行）"""
+    start = time.perf_counter()
+    entry, written = bake_one(source_path, roles, scales, output_dir)
+    return entry, written, time.perf_counter() - start
+
+
+class StageStats:
+    """パイプラインの1段階の処理件数と時間"""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+        self._lock = threading.Lock()
+
+    def add(self, nbytes=0, busy=0.0):
+        now = time.monotonic()
+        with self._lock:
+            self.count += 1
+            self.bytes += nbytes
+            self.busy += busy
+            if self.first is None:
+                self.first = now
+            self.last = now
+
+    def format_line(self):
+        span = (self.last - self.first) if self.count > 1 else 0.0
+        rate = f"{self.count / span:.1f}枚/秒" if span > 0 else "-"
+        line = f"{self.name}: {self.count} 枚  {rate}"
+        if self.bytes:
+            line += f"  {self.bytes / 1024 / 1024:.1f}MB"
+        if self.busy:
+            line += f"  処理時間の合計 {self.busy:.1f}秒"
+        return line
+
+
+class BakePipeline:
+    """ダウンロードした画像を、ダウンロードと並行してゲームで使う大きさに縮小する
+
+    ダウンロード → (上限つきキュー) → デコード・検証・縮小（プロセスプール） → インデックスとアトラスの書き出し
+    キューと実行中のタスク数に上限があるので、縮小が追いつかないときはダウンロードが待たされ、
+    メモリ使用量は増え続けない。
+    """
+    def __init__(self, scales=DEFAULT_SCALES, output_dir=BAKED_ASSETS_DIR, jobs=None, queue_size=32):
+        self.scales = scales
+        self.output_dir = output_dir
+        self.jobs = jobs or os.cpu_count() or 1
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.download_stats = StageStats("ダウンロード")
+        self.decode_stats = StageStats("デコード・縮小")
+        self.invalid = []
+        # 画像が壊れている以外の失敗（プールが落ちた、書き出せないなど）。close で投げ直す
+        self.error = None
+        self.max_queue_depth = 0
+        self._entries = {}
+        self._index = load_index(output_dir)
+        self._lock = threading.Lock()
+        # 実行中のタスク数の上限（ワーカーが空いたらすぐ次を渡せるよう2倍まで）
+        self._in_flight = threading.BoundedSemaphore(self.jobs * 2)
+        # fork だとダウンロード中の接続までワーカーに引き継がれてしまうので、spawn で起動する
+        self._executor = ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context("spawn"))
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def _is_baked(self, source_path):
+        """前回までに縮小済みで、元画像も変わっていないか"""
+        entry = self._index.get(os.path.normpath(source_path))
+        try:
+            return entry is not None and entry["mtime_ns"] == os.stat(source_path).st_mtime_ns
+        except OSError:
+            return False
+
+    def submit(self, source_path, nbytes=0, changed=True):
+        """ダウンロードが終わった画像を渡す（キューがいっぱいなら空くまで待つ）
+
+        changed=False（変わっていなかった画像）は、縮小済みでなければ縮小する。
+        """
+        if not changed and self._is_baked(source_path):
+            return
+        if changed:
+            self.download_stats.add(nbytes)
+        self.queue.put(source_path)
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def _dispatch(self):
+        """キューから取り出してプロセスプールに渡す"""
+        while True:
+            source_path = self.queue.get()
+            if source_path is None:
+                break
+            self._in_flight.acquire()
+            try:
+                future = self._executor.submit(_bake_timed, source_path, CARD_ROLES, self.scales, self.output_dir)
+            except Exception as e:
+                # ワーカーが落ちてプールが使えなくなっても、ダウンロード側を止めない（画像は壊れているとはみなさない）
+                self._in_flight.release()
+                self._fail(source_path, e)
+                continue
+            future.add_done_callback(lambda f, path=source_path: self._collect(path, f))
+
+    def _collect(self, source_path, future):
+        """縮小が終わった結果を受け取る"""
+        self._in_flight.release()
+        try:
+            entry, written, elapsed = future.result()
+        except UndecodableImage as e:
+            # デコードできない画像だけを壊れているとみなす
+            print(f"\n画像を読み込めません: {source_path} ({e})")
+            with self._lock:
+                self.invalid.append(source_path)
+            return
+        except Exception as e:
+            self._fail(source_path, e)
+            return
+        self.decode_stats.add(busy=elapsed)
+        with self._lock:
+            self._entries[os.path.normpath(source_path)] = entry
+
+    def _fail(self, source_path, error):
+        """縮小処理そのものの失敗を記録する（画像は消さない）"""
+        print(f"\n縮小できません: {source_path} ({type(error).__name__}: {error})")
+        with self._lock:
+            if self.error is None:
+                self.error = error
+
+    def close(self, build=True):
+        """残りの処理を待ち、インデックスとアトラスを書き出す
+
+        返り値は壊れていた画像の一覧。縮小処理そのものが失敗していたら、書き出したあとでその例外を投げる。
+        """
+        self.queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+        start = time.perf_counter()
+        index = self._index
+        index.update(self._entries)
+        # 元画像がなくなったもの（削除されたカード）はインデックスから外す
+        remove_missing_sources(index)
+        save_index(self.output_dir, index)
+        if build and (self._entries or not os.path.exists(os.path.join(self.output_dir, BAKED_ATLAS_FILE))):
+            build_atlas(index, os.path.join(self.output_dir, BAKED_ATLAS_FILE))
+        write_time = time.perf_counter() - start
+
+        print(self.download_stats.format_line())
+        print(self.decode_stats.format_line() + f"  (最大キュー長 {self.max_queue_depth})")
+        print(f"書き出し: インデックス {len(index)} 件  {write_time:.2f}秒")
+        if self.error is not None:
+            # 縮小できた分は書き出したうえで、呼び出し側に知らせる（壊れた画像の削除もさせない）
+            raise self.error
+        return self.invalid
@@ -0,0 +1,227 @@
+import glob
+import json
+import os
+import threading
+
+
+MANIFEST_FILE = "sync_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class SyncManifest:
+    """ダウンロード済みカードの記録（カードID -> URL・ファイル名・ETag・サイズ・ハッシュ）
+
+    途中で止まっても終わった分の記録が残るよう、同期中も定期的に書き出す。
+    aliases は重複していたカードの対応表（カードID -> 画像を共有する代表のカードID）。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.cards = {}
+        self.aliases = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.cards = data["cards"]
+                self.aliases = data.get("aliases", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"マニフェスト読み込みエラー（全件ダウンロードし直します）: {e}")
+
+    def save(self):
+        """マニフェストを書き出す（一時ファイルに書いてから置き換える）"""
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "cards": self.cards, "aliases": self.aliases}
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+
+    def get(self, card_id):
+        with self._lock:
+            return self.cards.get(card_id)
+
+    def set(self, card_id, entry):
+        with self._lock:
+            self.cards[card_id] = entry
+
+    def remove(self, card_id):
+        """カードの記録を消す（代表のカードなら、画像を共有していたカードの別名も外す）"""
+        with self._lock:
+            self.aliases.pop(card_id, None)
+            for alias_id in [a for a, target in self.aliases.items() if target == card_id]:
+                del self.aliases[alias_id]
+            return self.cards.pop(card_id, None)
+
+    def alias_of(self, card_id):
+        """画像を共有している代表のカードID（なければNone）"""
+        with self._lock:
+            return self.aliases.get(card_id)
+
+    def set_alias(self, card_id, target_id):
+        with self._lock:
+            self.aliases[card_id] = target_id
+
+    def remove_alias(self, card_id):
+        with self._lock:
+            self.aliases.pop(card_id, None)
+
+    def remove_aliases_to(self, target_id):
+        """target_id と画像を共有していたカードの別名を外し、外したカードIDを返す"""
+        with self._lock:
+            alias_ids = [a for a, target in self.aliases.items() if target == target_id]
+            for alias_id in alias_ids:
+                del self.aliases[alias_id]
+            return alias_ids
+
+    def ids(self):
+        with self._lock:
+            return list(self.cards)
+
+
+def card_filename(index, card):
+    """保存するファイル名（rare_card_001_<id>.png のように連番とIDから作る）"""
+    url = card['url'].lower()
+    ext = '.jpg'
+    if '.png' in url:
+        ext = '.png'
+    elif '.webp' in url:
+        ext = '.webp'
+    return f"rare_card_{index + 1:03d}_{card['id']}{ext}"
+
+
+def _file_intact(images_dir, entry):
+    """記録どおりのファイルが残っているか（大きさで確認）"""
+    filepath = os.path.join(images_dir, entry["file"])
+    try:
+        return os.path.getsize(filepath) == entry["size"]
+    except OSError:
+        return False
+
+
+def _remove_file(images_dir, filename):
+    try:
+        os.remove(os.path.join(images_dir, filename))
+    except FileNotFoundError:
+        pass
+
+
+def forget_files(manifest, images_dir, paths):
+    """壊れていた画像のファイルと記録を消す（次回の同期でダウンロードし直す）"""
+    names = set(os.path.basename(path) for path in paths)
+    for card_id in manifest.ids():
+        entry = manifest.get(card_id)
+        if entry and entry["file"] in names:
+            manifest.remove(card_id)
+            _remove_file(images_dir, entry["file"])
+    manifest.save()
+
+
+def sync_cards(cards, images_dir, downloader, manifest=None, save_every=25, on_complete=None):
+    """カード一覧に合わせて images_dir を更新する
+
+    - 前回と同じURLでファイルも残っているカードは、条件付きGETで変わっていなければスキップ
+    - URLが変わったカード・新しいカードはダウンロード
+    - カード一覧から消えたカードはファイルと記録を削除
+    on_complete(ファイルパス, 結果) を渡すと、1枚終わるごとに（ダウンロードのスレッドから）呼ぶ。
+    返り値は件数の辞書（downloaded, updated, unchanged, removed, failed）。
+    """
+    if manifest is None:
+        manifest = SyncManifest(os.path.join(images_dir, MANIFEST_FILE))
+
+    # 前回中断したときの書きかけのファイルを消す
+    for temp_path in glob.glob(os.path.join(images_dir, "*.part")):
+        os.remove(temp_path)
+
+    counts = {"downloaded": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    card_ids = set(str(card['id']) for card in cards)
+
+    # カード一覧から消えたカードを片付ける（一覧が空のときは取得失敗の可能性があるので何もしない）
+    # 代表のカードが消えると、画像を共有していたカードは別名でなくなり、下でダウンロードし直す
+    if card_ids:
+        for card_id in manifest.ids():
+            if card_id not in card_ids:
+                entry = manifest.remove(card_id)
+                _remove_file(images_dir, entry["file"])
+                counts["removed"] += 1
+                print(f"削除: {entry['file']}")
+
+    jobs = []
+    seen = set()
+    for i, card in enumerate(cards):
+        card_id = str(card['id'])
+        if card_id in seen:
+            continue
+        seen.add(card_id)
+
+        entry = manifest.get(card_id)
+        target_id = manifest.alias_of(card_id)
+        target = manifest.get(target_id) if target_id else None
+        # 重複として画像を消したカードは、代表のカードの画像が残っていればよい
+        alias = target is not None and _file_intact(images_dir, target)
+        if entry and entry["url"] == card['url'] and (alias or _file_intact(images_dir, entry)):
+            # 前回と同じ画像のはずなので、変わっていないかだけ確認する
+            jobs.append((card['url'], card_id, card, entry["file"], entry, alias))
+        else:
+            filename = entry["file"] if entry and entry["url"] == card['url'] else card_filename(i, card)
+            jobs.append((card['url'], card_id, card, filename, None, False))
+
+    lock = threading.Lock()
+    changed = [0]
+
+    def run(job):
+        url, card_id, card, filename, entry, alias = job
+        filepath = os.path.join(images_dir, filename)
+        if entry:
+            result = downloader.fetch(url, filepath, entry.get("etag"), entry.get("last_modified"))
+        else:
+            result = downloader.fetch(url, filepath)
+
+        if result["status"] == "not_modified":
+            kind = "unchanged"
+            # 画像は同じでも、名前やレアリティが変わっていれば記録し直す
+            info = {"name": card.get('name'), "rarity": card.get('rarity'), "set": card.get('set')}
+            if any(entry.get(key) != value for key, value in info.items()):
+                manifest.set(card_id, dict(entry, **info))
+        else:
+            old = manifest.get(card_id)
+            kind = "updated" if old else "downloaded"
+            if old and old["file"] != filename:
+                _remove_file(images_dir, old["file"])
+            # 画像が変わったので、重複としてまとめていた対応は外す（次回の同期で取り直す）
+            manifest.remove_aliases_to(card_id)
+            manifest.remove_alias(card_id)
+            manifest.set(card_id, {
+                "url": url,
+                "file": filename,
+                "name": card.get('name'),
+                "rarity": card.get('rarity'),
+                "set": card.get('set'),
+                "etag": result["etag"],
+                "last_modified": result["last_modified"],
+                "size": result["size"],
+                "sha256": result["sha256"],
+            })
+
+        # 終わった分は定期的に書き出しておく（途中で止まっても次回はそこから再開できる）
+        with lock:
+            counts[kind] += 1
+            if kind != "unchanged":
+                changed[0] += 1
+            save_now = kind != "unchanged" and changed[0] % save_every == 0
+        if save_now:
+            manifest.save()
+        # 画像を共有しているカードは、ファイルを持つ代表のカードの側で扱う
+        if on_complete and not (alias and kind == "unchanged"):
+            on_complete(filepath, result)
+        return result
+
+    results = downloader.run_all(jobs, run)
+    counts["failed"] = sum(1 for result in results if result is None)
+    manifest.save()
+    return counts
@@ -0,0 +1,219 @@
+import json
+import os
+import re
+
+
+CATALOG_FILE = "catalog.json"
+CATALOG_CARDS_FILE = "catalog_cards.json"
+# 絞り込み結果のキャッシュの形式（項目を増やしたら上げる）
+CATALOG_CARDS_VERSION = 2
+# ファイルから一度に読む文字数
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _JsonStream:
+    """ファイルを少しずつ読みながら、JSONの値を1つずつ取り出すためのバッファ"""
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """続きを読み込む（読み終わった部分は捨てる）"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """空白を読み飛ばして次の1文字を返す（終わりなら空文字）"""
+        # よくある「空白なしで次の文字が続く」場合は正規表現を使わない
+        if self.pos < len(self.buffer) and self.buffer[self.pos] not in " \t\n\r":
+            return self.buffer[self.pos]
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected):
+        """次の1文字を読み、expected のどれかでなければエラー"""
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"カード一覧の形式が違います（'{expected}' のはずが '{char}'）")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """次のJSONの値を1つ読む"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数値などはバッファの終わりで途切れているかもしれないので、続きを読んで確かめる
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_catalog_cards(f, chunk_size=CHUNK_SIZE, with_category=False):
+    """カード一覧JSON（[{..., "db_data": [カード, ...]}, ...]）からカードを1枚ずつ取り出す
+
+    全体を読み込まずに少しずつ解析するので、一覧が大きくなってもメモリ使用量は増えない。
+    with_category=True なら (カテゴリ, カード) の組を返す。カテゴリは db_data より前にある
+    文字列・数値の項目だけを持つ辞書。
+    """
+    stream = _JsonStream(f, chunk_size)
+    stream.take("[")
+    if stream.peek() == "]":
+        return
+    while True:
+        stream.take("{")
+        category = {}
+        if stream.peek() == "}":
+            stream.pos += 1
+        else:
+            while True:
+                key = stream.value()
+                stream.take(":")
+                if key == "db_data" and stream.peek() == "[":
+                    stream.pos += 1
+                    if stream.peek() == "]":
+                        stream.pos += 1
+                    else:
+                        while True:
+                            card = stream.value()
+                            if isinstance(card, dict):
+                                yield (category, card) if with_category else card
+                            if stream.take(",]") == "]":
+                                break
+                else:
+                    # カテゴリのほかの項目は、名前などの短い値だけ残す
+                    value = stream.value()
+                    if isinstance(value, (str, int, float)):
+                        category[key] = value
+                if stream.take(",}") == "}":
+                    break
+        if stream.take(",]") == "]":
+            break
+
+
+class CardFilter:
+    """カードを選ぶ条件（field の値に contains が含まれるカード。大文字小文字は区別しない）"""
+    def __init__(self, field="col_19", contains="ex"):
+        self.field = field
+        self.contains = contains.lower()
+
+    def matches(self, card):
+        value = (card.get(self.field) or "")
+        value = value.strip() if isinstance(value, str) else str(value)
+        return bool(value) and self.contains in value.lower()
+
+    def key(self):
+        """キャッシュの照合に使う文字列"""
+        return f"{self.field}:{self.contains}"
+
+
+def card_info(card, category=None):
+    """カードのデータからダウンロードに必要な項目を取り出す（画像がなければNone）
+
+    収録セットはカードが入っているカテゴリの名前にする。
+    """
+    img_url = card.get('image_url')
+    if not img_url:
+        return None
+
+    # /show を /original に置き換えて高解像度版を取得
+    img_url = img_url.replace('/show', '/original')
+
+    # HTTPSに統一
+    if img_url.startswith('//'):
+        img_url = 'https:' + img_url
+    elif not img_url.startswith('http'):
+        img_url = 'https://' + img_url
+
+    rarity = card.get('col_19', '') or ''
+    category = category or {}
+    return {
+        'url': img_url,
+        'name': card.get('title', 'Unknown'),
+        'id': card.get('id', 'unknown'),
+        'rarity': rarity.strip() if isinstance(rarity, str) else rarity,
+        'set': str(category.get('name') or category.get('title') or ''),
+    }
+
+
+def _write_json(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def load_catalog_cards(downloader, url, cache_dir, card_filter=None):
+    """カード一覧を取得して、条件に合うカードのリストと全カード数を返す
+
+    一覧はディスクに保存しておき、次回は条件付きGETで確認する。変わっていなければ
+    前回の絞り込み結果をそのまま使い、一覧の解析もしない。
+    """
+    card_filter = card_filter or CardFilter()
+    raw_path = os.path.join(cache_dir, CATALOG_FILE)
+    cards_path = os.path.join(cache_dir, CATALOG_CARDS_FILE)
+
+    cached = {}
+    if os.path.exists(raw_path) and os.path.exists(cards_path):
+        try:
+            with open(cards_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"カード一覧キャッシュ読み込みエラー: {e}")
+
+    result = downloader.fetch(url, raw_path, cached.get("etag"), cached.get("last_modified"))
+    if result["status"] == "not_modified":
+        etag, last_modified, sha256 = cached.get("etag"), cached.get("last_modified"), cached.get("sha256")
+    else:
+        etag, last_modified, sha256 = result["etag"], result["last_modified"], result["sha256"]
+
+    # ETagを返さないサーバーでも、中身が同じなら解析しない
+    unchanged = result["status"] == "not_modified" or (sha256 and sha256 == cached.get("sha256"))
+    if unchanged and cached.get("filter") == card_filter.key() and cached.get("version") == CATALOG_CARDS_VERSION:
+        print("カード一覧は前回から変わっていません（キャッシュを使用）")
+        return cached["cards"], cached["total"]
+
+    # 条件に合うカードだけを残しながら、1枚ずつ解析する
+    cards = []
+    total = 0
+    with open(raw_path, "r", encoding="utf-8") as f:
+        for category, card in iter_catalog_cards(f, with_category=True):
+            total += 1
+            if card_filter.matches(card):
+                info = card_info(card, category)
+                if info:
+                    cards.append(info)
+
+    _write_json(cards_path, {
+        "version": CATALOG_CARDS_VERSION,
+        "etag": etag,
+        "last_modified": last_modified,
+        "sha256": sha256,
+        "filter": card_filter.key(),
+        "total": total,
+        "cards": cards,
+    })
+    return cards, total
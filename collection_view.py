@@ -0,0 +1,143 @@
+import pygame
+from constants import BLACK, WHITE
+from asset_manager import assets
+
+
+class CollectionLayout:
+    """獲得カード一覧の格子レイアウト"""
+    CARD_ASPECT_RATIO = 2 / 3
+
+    def __init__(self, card_count, screen_width, screen_height, scale):
+        self.header_height = int(90 * scale)
+        footer_height = int(50 * scale)
+        self.available_height = max(1, screen_height - self.header_height - footer_height)
+        available_width = screen_width - int(30 * scale)
+
+        # 一番大きくカードを表示できる1行の枚数を探す
+        best_card_height = 0
+        best_cards_per_row = 1
+        spacing = int(10 * scale)
+        for test_cards_per_row in range(1, card_count + 1):
+            rows = (card_count + test_cards_per_row - 1) // test_cards_per_row
+
+            max_width_per_card = (available_width - spacing * (test_cards_per_row - 1)) / test_cards_per_row
+            height_from_width = max_width_per_card / self.CARD_ASPECT_RATIO
+            max_height_per_card = (self.available_height - spacing * (rows - 1)) / rows
+            card_height = min(height_from_width, max_height_per_card)
+
+            if card_height > best_card_height:
+                best_card_height = card_height
+                best_cards_per_row = test_cards_per_row
+            elif height_from_width <= best_card_height:
+                # 1行の枚数を増やすと幅からの上限は小さくなる一方なので、これ以上は探さない
+                break
+
+        self.card_height = int(best_card_height)
+        self.card_width = int(self.card_height * self.CARD_ASPECT_RATIO)
+        self.spacing = spacing
+        self.cards_per_row = best_cards_per_row
+
+        min_card_height = int(60 * scale)
+        if self.card_height < min_card_height:
+            self.card_height = min_card_height
+            self.card_width = int(self.card_height * self.CARD_ASPECT_RATIO)
+            # 最小サイズでは縦に収まらないので、1行の枚数を画面幅いっぱいに合わせ直してスクロールさせる
+            self.cards_per_row = max(1, (available_width + spacing) // max(1, self.card_width + spacing))
+
+        self.total_rows = (card_count + self.cards_per_row - 1) // self.cards_per_row
+        self.row_pitch = max(1, self.card_height + self.spacing)
+        self.row_width = self.cards_per_row * self.card_width + (self.cards_per_row - 1) * self.spacing
+        self.content_height = self.total_rows * self.card_height + (self.total_rows - 1) * self.spacing
+        self.start_x = (screen_width - self.row_width) // 2
+
+        # 画面に収まらないときはスクロール表示にする
+        self.scrollable = self.content_height > self.available_height
+        if self.scrollable:
+            self.start_y = self.header_height
+            self.max_scroll = self.content_height - self.available_height
+        else:
+            self.start_y = self.header_height + (self.available_height - self.content_height) // 2
+            self.max_scroll = 0
+
+
+class CollectionView:
+    """獲得カード一覧の描画（レイアウト・縮小画像・合成結果をキャッシュ）
+
+    レイアウトは (カード枚数, 画面サイズ) ごとに1回だけ計算し、縮小画像はカードごとに1回だけ作る。
+    画面に収まる場合は格子全体を1枚のサーフェスに合成しておき、毎フレームそれを1回blitする。
+    収まらない場合はスクロール表示にして、見えている行だけを合成する。
+    """
+    def __init__(self):
+        self.scroll = 0
+        self._layout = None
+        self._layout_key = None
+        self._thumbnails = {}
+        self._thumbnail_size = None
+        self._composite = None
+        self._composite_key = None
+
+    def _get_layout(self, card_count, screen_width, screen_height, scale):
+        key = (card_count, screen_width, screen_height)
+        if key != self._layout_key:
+            self._layout = CollectionLayout(card_count, screen_width, screen_height, scale)
+            self._layout_key = key
+            self.scroll = min(self.scroll, self._layout.max_scroll)
+        return self._layout
+
+    def _get_thumbnail(self, index, card, size):
+        """カードの縮小画像（サイズが変わったら作り直す）"""
+        if size != self._thumbnail_size:
+            self._thumbnails.clear()
+            self._thumbnail_size = size
+        thumbnail = self._thumbnails.get(index)
+        if thumbnail is None:
+            image_path = card.get('image_path')
+            if image_path and assets.has_baked(image_path):
+                # 縮小済み画像があれば、そこから縮める（カード画像を縮めるより粗くならない）
+                thumbnail = assets.load(image_path, size)
+            else:
+                thumbnail = pygame.transform.scale(card['image'], size)
+            self._thumbnails[index] = thumbnail
+        return thumbnail
+
+    def scroll_by(self, amount):
+        """スクロール位置を動かす（ピクセル）"""
+        max_scroll = self._layout.max_scroll if self._layout else 0
+        self.scroll = max(0, min(max_scroll, self.scroll + int(amount)))
+
+    def _build_composite(self, cards, layout):
+        """見えている行だけを1枚のサーフェスに合成する"""
+        height = layout.available_height if layout.scrollable else layout.content_height
+        composite = pygame.Surface((max(1, layout.row_width), max(1, height)))
+        if pygame.display.get_surface() is not None:
+            composite = composite.convert()
+        composite.fill(BLACK)
+
+        size = (layout.card_width, layout.card_height)
+        first_row = self.scroll // layout.row_pitch
+        last_row = min(layout.total_rows - 1, (self.scroll + height) // layout.row_pitch)
+        for row in range(first_row, last_row + 1):
+            y = row * layout.row_pitch - self.scroll
+            for col in range(layout.cards_per_row):
+                index = row * layout.cards_per_row + col
+                if index >= len(cards):
+                    break
+                x = col * (layout.card_width + layout.spacing)
+                composite.blit(self._get_thumbnail(index, cards[index], size), (x, y))
+        return composite
+
+    def draw(self, screen, cards, scale):
+        """カードの格子を描画"""
+        layout = self._get_layout(len(cards), screen.get_width(), screen.get_height(), scale)
+        key = (self._layout_key, self.scroll)
+        if key != self._composite_key:
+            self._composite = self._build_composite(cards, layout)
+            self._composite_key = key
+        screen.blit(self._composite, (layout.start_x, layout.start_y))
+
+        if layout.scrollable:
+            # スクロールバー
+            bar_x = layout.start_x + layout.row_width + max(2, int(5 * scale))
+            bar_height = max(10, layout.available_height * layout.available_height // layout.content_height)
+            bar_y = layout.start_y + (layout.available_height - bar_height) * self.scroll // layout.max_scroll
+            pygame.draw.rect(screen, WHITE, (bar_x, bar_y, max(2, int(4 * scale)), bar_height))
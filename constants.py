@@ -3,7 +3,10 @@
 # 画面設定
 DEFAULT_SCREEN_WIDTH = 800
 DEFAULT_SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # 描画のフレームレート上限（0で無制限）
+SIMULATION_HZ = 60  # ゲームの更新回数（毎秒）。FPSを変えても動きは変わらない
+DIRTY_RECT_RENDERING = False  # 射撃シーンで変化した範囲だけを描き直す
+RESIZE_DEBOUNCE_MS = 150  # ウィンドウサイズの変更がこの時間止まってから画面を作り直す
 
 # 色定義
 WHITE = (255, 255, 255)
@@ -17,10 +20,28 @@ ORANGE = (255, 165, 0)
 
 # ゲーム設定
 INITIAL_AMMO = 10
-CARD_PACKS_COUNT = 10
+CARD_PACKS_COUNT = 10  # 10以外にすると格子状に配置する
+SWARM_THRESHOLD = 200  # パック数がこれ以上ならNumPyでまとめて動かす
+HIT_EFFECT_POOL_SIZE = 64  # 同時に出せる「ゲット！」の数（超えた分は出さない）
 CARDS_PER_PACK = 5
+# パックの枠ごとのレアリティの重み（CARDS_PER_PACK 枠ぶん）
+# カードの中にないレアリティは除いて重みを割り直し、どれもなければその枠は全カードから選ぶ
+PACK_SLOT_TABLE = [
+    {"Common": 1},
+    {"Common": 1},
+    {"Common": 3, "Rare": 1},
+    {"Common": 2, "Rare": 2, "Super Rare": 1},
+    {"Rare": 4, "Super Rare": 1},  # レア以上が1枚確定
+]
 TIME_LIMIT = 45  # 制限時間（秒）
 
+# アセット設定
+ASSET_MEMORY_BUDGET = 64 * 1024 * 1024  # デコード済み画像を保持する上限（バイト）
+BAKED_ASSETS_DIR = "baked"  # bake_assets.py で縮小済みの画像を置くフォルダ
+BAKED_INDEX_FILE = "index.json"
+BAKED_ATLAS_FILE = "atlas.bin"  # 縮小済み画像をまとめたアトラス（メモリマップで読み込む）
+CARD_CATALOG_FILE = "card_catalog.db"  # scrape_cards.py が images/ に作るカードカタログ（SQLite）
+
 # ゲーム状態
 STATE_START = "start"
 STATE_SHOOTING = "shooting"
@@ -4,15 +4,22 @@ from constants import DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT, RED
 
 class Crosshair:
     """照準クラス"""
+    SPRITE_MARGIN = 2
+
     def __init__(self, screen_width, screen_height):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.x = screen_width // 2
         self.y = screen_height // 2
+        # 描画補間用の前ステップの位置
+        self.prev_x = self.x
+        self.prev_y = self.y
         # 画面サイズに応じてサイズをスケーリング
         scale = min(screen_width / DEFAULT_SCREEN_WIDTH, screen_height / DEFAULT_SCREEN_HEIGHT)
         self.size = int(20 * scale)
         self.speed = max(3, int(5 * scale))
+        self._sprite = None
+        self._sprite_size = None
 
     def get_rect(self):
         """衝突判定用の矩形を返す"""
@@ -21,6 +28,8 @@ class Crosshair:
 
     def update(self, keys):
         """矢印キーで照準を移動"""
+        self.prev_x = self.x
+        self.prev_y = self.y
         if keys[pygame.K_LEFT] and self.x > self.size:
             self.x -= self.speed
         if keys[pygame.K_RIGHT] and self.x < self.screen_width - self.size:
@@ -41,12 +50,40 @@ class Crosshair:
         # 照準が画面外に出ないように調整
         self.x = min(self.x, screen_width - self.size)
         self.y = min(self.y, screen_height - self.size)
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def render_pos(self, alpha=1.0):
+        """前ステップと現ステップの間を補間した描画位置"""
+        x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = round(self.prev_y + (self.y - self.prev_y) * alpha)
+        return x, y
+
+    def get_draw_rect(self, alpha=1.0):
+        """描画される範囲を返す（線の太さ分の余白込み）"""
+        margin = self.SPRITE_MARGIN
+        x, y = self.render_pos(alpha)
+        return pygame.Rect(x - self.size - margin, y - self.size - margin,
+                          self.size * 2 + margin * 2 + 1, self.size * 2 + margin * 2 + 1)
+
+    def _get_sprite(self):
+        """照準の画像を返す（サイズごとに一度だけ描画）"""
+        if self._sprite is None or self._sprite_size != self.size:
+            margin = self.SPRITE_MARGIN
+            extent = self.size * 2 + margin * 2 + 1
+            center = self.size + margin
+            sprite = pygame.Surface((extent, extent), pygame.SRCALPHA)
+            # 十字の照準
+            pygame.draw.line(sprite, RED, (center - self.size, center),
+                            (center + self.size, center), 3)
+            pygame.draw.line(sprite, RED, (center, center - self.size),
+                            (center, center + self.size), 3)
+            pygame.draw.circle(sprite, RED, (center, center), self.size, 2)
+            self._sprite = sprite
+            self._sprite_size = self.size
+        return self._sprite
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """照準を描画"""
-        # 十字の照準
-        pygame.draw.line(screen, RED, (self.x - self.size, self.y),
-                        (self.x + self.size, self.y), 3)
-        pygame.draw.line(screen, RED, (self.x, self.y - self.size),
-                        (self.x, self.y + self.size), 3)
-        pygame.draw.circle(screen, RED, (self.x, self.y), self.size, 2)
+        # 線をクリップ付きで描くと形が変わるので、描画済みの画像をblitする
+        screen.blit(self._get_sprite(), self.get_draw_rect(alpha))
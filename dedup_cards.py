@@ -0,0 +1,269 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from constants import BAKED_ASSETS_DIR, BAKED_ATLAS_FILE
+from bake_assets import load_index, remove_missing_sources, save_index
+from card_catalog import build_catalog
+from card_sync import MANIFEST_FILE, SyncManifest
+from texture_atlas import build_atlas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 知覚ハッシュの1辺（16x16 = 256ビット）
+# カードは枠やテキスト欄の配置が共通なので、8x8 だと違うカードでも近い値になりやすい
+HASH_SIZE = 16
+HASH_BYTES = HASH_SIZE * HASH_SIZE // 8
+# これ以下のビット差ならほぼ同じ画像とみなす（256ビット中）
+DEFAULT_THRESHOLD = 12
+# 距離をまとめて計算する行数（BLOCK_ROWS x 枚数 の配列を作る）
+BLOCK_ROWS = 128
+
+def dhash(surface):
+    """差分ハッシュ（縮小したグレースケール画像で、隣の画素より明るいかをビットに並べる）
+
+    拡大縮小や再圧縮では変わりにくく、違う絵柄なら大きく変わる。
+    """
+    if surface.get_bitsize() not in (24, 32):
+        # smoothscale は24/32ビットの画像しか扱えない
+        converted = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+        converted.blit(surface, (0, 0))
+        surface = converted
+    small = pygame.transform.smoothscale(surface, (HASH_SIZE + 1, HASH_SIZE))
+    rgb = pygame.surfarray.array3d(small).astype(np.float32)
+    gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    # surfarray は (x, y) の順なので、x方向の差を取ってから行ごとに並べる
+    bits = gray[1:, :] > gray[:-1, :]
+    return np.packbits(bits.T.ravel()).tobytes()
+
+
+def image_hash(path):
+    """画像ファイルの知覚ハッシュと元の大きさ（ワーカープロセスで実行）"""
+    surface = pygame.image.load(path)
+    return dhash(surface), list(surface.get_size())
+
+
+def _popcount(values):
+    """64ビット整数ごとの立っているビット数"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    # np.bitwise_count がない古いNumPy用（ビット演算だけで数える）
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def near_pairs(hashes, threshold=DEFAULT_THRESHOLD, block_rows=BLOCK_ROWS):
+    """ハミング距離が threshold 以下の組 (i, j)（i < j）を返す
+
+    hashes はハッシュのバイト列のリスト。64ビット整数の配列にして、全組み合わせを
+    BLOCK_ROWS 行ずつの配列演算で比べるので、数千枚でも数秒かからない。
+    """
+    values = np.frombuffer(b"".join(hashes), dtype=np.uint64).reshape(len(hashes), -1)
+    # 64ビットごとの列に分けて、列ごとに距離を足していく（大きな3次元配列を作らない）
+    words = [np.ascontiguousarray(values[:, k]) for k in range(values.shape[1])]
+    pairs = []
+    for start in range(0, len(values), block_rows):
+        # 自分より後ろの画像とだけ比べる
+        distances = np.zeros((min(block_rows, len(values) - start), len(values) - start), dtype=np.uint16)
+        for word in words:
+            distances += _popcount(word[start:start + block_rows, None] ^ word[None, start:])
+        rows, cols = np.nonzero(distances <= threshold)
+        keep = cols > rows
+        pairs.extend(zip((rows[keep] + start).tolist(), (cols[keep] + start).tolist()))
+    return pairs
+
+
+def _group(ids, pairs):
+    """つながっている組をまとめる（Union-Find）"""
+    parent = {card_id: card_id for card_id in ids}
+
+    def find(card_id):
+        while parent[card_id] != card_id:
+            parent[card_id] = parent[parent[card_id]]
+            card_id = parent[card_id]
+        return card_id
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    groups = {}
+    for card_id in ids:
+        groups.setdefault(find(card_id), []).append(card_id)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _compute_hashes(manifest, images_dir, card_ids, jobs):
+    """まだ知覚ハッシュのないカードを計算してマニフェストに記録する
+
+    ハッシュは画像と一緒に記録するので、画像が変わらない限り計算し直さない。
+    """
+    missing = [card_id for card_id in card_ids
+               if len(manifest.get(card_id).get("phash") or "") != HASH_BYTES * 2]
+    if not missing:
+        return
+    paths = [os.path.join(images_dir, manifest.get(card_id)["file"]) for card_id in missing]
+    if len(missing) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(image_hash, path) for path in paths]
+            results = []
+            for path, future in zip(paths, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"画像を読み込めません: {path} ({e})")
+                    results.append(None)
+    else:
+        results = []
+        for path in paths:
+            try:
+                results.append(image_hash(path))
+            except Exception as e:
+                print(f"画像を読み込めません: {path} ({e})")
+                results.append(None)
+
+    for card_id, result in zip(missing, results):
+        if result is None:
+            continue
+        entry = dict(manifest.get(card_id))
+        entry["phash"] = result[0].hex()
+        entry["pixels"] = result[1]
+        manifest.set(card_id, entry)
+
+
+def find_duplicates(manifest, images_dir, threshold=DEFAULT_THRESHOLD, near=True, jobs=None):
+    """重複しているカードのグループ（カードIDのリスト）を返す
+
+    まずファイルのハッシュ（sha256）が同じものをまとめ、残った代表どうしを知覚ハッシュで比べる。
+    """
+    # 画像を持っているカードだけが対象（すでに別名になっているカードは除く）
+    card_ids = sorted(card_id for card_id in manifest.ids()
+                      if manifest.alias_of(card_id) is None
+                      and os.path.exists(os.path.join(images_dir, manifest.get(card_id)["file"])))
+
+    # 完全に同じファイル
+    by_content = {}
+    for card_id in card_ids:
+        by_content.setdefault(manifest.get(card_id).get("sha256"), []).append(card_id)
+    pairs = []
+    representatives = []
+    for sha256, group in by_content.items():
+        if sha256 is None:
+            representatives.extend(group)
+            continue
+        representatives.append(group[0])
+        pairs.extend((group[0], other) for other in group[1:])
+    exact_pairs = len(pairs)
+
+    # 見た目がほぼ同じ画像（解像度違い・再圧縮など）
+    if near and representatives:
+        if np is None:
+            print("NumPyがないため、見た目での重複チェックは行いません")
+        else:
+            _compute_hashes(manifest, images_dir, representatives, jobs)
+            hashed = [card_id for card_id in representatives
+                      if len(manifest.get(card_id).get("phash") or "") == HASH_BYTES * 2]
+            hashes = [bytes.fromhex(manifest.get(card_id)["phash"]) for card_id in hashed]
+            pairs.extend((hashed[i], hashed[j]) for i, j in near_pairs(hashes, threshold))
+
+    return _group(card_ids, pairs), exact_pairs
+
+
+def _canonical(manifest, group):
+    """グループの中で残すカード（解像度がいちばん高いもの。同じならファイル名順で先のもの）"""
+    def key(card_id):
+        entry = manifest.get(card_id)
+        width, height = entry.get("pixels") or (0, 0)
+        return (-width * height, entry["file"])
+    return min(group, key=key)
+
+
+def prune_baked(baked_dir=BAKED_ASSETS_DIR):
+    """消した画像の縮小画像を片付け、アトラスを作り直す"""
+    index = load_index(baked_dir)
+    if not index or not remove_missing_sources(index):
+        return
+    save_index(baked_dir, index)
+    atlas_path = os.path.join(baked_dir, BAKED_ATLAS_FILE)
+    if os.path.exists(atlas_path):
+        build_atlas(index, atlas_path)
+
+
+def dedup_cards(images_dir="images", threshold=DEFAULT_THRESHOLD, near=True, dry_run=False,
+                manifest=None, baked_dir=BAKED_ASSETS_DIR, jobs=None):
+    """重複しているカード画像を1枚にまとめる
+
+    残す1枚以外のファイルは削除し、マニフェストの別名の表に「どのカードの画像を使うか」を記録する。
+    返り値は件数の辞書（groups, removed, bytes）。
+    """
+    start = time.perf_counter()
+    if manifest is None:
+        manifest = SyncManifest(os.path.join(images_dir, MANIFEST_FILE))
+
+    groups, exact_pairs = find_duplicates(manifest, images_dir, threshold, near, jobs)
+    counts = {"groups": len(groups), "removed": 0, "bytes": 0}
+    for group in groups:
+        keep = _canonical(manifest, group)
+        names = ", ".join(manifest.get(card_id)["file"] for card_id in group if card_id != keep)
+        print(f"重複: {manifest.get(keep)['file']} <- {names}")
+        if dry_run:
+            continue
+        for card_id in group:
+            if card_id == keep:
+                continue
+            entry = manifest.get(card_id)
+            try:
+                os.remove(os.path.join(images_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
+            # このカードを代表にしていた別名も、残すカードに付け替える
+            for alias_id in manifest.remove_aliases_to(card_id):
+                manifest.set_alias(alias_id, keep)
+            manifest.set_alias(card_id, keep)
+            counts["removed"] += 1
+            counts["bytes"] += entry.get("size") or 0
+
+    if not dry_run:
+        # 計算した知覚ハッシュも記録しておく
+        manifest.save()
+        if counts["removed"]:
+            prune_baked(baked_dir)
+
+    elapsed = time.perf_counter() - start
+    print(f"重複チェック: {len(groups)} グループ（うち完全一致 {exact_pairs} 組）, "
+          f"{counts['removed']} 枚削除, {counts['bytes'] / 1024 / 1024:.1f}MB 削減 ({elapsed:.1f}秒)")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="重複しているカード画像を1枚にまとめる")
+    parser.add_argument("--images-dir", default="images", help="カード画像のフォルダ")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help=f"同じ画像とみなす知覚ハッシュのビット差（0〜{HASH_BYTES * 8}）")
+    parser.add_argument("--exact-only", action="store_true", help="完全に同じファイルだけをまとめる")
+    parser.add_argument("--dry-run", action="store_true", help="重複を表示するだけで削除しない")
+    parser.add_argument("--jobs", type=int, default=None, help="ワーカープロセス数（省略時はCPU数）")
+    args = parser.parse_args(argv)
+
+    manifest = SyncManifest(os.path.join(args.images_dir, MANIFEST_FILE))
+    counts = dedup_cards(args.images_dir, args.threshold, not args.exact_only, args.dry_run, manifest, jobs=args.jobs)
+    if counts["removed"]:
+        # まとめたカードが代表の画像を指すよう、カードカタログも作り直す
+        build_catalog(manifest, args.images_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import pygame
+from constants import BLACK
+
+
+def merge_rects(rects):
+    """重なっている矩形をまとめる"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        # まとめた結果がさらに他と重なることがあるので繰り返す
+        while True:
+            index = rect.collidelist(merged)
+            if index == -1:
+                break
+            rect.union_ip(merged.pop(index))
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectRenderer:
+    """前フレームから変わった範囲だけを描き直すレンダラ
+
+    描画要素は (キー, 描画範囲, 状態, 描画関数) のタプルで渡す。
+    キーごとに描画範囲と状態を前フレームと比べ、変わった要素の新旧の範囲だけを
+    背景で塗り直してから、その範囲に重なる要素を描画順どおりクリップ付きで描き直す。
+    そのため結果は全画面の再描画とピクセル単位で一致する。
+    """
+    def __init__(self, background=BLACK):
+        self.background = background
+        self._previous = {}
+        self._full_redraw = True
+
+    def invalidate(self):
+        """次のフレームを全画面で描き直す"""
+        self._full_redraw = True
+
+    def render(self, screen, drawables):
+        """描画して、画面に反映すべき矩形のリストを返す"""
+        current = {}
+        for key, rect, state, _ in drawables:
+            current[key] = (pygame.Rect(rect), state)
+
+        if self._full_redraw:
+            self._full_redraw = False
+            self._previous = current
+            screen.fill(self.background)
+            for _, _, _, draw in drawables:
+                draw(screen)
+            return [screen.get_rect()]
+
+        # 変化した要素の前フレームと今フレームの範囲を集める
+        dirty = []
+        for key, (rect, state) in current.items():
+            previous = self._previous.get(key)
+            if previous is None:
+                dirty.append(rect)
+            elif previous != (rect, state):
+                dirty.append(previous[0])
+                dirty.append(rect)
+        for key, (rect, _) in self._previous.items():
+            if key not in current:
+                dirty.append(rect)
+        self._previous = current
+
+        screen_rect = screen.get_rect()
+        dirty = [rect.clip(screen_rect) for rect in merge_rects(dirty)]
+        dirty = [rect for rect in dirty if rect.width > 0 and rect.height > 0]
+
+        for area in dirty:
+            screen.set_clip(area)
+            screen.fill(self.background, area)
+            for key, rect, _, draw in drawables:
+                if area.colliderect(current[key][0]):
+                    draw(screen)
+        screen.set_clip(None)
+        return dirty
@@ -0,0 +1,166 @@
+import os
+from collections import OrderedDict
+import pygame
+
+
+# 試すフォントファイルのパス（プロジェクト内のフォントを優先）
+PROJECT_FONT_PATH = os.path.join(os.path.dirname(__file__), "fonts", "NotoSansCJKjp-Regular.otf")
+FONT_PATHS = [
+    PROJECT_FONT_PATH,
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
+    "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+]
+
+# フォールバック: システムフォント名
+SYSTEM_FONT_NAMES = [
+    "notosanscjkjp",
+    "notosansjp",
+    "takaopgothic",
+    "ipaexgothic",
+    "ipagothic",
+    "meiryo",
+    "msgothic",
+    "yugothic"
+]
+
+
+def resolve_japanese_font_path():
+    """日本語対応フォントのファイルパスを探す（見つからなければNone）"""
+    for font_path in FONT_PATHS:
+        if os.path.exists(font_path):
+            try:
+                pygame.font.Font(font_path, 12)
+                return font_path
+            except:
+                continue
+
+    for font_name in SYSTEM_FONT_NAMES:
+        try:
+            font_path = pygame.font.match_font(font_name)
+        except:
+            continue
+        if font_path:
+            return font_path
+
+    # フォールバック: デフォルトフォント
+    return None
+
+
+class FontCache:
+    """(パス, サイズ) をキーにFontをLRUで保持するキャッシュ"""
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._fonts = OrderedDict()
+        self._font_path = None
+        self._resolved = False
+
+    def font_path(self):
+        """日本語フォントのパス（初回のみ探索）"""
+        if not self._resolved:
+            self._font_path = resolve_japanese_font_path()
+            self._resolved = True
+        return self._font_path
+
+    def get(self, size, path=None):
+        """指定サイズのフォントを返す（pathを省略すると日本語フォント）"""
+        if path is None:
+            path = self.font_path()
+        key = (path, size)
+
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            self._fonts.move_to_end(key)
+            return font
+
+        self.misses += 1
+        try:
+            font = pygame.font.Font(path, size)
+        except:
+            font = pygame.font.Font(None, size)
+
+        self._fonts[key] = font
+        if len(self._fonts) > self.max_entries:
+            self._fonts.popitem(last=False)
+        return font
+
+    def clear(self):
+        """キャッシュを破棄（pygame.font再初期化時など）"""
+        self._fonts.clear()
+        self._resolved = False
+        self._font_path = None
+
+    def stats(self):
+        """ヒット/ミス数などの統計を返す"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._fonts),
+            "max_entries": self.max_entries,
+            "font_path": self._font_path,
+        }
+
+
+# プロセス全体で共有するフォントキャッシュ
+font_cache = FontCache()
+
+
+class TextCache:
+    """(フォント, 文字列, 色, アンチエイリアス) をキーに描画済みテキストを保持するキャッシュ"""
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """font.renderの結果をキャッシュして返す（返り値は書き換えないこと）"""
+        key = (font, text, tuple(color), antialias)
+
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        size = surface.get_pitch() * surface.get_height()
+
+        # 上限を超えるものはキャッシュしない
+        if size > self.max_bytes:
+            return surface
+
+        self._surfaces[key] = surface
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, old = self._surfaces.popitem(last=False)
+            self.total_bytes -= old.get_pitch() * old.get_height()
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """キャッシュを破棄（画面スケール変更時など）"""
+        self._surfaces.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        """ヒット/ミス数などの統計を返す"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._surfaces),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# プロセス全体で共有するテキストキャッシュ
+text_cache = TextCache()
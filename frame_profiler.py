@@ -0,0 +1,170 @@
+import json
+import os
+import time
+import pygame
+from constants import FPS, SIMULATION_HZ, WHITE, RED, GREEN, YELLOW, BLUE
+
+
+# グラフで色分けする処理（Game.runの各段階）
+PHASE_COLORS = {
+    "handle_events": YELLOW,
+    "update": GREEN,
+    "draw": BLUE,
+}
+
+
+class _Section:
+    """with文で区間を計測するためのオブジェクト"""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        self.profiler._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.profiler._depth -= 1
+        self.profiler.record(self.name, self.start, end - self.start)
+        return False
+
+
+class FrameProfiler:
+    """フレーム内の処理時間をリングバッファに記録するプロファイラ"""
+    def __init__(self, capacity=8192, graph_frames=120):
+        self.capacity = capacity
+        self.graph_frames = graph_frames
+        self.frame_index = 0
+        self.show_overlay = False
+        self._depth = 0
+        self._sections = {}
+
+        # 区間のリングバッファ（名前, 開始ns, 長さns, フレーム番号, 深さ）
+        self._names = [None] * capacity
+        self._starts = [0] * capacity
+        self._durations = [0] * capacity
+        self._frames = [0] * capacity
+        self._depths = [0] * capacity
+        self._next = 0
+        self._count = 0
+
+        # グラフ用: フレームごとの各段階の時間（ミリ秒）
+        self._phase_history = [{} for _ in range(graph_frames)]
+        self._current_phases = {}
+
+    def section(self, name):
+        """with profiler.section("update"): のように使う"""
+        section = self._sections.get(name)
+        if section is None:
+            section = _Section(self, name)
+            self._sections[name] = section
+        return section
+
+    def record(self, name, start_ns, duration_ns):
+        """区間を1つ記録する"""
+        i = self._next
+        self._names[i] = name
+        self._starts[i] = start_ns
+        self._durations[i] = duration_ns
+        self._frames[i] = self.frame_index
+        self._depths[i] = self._depth
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+        if name in PHASE_COLORS:
+            self._current_phases[name] = duration_ns / 1e6
+
+    def end_frame(self):
+        """フレームの終わりに呼ぶ"""
+        self._phase_history[self.frame_index % self.graph_frames] = self._current_phases
+        self._current_phases = {}
+        self.frame_index += 1
+
+    def toggle_overlay(self):
+        """画面上のグラフ表示を切り替える"""
+        self.show_overlay = not self.show_overlay
+
+    def events(self):
+        """記録されている区間を古い順に返す"""
+        start = (self._next - self._count) % self.capacity
+        for offset in range(self._count):
+            i = (start + offset) % self.capacity
+            yield self._names[i], self._starts[i], self._durations[i], self._frames[i], self._depths[i]
+
+    def to_chrome_trace(self):
+        """Chromeトレース（Perfetto）形式の辞書を返す"""
+        trace_events = []
+        origin = None
+        for name, start, duration, frame, depth in self.events():
+            if origin is None:
+                origin = start
+            trace_events.append({
+                "name": name,
+                "cat": "frame",
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": duration / 1000,
+                "pid": os.getpid(),
+                "tid": 1,
+                "args": {"frame": frame, "depth": depth},
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def dump(self, directory="profile_traces"):
+        """トレースをJSONファイルに書き出してパスを返す"""
+        os.makedirs(directory, exist_ok=True)
+        filename = time.strftime("trace_%Y%m%d_%H%M%S.json")
+        path = os.path.join(directory, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        print(f"トレースを保存しました: {path}")
+        return path
+
+    def draw_overlay(self, screen, font):
+        """直近フレームの処理時間を積み上げ棒グラフで描画"""
+        if not self.show_overlay:
+            return
+
+        graph_width = self.graph_frames * 2
+        graph_height = 100
+        # 1フレームの目安（FPS=0 は上限なしなので、シミュレーションの更新間隔を目安にする）
+        budget_ms = 1000 / (FPS if FPS > 0 else SIMULATION_HZ)
+        ms_per_pixel = budget_ms * 2 / graph_height
+
+        x0 = screen.get_width() - graph_width - 10
+        y0 = 10
+        background = pygame.Surface((graph_width, graph_height))
+        background.set_alpha(160)
+        background.fill((0, 0, 0))
+        screen.blit(background, (x0, y0))
+
+        # 古いフレームから順に左から描く
+        worst_ms = 0.0
+        for column in range(self.graph_frames):
+            frame = self.frame_index - self.graph_frames + column
+            if frame < 0:
+                continue
+            phases = self._phase_history[frame % self.graph_frames]
+            bottom = y0 + graph_height
+            total_ms = 0.0
+            for name, color in PHASE_COLORS.items():
+                ms = phases.get(name, 0.0)
+                total_ms += ms
+                bar_height = int(ms / ms_per_pixel)
+                if bar_height > 0:
+                    top = max(y0, bottom - bar_height)
+                    pygame.draw.rect(screen, color, (x0 + column * 2, top, 2, bottom - top))
+                    bottom = top
+            worst_ms = max(worst_ms, total_ms)
+
+        # 1フレームの予算（16.7ms）の線
+        budget_y = y0 + graph_height - int(budget_ms / ms_per_pixel)
+        pygame.draw.line(screen, RED, (x0, budget_y), (x0 + graph_width, budget_y), 1)
+
+        label = font.render(f"max {worst_ms:.1f}ms / {budget_ms:.1f}ms", True, WHITE)
+        screen.blit(label, (x0, y0 + graph_height + 2))
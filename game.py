@@ -1,117 +1,267 @@
 import pygame
 import random
+import math
+from concurrent.futures import ThreadPoolExecutor
 from constants import (
-    DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT, FPS,
+    DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT, FPS, RESIZE_DEBOUNCE_MS,
     BLACK, WHITE, RED, GREEN, YELLOW,
-    INITIAL_AMMO, CARD_PACKS_COUNT, TIME_LIMIT,
+    INITIAL_AMMO, CARD_PACKS_COUNT, TIME_LIMIT, DIRTY_RECT_RENDERING, SWARM_THRESHOLD,
     STATE_START, STATE_SHOOTING, STATE_PACK_OPENING,
     STATE_CARD_COLLECTION, STATE_RESULT
 )
-from utils import get_japanese_font, load_card_images, load_pack_images
+from utils import get_japanese_font, render_text, load_card_catalog, load_card_images, load_pack_images
+from font_cache import text_cache
+from glyph_atlas import glyph_atlases
 from crosshair import Crosshair
-from hit_effect import HitEffect
+from hit_effect import HitEffectPool
 from card_pack import CardPack
 from pack_opening import PackOpening
+from dirty_rect import DirtyRectRenderer
+from frame_profiler import FrameProfiler
+from sim_clock import FixedTimestep
+from spatial_index import UniformGrid
+from pack_swarm import PackSwarm, swarm_available
+from asset_manager import assets
+from startup_profile import startup_profile
+
+
+# 起動時に画像の一覧を作り、パック画像をデコードしておくワーカースレッド
+_startup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup-loader")
+
+
+def _load_startup_assets(pack_count, pack_height, seed):
+    """スタート画面の裏で画像を探し、最初に並べるパックの画像をデコードしておく（ワーカースレッドで実行）
+
+    並べるパックの画像もここで選ぶ。乱数の種はメインスレッドで引いておくので、結果は再現できる。
+    """
+    with startup_profile.stage("scan", "カードカタログ"):
+        card_catalog = load_card_catalog()
+    with startup_profile.stage("scan", "カード画像"):
+        # カードカタログがあればフォルダは探さない
+        card_image_files = [] if card_catalog else load_card_images()
+    with startup_profile.stage("scan", "パック画像"):
+        pack_image_files = load_pack_images()
+
+    rng = random.Random(seed)
+    if pack_image_files:
+        selected = [rng.choice(pack_image_files) for _ in range(pack_count)]
+    else:
+        selected = [None] * pack_count
+    with startup_profile.stage("decode", "パック画像"):
+        # 同じ画像は1回だけ（アセットマネージャに入れておけば、配置するときはデコードしない）
+        for path in dict.fromkeys(path for path in selected if path):
+            try:
+                assets.load_with_height(path, pack_height)
+            except Exception as e:
+                print(f"パック画像読み込みエラー: {e}")
+    return card_catalog, card_image_files, pack_image_files, selected
 
 
 class Game:
     """メインゲームクラス"""
-    def __init__(self):
+    def __init__(self, dirty_rects=DIRTY_RECT_RENDERING, pack_count=CARD_PACKS_COUNT, swarm=None):
         self.screen_width = DEFAULT_SCREEN_WIDTH
         self.screen_height = DEFAULT_SCREEN_HEIGHT
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.RESIZABLE)
-        pygame.display.set_caption("カードパックをうちおとせ！")
+        with startup_profile.stage("init", "display.set_mode"):
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.RESIZABLE)
+            pygame.display.set_caption("カードパックをうちおとせ！")
         self.clock = pygame.time.Clock()
+        # シミュレーションは描画と独立した固定間隔で進める
+        self.sim_clock = FixedTimestep()
         self.running = True
         self.state = STATE_START
 
-        # 画像ファイルを読み込む
-        self.card_image_files = load_card_images()
-        self.pack_image_files = load_pack_images()
+        # 画像ファイルの一覧（バックグラウンドの読み込みが終わるまでは空）
+        self.card_catalog = None
+        self.card_image_files = []
+        self.pack_image_files = []
+
+        # パック数が多いときはNumPy配列でまとめて動かす（スウォームモード）
+        self.pack_count = pack_count
+        if swarm is None:
+            swarm = swarm_available() and pack_count >= SWARM_THRESHOLD
+        self.use_swarm = swarm
+        self.swarm = None
+        # 反映待ちのウィンドウサイズと、反映する時刻（get_ticks のシミュレーション時間）
+        self.pending_resize = None
+        self.resize_deadline = 0
 
         # ゲーム要素の初期化
         self.crosshair = Crosshair(self.screen_width, self.screen_height)
         self.card_packs = []
-        self.hit_effects = []
+        self.hit_effects = HitEffectPool()
+        # 残っているパックの空間インデックスと破壊数（毎フレーム数え直さない）
+        self.pack_index = UniformGrid(1)
+        self.destroyed_count = 0
         self.ammo = INITIAL_AMMO
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = self.get_ticks()
         self.is_cleared = False
         self.clear_time = 0
 
-        # カードパックの配置
-        self._setup_card_packs()
+        # 画像の一覧とパック画像の読み込みはスタート画面の裏で行い、終わったらパックを配置する
+        _, pack_scale = self._pack_positions()
+        self._startup_future = _startup_executor.submit(
+            _load_startup_assets, pack_count, int(80 * pack_scale), random.getrandbits(64))
+
+        # スタート画面で使うフォントは先に用意しておく
+        with startup_profile.stage("init", "フォント"):
+            get_japanese_font(int(40 * self._get_scale()))
 
         # パック開封シーン
         self.pack_opening = None
 
+        # 射撃シーンの差分描画（オプトイン）
+        self.dirty_renderer = DirtyRectRenderer(BLACK) if dirty_rects else None
+
+        # フレームプロファイラ（F3: グラフ表示、F4: トレース書き出し）
+        self.profiler = FrameProfiler()
+
+    def get_ticks(self):
+        """ゲーム内の経過時間（ミリ秒、シミュレーション時間）"""
+        return self.sim_clock.time_ms
+
+    def get_pressed_keys(self):
+        """押されているキーの状態"""
+        return pygame.key.get_pressed()
+
     def _get_scale(self):
         """画面スケールを計算"""
         return min(self.screen_width / DEFAULT_SCREEN_WIDTH, self.screen_height / DEFAULT_SCREEN_HEIGHT)
 
-    def _setup_card_packs(self):
-        """カードパックをトランプの5のパターンで配置"""
-        center_y = self.screen_height // 2
+    def _pack_positions(self):
+        """パックの配置と大きさのスケールを返す"""
         scale = self._get_scale()
+        if self.pack_count == 10:
+            return self._five_pattern_positions(scale), scale
+        return self._grid_positions(scale)
+
+    def _five_pattern_positions(self, scale):
+        """トランプの5のパターンを左右に2つ並べた配置"""
+        center_y = self.screen_height // 2
         offset_x = int(120 * scale)
         offset_y = int(180 * scale)
 
         centers_x = [self.screen_width // 4, self.screen_width * 3 // 4]
 
-        selected_pack_images = []
-        if self.pack_image_files:
-            for _ in range(CARD_PACKS_COUNT):
-                selected_pack_images.append(random.choice(self.pack_image_files))
-        else:
-            selected_pack_images = [None] * CARD_PACKS_COUNT
-
-        pack_index = 0
+        positions = []
         for center_x in centers_x:
-            positions = [
+            positions.extend([
                 (center_x - offset_x, center_y - offset_y),
                 (center_x + offset_x, center_y - offset_y),
                 (center_x, center_y),
                 (center_x - offset_x, center_y + offset_y),
                 (center_x + offset_x, center_y + offset_y),
-            ]
+            ])
+        return positions
+
+    def _grid_positions(self, scale):
+        """パック数に合わせて画面を格子に分けた配置（パックは格子に収まるよう縮小）"""
+        top = int(100 * scale)
+        bottom = int(40 * scale)
+        area_width = self.screen_width
+        area_height = max(1, self.screen_height - top - bottom)
+
+        cols = max(1, math.ceil(math.sqrt(self.pack_count * area_width / area_height)))
+        rows = max(1, math.ceil(self.pack_count / cols))
+        cell_width = area_width / cols
+        cell_height = area_height / rows
+        pack_scale = max(0.05, min(scale, cell_height / 80 * 0.8, cell_width / 60 * 0.8))
+
+        positions = []
+        for i in range(self.pack_count):
+            row, col = divmod(i, cols)
+            positions.append((int(col * cell_width), int(top + row * cell_height)))
+        return positions, pack_scale
+
+    def _setup_card_packs(self, selected_pack_images=None):
+        """カードパックを配置（画像を選んであればそれを使う）"""
+        positions, scale = self._pack_positions()
+
+        if selected_pack_images is None:
+            selected_pack_images = []
+            if self.pack_image_files:
+                for _ in range(len(positions)):
+                    selected_pack_images.append(random.choice(self.pack_image_files))
+            else:
+                selected_pack_images = [None] * len(positions)
 
-            for x, y in positions:
-                pack_image = selected_pack_images[pack_index] if pack_index < len(selected_pack_images) else None
+        if self.use_swarm:
+            self.swarm = PackSwarm(positions, scale, selected_pack_images)
+            self.card_packs = list(self.swarm.packs)
+        else:
+            self.swarm = None
+            for (x, y), pack_image in zip(positions, selected_pack_images):
                 self.card_packs.append(CardPack(x, y, scale, pack_image))
-                pack_index += 1
+
+        self._rebuild_pack_index()
+
+    def _finish_startup(self, wait=False):
+        """起動時の読み込みが終わっていればパックを配置する（wait=True なら終わるまで待つ）"""
+        future = self._startup_future
+        if future is None or (not wait and not future.done()):
+            return
+        self._startup_future = None
+        selected = None
+        try:
+            self.card_catalog, self.card_image_files, self.pack_image_files, selected = future.result()
+        except Exception as e:
+            print(f"起動時の読み込みエラー: {e}")
+        with startup_profile.stage("decode", "パックの配置"):
+            self._setup_card_packs(selected)
+        startup_profile.mark_loaded()
+
+    def _rescale_card_packs(self):
+        """今のパックを新しい画面の配置に合わせる（作り直さない）"""
+        positions, scale = self._pack_positions()
+        if self.swarm:
+            self.swarm.rescale(positions, scale)
+        else:
+            for pack, (x, y) in zip(self.card_packs, positions):
+                pack.rescale(x, y, scale)
+        self._rebuild_pack_index()
+
+    def _rebuild_pack_index(self):
+        """パックの空間インデックスと破壊数を作り直す"""
+        scale = self._get_scale()
+        # セルはパック1個分より少し大きくする
+        self.pack_index = UniformGrid(int(120 * scale))
+        self.destroyed_count = 0
+        if self.swarm:
+            # スウォームモードは配列をまとめて判定するのでインデックスは使わない
+            self.destroyed_count = self.swarm.destroyed_count
+            return
+        for pack in self.card_packs:
+            if pack.destroyed:
+                self.destroyed_count += 1
+            else:
+                self.pack_index.insert(pack, pack.get_rect())
 
     def handle_events(self):
         """イベント処理"""
+        self._finish_startup()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.VIDEORESIZE:
-                self.screen_width = event.w
-                self.screen_height = event.h
-                self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.RESIZABLE)
-                scale = self._get_scale()
-
-                self.crosshair.update_screen_size(self.screen_width, self.screen_height)
-                self.card_packs.clear()
-                self._setup_card_packs()
-
-                if self.pack_opening:
-                    self.pack_opening.screen_width = self.screen_width
-                    self.pack_opening.screen_height = self.screen_height
-                    self.pack_opening.pack_width = int(200 * scale)
-                    self.pack_opening.pack_height = int(280 * scale)
-                    self.pack_opening.pack_x = self.screen_width // 2 - self.pack_opening.pack_width // 2
-                    self.pack_opening.pack_y = self.screen_height // 2 - self.pack_opening.pack_height // 2
-                    self.pack_opening.pack_image = self.pack_opening._load_random_pack_image()
-                    self.pack_opening.card_width = int(80 * scale)
-                    self.pack_opening.card_height = int(120 * scale)
-                    self.pack_opening.font = get_japanese_font(int(28 * scale))
-                    self.pack_opening.small_font = get_japanese_font(int(18 * scale))
+                # ウィンドウの端をドラッグすると毎秒何十回も届くので、止まってから1回だけ反映する
+                self.pending_resize = (event.w, event.h)
+                self.resize_deadline = self.get_ticks() + RESIZE_DEBOUNCE_MS
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     if self.state == STATE_PACK_OPENING and self.pack_opening:
                         self.pack_opening.handle_mouse_click(event.pos)
 
+            elif event.type == pygame.MOUSEWHEEL:
+                if self.state == STATE_CARD_COLLECTION and self.pack_opening:
+                    self.pack_opening.scroll_collection(-event.y * int(40 * self._get_scale()))
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                self.profiler.dump()
+
             elif event.type == pygame.KEYDOWN:
                 if self.state == STATE_START:
                     if event.key == pygame.K_SPACE:
@@ -128,10 +278,38 @@ class Game:
                     if event.key == pygame.K_SPACE:
                         self._back_to_start()
 
+        if self.pending_resize and self.get_ticks() >= self.resize_deadline:
+            self.resize(*self.pending_resize)
+
+    def resize(self, width, height):
+        """画面サイズを変える（パックの配置・破壊状態・画像はそのままで大きさを合わせる）"""
+        self.pending_resize = None
+        if (width, height) == (self.screen_width, self.screen_height):
+            return
+        old_scale = self._get_scale()
+        self.screen_width = width
+        self.screen_height = height
+        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.RESIZABLE)
+        scale = self._get_scale()
+
+        # スケールが変わったら描画済みテキストとアトラスを破棄
+        if scale != old_scale:
+            text_cache.clear()
+            glyph_atlases.clear()
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
+
+        self.crosshair.update_screen_size(self.screen_width, self.screen_height)
+        self._rescale_card_packs()
+        if self.pack_opening:
+            self.pack_opening.resize(self.screen_width, self.screen_height)
+
     def _start_game(self):
         """ゲームを開始"""
+        # 読み込みが間に合っていなければここで待つ
+        self._finish_startup(wait=True)
         self.state = STATE_SHOOTING
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = self.get_ticks()
 
     def _reset_game(self):
         """ゲーム状態をリセット"""
@@ -154,48 +332,79 @@ class Game:
             self.ammo -= 1
             crosshair_rect = self.crosshair.get_rect()
 
-            for pack in self.card_packs:
-                if pack.destroyed:
-                    continue
-
-                if crosshair_rect.colliderect(pack.get_rect()):
-                    pack.destroy()
-                    scale = self._get_scale()
-                    effect_x = pack.x + pack.width // 2
-                    effect_y = pack.y + pack.height // 2
-                    self.hit_effects.append(HitEffect(effect_x, effect_y, scale))
-                    break
+            pack = self._find_hit_pack(crosshair_rect)
+            if pack:
+                pack.destroy()
+                self.pack_index.remove(pack)
+                self.destroyed_count += 1
+                scale = self._get_scale()
+                effect_x = pack.x + pack.width // 2
+                effect_y = pack.y + pack.height // 2
+                self.hit_effects.spawn(effect_x, effect_y, scale)
+
+    def _find_hit_pack(self, rect):
+        """矩形に重なる残っているパックのうち配置順で最初のものを返す"""
+        if self.swarm:
+            index = self.swarm.hit_test(rect)
+            return self.card_packs[index] if index >= 0 else None
+
+        # 空間インデックスで候補を絞る
+        for pack in self.pack_index.query(rect):
+            if rect.colliderect(pack.get_rect()):
+                return pack
+        return None
 
     def _restart(self):
         """ゲームを再開"""
         self._reset_game()
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = self.get_ticks()
         self.state = STATE_SHOOTING
 
+    def step(self, frame_ms):
+        """1フレーム分の実時間を進め、必要な回数だけupdateを呼ぶ"""
+        for _ in range(self.sim_clock.advance(frame_ms)):
+            self.sim_clock.tick()
+            self.update()
+
     def update(self):
-        """ゲーム状態の更新"""
-        keys = pygame.key.get_pressed()
+        """ゲーム状態の更新（シミュレーション1ステップ分）"""
+        keys = self.get_pressed_keys()
 
         if self.state == STATE_SHOOTING:
             self.crosshair.update(keys)
 
-            for pack in self.card_packs:
-                pack.update()
+            with self.profiler.section("update.packs"):
+                if self.swarm:
+                    self.swarm.step()
+                else:
+                    pack_index = self.pack_index
+                    for pack in self.card_packs:
+                        if not pack.destroyed:
+                            pack.update()
+                            pack_index.update(pack, pack.get_rect())
 
-            for effect in self.hit_effects[:]:
-                effect.update()
-                if not effect.active:
-                    self.hit_effects.remove(effect)
+            with self.profiler.section("update.effects"):
+                self.hit_effects.update()
 
             self._check_game_over()
 
         elif self.state == STATE_PACK_OPENING:
             if self.pack_opening:
-                self.pack_opening.handle_input(keys)
+                with self.profiler.section("update.pack_opening"):
+                    self.pack_opening.handle_input(keys)
+
+        elif self.state == STATE_CARD_COLLECTION:
+            # 上下キーで獲得カード一覧をスクロール
+            if self.pack_opening:
+                scroll_speed = max(1, int(8 * self._get_scale()))
+                if keys[pygame.K_UP]:
+                    self.pack_opening.scroll_collection(-scroll_speed)
+                if keys[pygame.K_DOWN]:
+                    self.pack_opening.scroll_collection(scroll_speed)
 
     def _get_remaining_time(self):
         """残り時間を計算"""
-        elapsed_time = (pygame.time.get_ticks() - self.start_time) / 1000
+        elapsed_time = (self.get_ticks() - self.start_time) / 1000
         remaining = TIME_LIMIT - elapsed_time
         return max(0, remaining)
 
@@ -203,10 +412,10 @@ class Game:
         """ゲームオーバー条件をチェック"""
         shooting_ended = False
 
-        all_destroyed = all(pack.destroyed for pack in self.card_packs)
+        all_destroyed = self.destroyed_count == len(self.card_packs)
         if all_destroyed:
             self.is_cleared = True
-            elapsed_time = (pygame.time.get_ticks() - self.start_time) / 1000
+            elapsed_time = (self.get_ticks() - self.start_time) / 1000
             self.clear_time = elapsed_time
             shooting_ended = True
 
@@ -217,11 +426,10 @@ class Game:
             shooting_ended = True
 
         if shooting_ended:
-            destroyed_count = sum(1 for pack in self.card_packs if pack.destroyed)
-            if destroyed_count > 0:
+            if self.destroyed_count > 0:
                 self.pack_opening = PackOpening(
-                    destroyed_count, self.screen_width, self.screen_height,
-                    self.card_image_files, self.pack_image_files
+                    self.destroyed_count, self.screen_width, self.screen_height,
+                    self.card_image_files, self.pack_image_files, self.card_catalog
                 )
                 self.state = STATE_PACK_OPENING
             else:
@@ -229,34 +437,71 @@ class Game:
 
     def draw(self):
         """画面描画"""
-        if self.state == STATE_START:
-            self._draw_start()
-
-        elif self.state == STATE_SHOOTING:
-            self.screen.fill(BLACK)
+        if self.dirty_renderer:
+            # スウォームモードは要素が多すぎるので全画面で描く
+            if self.state == STATE_SHOOTING and not self.profiler.show_overlay and not self.swarm:
+                # 差分描画: 変化した範囲だけを描き直して反映する
+                with self.profiler.section("draw.shooting"):
+                    rects = self.dirty_renderer.render(self.screen, self._shooting_drawables(self.sim_clock.alpha))
+                with self.profiler.section("draw.present"):
+                    pygame.display.update(rects)
+                return
+            self.dirty_renderer.invalidate()
+
+        # 前ステップと現ステップの間を補間して描く
+        alpha = self.sim_clock.alpha
+
+        with self.profiler.section(f"draw.{self.state}"):
+            if self.state == STATE_START:
+                self._draw_start()
+
+            elif self.state == STATE_SHOOTING:
+                self.screen.fill(BLACK)
+
+                if self.swarm:
+                    self.swarm.draw(self.screen, alpha)
+                else:
+                    for pack in self.card_packs:
+                        pack.draw(self.screen, alpha)
+
+                self.hit_effects.draw(self.screen, alpha)
+
+                self.crosshair.draw(self.screen, alpha)
+                self._draw_ui()
+
+            elif self.state == STATE_PACK_OPENING:
+                if self.pack_opening:
+                    self.pack_opening.draw(self.screen)
 
-            for pack in self.card_packs:
-                pack.draw(self.screen)
+            elif self.state == STATE_CARD_COLLECTION:
+                if self.pack_opening:
+                    self.pack_opening.draw_card_collection(self.screen)
 
-            for effect in self.hit_effects:
-                effect.draw(self.screen)
+            elif self.state == STATE_RESULT:
+                self.screen.fill(BLACK)
+                self._draw_game_over()
 
-            self.crosshair.draw(self.screen)
-            self._draw_ui()
+        self.profiler.draw_overlay(self.screen, get_japanese_font(14))
 
-        elif self.state == STATE_PACK_OPENING:
-            if self.pack_opening:
-                self.pack_opening.draw(self.screen)
+        with self.profiler.section("draw.present"):
+            pygame.display.flip()
 
-        elif self.state == STATE_CARD_COLLECTION:
-            if self.pack_opening:
-                self.pack_opening.draw_card_collection(self.screen)
+    def _shooting_drawables(self, alpha=1.0):
+        """射撃シーンの描画要素を描画順に (キー, 描画範囲, 状態, 描画関数) で返す"""
+        drawables = []
+        for i, pack in enumerate(self.card_packs):
+            if not pack.destroyed:
+                draw = lambda screen, pack=pack: pack.draw(screen, alpha)
+                drawables.append((("pack", i), pack.get_draw_rect(alpha), None, draw))
 
-        elif self.state == STATE_RESULT:
-            self.screen.fill(BLACK)
-            self._draw_game_over()
+        for effect in self.hit_effects:
+            draw = lambda screen, effect=effect: effect.draw(screen, alpha)
+            drawables.append((("effect", id(effect)), effect.get_draw_rect(alpha), effect.age, draw))
 
-        pygame.display.flip()
+        draw = lambda screen: self.crosshair.draw(screen, alpha)
+        drawables.append(("crosshair", self.crosshair.get_draw_rect(alpha), None, draw))
+        drawables.extend(self._ui_drawables())
+        return drawables
 
     def _draw_start(self):
         """スタート画面を描画"""
@@ -265,7 +510,7 @@ class Game:
 
         # タイトル
         title_font = get_japanese_font(int(40 * scale))
-        title_text = title_font.render("カードパックをうちおとせ！", True, YELLOW)
+        title_text = render_text(title_font, "カードパックをうちおとせ！", YELLOW)
         title_rect = title_text.get_rect(center=(self.screen_width // 2, int(80 * scale)))
         self.screen.blit(title_text, title_rect)
 
@@ -281,7 +526,7 @@ class Game:
             "あてたパックのカードがもらえるよ",
             "",
             f"たまは {INITIAL_AMMO}こ、じかんは {TIME_LIMIT}びょう",
-            f"ぜんぶで {CARD_PACKS_COUNT}このパックがあるよ",
+            f"ぜんぶで {self.pack_count}このパックがあるよ",
         ]
 
         start_y = int(150 * scale)
@@ -293,42 +538,56 @@ class Game:
                 continue
             else:
                 color = WHITE
-            rule_text = rule_font.render(rule, True, color)
+            rule_text = render_text(rule_font, rule, color)
             rule_rect = rule_text.get_rect(center=(self.screen_width // 2, start_y + i * line_height))
             self.screen.blit(rule_text, rule_rect)
 
-        # スタート案内
+        # スタート案内（起動時の読み込み中はそれを表示する）
         start_font = get_japanese_font(int(24 * scale))
-        start_text = start_font.render("スペースキーでスタート！", True, GREEN)
+        if self._startup_future is not None and not self._startup_future.done():
+            start_text = render_text(start_font, "じゅんびちゅう...", WHITE)
+        else:
+            start_text = render_text(start_font, "スペースキーでスタート！", GREEN)
         start_rect = start_text.get_rect(center=(self.screen_width // 2, self.screen_height - int(60 * scale)))
         self.screen.blit(start_text, start_rect)
 
     def _draw_ui(self):
         """UI要素を描画"""
+        for _, _, _, draw in self._ui_drawables():
+            draw(self.screen)
+
+    def _ui_drawables(self):
+        """UI要素を (キー, 描画範囲, 状態, 描画関数) のリストで返す"""
         scale = self._get_scale()
         jp_font = get_japanese_font(int(22 * scale))
         line_height = int(30 * scale)
 
         # 残弾数
-        ammo_text = jp_font.render(f"のこりのたま: {self.ammo}", True, WHITE)
-        self.screen.blit(ammo_text, (10, 10))
+        ammo_line = (f"のこりのたま: {self.ammo}", WHITE)
 
         # 破壊したパック数
-        destroyed = sum(1 for pack in self.card_packs if pack.destroyed)
-        packs_text = jp_font.render(f"ゲットしたパック: {destroyed}/{CARD_PACKS_COUNT}", True, WHITE)
-        self.screen.blit(packs_text, (10, 10 + line_height))
+        destroyed = self.destroyed_count
+        packs_line = (f"ゲットしたパック: {destroyed}/{len(self.card_packs)}", WHITE)
 
         # 残り時間
         remaining_time = self._get_remaining_time()
         time_color = RED if remaining_time <= 10 else WHITE
-        time_text = jp_font.render(f"のこりじかん: {remaining_time:.1f}びょう", True, time_color)
-        self.screen.blit(time_text, (10, 10 + line_height * 2))
+        time_line = (f"のこりじかん: {remaining_time:.1f}びょう", time_color)
+
+        # 頻繁に変わる文字列はグリフアトラスで描画
+        drawables = []
+        for i, (text, color) in enumerate([ammo_line, packs_line, time_line]):
+            pos = (10, 10 + line_height * i)
+            rect = glyph_atlases.text_rect(jp_font, text, color, pos)
+            draw = lambda screen, text=text, color=color, pos=pos: glyph_atlases.draw_text(screen, jp_font, text, color, pos)
+            drawables.append((("hud", i), rect, (text, color), draw))
 
         # 操作説明
         help_font = get_japanese_font(int(18 * scale))
-        help_text = help_font.render("やじるしキー: うごく  スペース: うつ", True, YELLOW)
+        help_text = render_text(help_font, "やじるしキー: うごく  スペース: うつ", YELLOW)
         help_rect = help_text.get_rect(center=(self.screen_width // 2, self.screen_height - int(20 * scale)))
-        self.screen.blit(help_text, help_rect)
+        drawables.append(("help", help_rect, None, lambda screen: screen.blit(help_text, help_rect)))
+        return drawables
 
     def _draw_game_over(self):
         """ゲームオーバー画面を描画"""
@@ -344,16 +603,16 @@ class Game:
 
         # タイトル
         if self.is_cleared:
-            title_text = jp_big_font.render("クリア！やったね！", True, GREEN)
+            title_text = render_text(jp_big_font, "クリア！やったね！", GREEN)
         else:
-            title_text = jp_big_font.render("ざんねん！", True, RED)
+            title_text = render_text(jp_big_font, "ざんねん！", RED)
         title_rect = title_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 - 50))
         self.screen.blit(title_text, title_rect)
 
         # 結果
-        destroyed = sum(1 for pack in self.card_packs if pack.destroyed)
+        destroyed = self.destroyed_count
         result_text = jp_font.render(
-            f"ゲットしたパック: {destroyed}こ / {CARD_PACKS_COUNT}こ",
+            f"ゲットしたパック: {destroyed}こ / {len(self.card_packs)}こ",
             True, WHITE
         )
         result_rect = result_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 20))
@@ -372,16 +631,26 @@ class Game:
             restart_y = self.screen_height // 2 + 70
 
         # リスタート案内
-        restart_text = jp_font.render("Rキーでもういちどあそぶ", True, YELLOW)
+        restart_text = render_text(jp_font, "Rキーでもういちどあそぶ", YELLOW)
         restart_rect = restart_text.get_rect(center=(self.screen_width // 2, restart_y))
         self.screen.blit(restart_text, restart_rect)
 
     def run(self):
         """メインゲームループ"""
+        profiler = self.profiler
+        frame_ms = self.sim_clock.step_ms
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            with profiler.section("frame"):
+                with profiler.section("handle_events"):
+                    self.handle_events()
+                with profiler.section("update"):
+                    self.step(frame_ms)
+                with profiler.section("draw"):
+                    self.draw()
+            with profiler.section("tick"):
+                frame_ms = self.clock.tick(FPS)
+            profiler.end_frame()
+            # 最初のフレームの時刻だけが記録される
+            startup_profile.mark_first_frame()
 
         pygame.quit()
@@ -1,187 +1,332 @@
-import pygame
+import argparse
+import math
+import multiprocessing
 import os
-import random
-
-def generate_pack_images():
-    """カードパック画像を生成する"""
-    pygame.init()
-
-    # imagesフォルダを作成
-    images_dir = "images"
-    if not os.path.exists(images_dir):
-        os.makedirs(images_dir)
-        print(f"フォルダを作成しました: {images_dir}")
-
-    # パックの種類と色を定義
-    packs = [
-        {"name": "charizard", "base_color": (255, 100, 50), "accent": (255, 200, 0), "label": "リザードン"},
-        {"name": "pikachu", "base_color": (255, 220, 50), "accent": (255, 150, 50), "label": "ピカチュウ"},
-        {"name": "mewtwo", "base_color": (180, 100, 255), "accent": (255, 100, 255), "label": "ミュウツー"},
-        {"name": "mew", "base_color": (255, 150, 200), "accent": (255, 200, 230), "label": "ミュウ"},
-        {"name": "gyarados", "base_color": (50, 100, 200), "accent": (100, 200, 255), "label": "ギャラドス"},
-        {"name": "dragonite", "base_color": (255, 180, 100), "accent": (255, 220, 150), "label": "カイリュー"},
-        {"name": "snorlax", "base_color": (100, 150, 180), "accent": (200, 230, 255), "label": "カビゴン"},
-        {"name": "gengar", "base_color": (100, 50, 150), "accent": (180, 100, 255), "label": "ゲンガー"},
-        {"name": "eevee", "base_color": (180, 150, 100), "accent": (230, 200, 150), "label": "イーブイ"},
-        {"name": "lucario", "base_color": (50, 100, 180), "accent": (100, 180, 255), "label": "ルカリオ"},
-    ]
-
-    # パック画像のサイズ
-    width = 200
-    height = 280
-
-    generated_count = 0
-
-    for i, pack in enumerate(packs):
-        # パック画像を作成
-        surface = pygame.Surface((width, height))
-
-        # 背景グラデーション
-        base_color = pack["base_color"]
-        for y in range(height):
-            factor = y / height
-            # グラデーション効果
-            r = int(base_color[0] * (1 - factor * 0.3))
-            g = int(base_color[1] * (1 - factor * 0.3))
-            b = int(base_color[2] * (1 - factor * 0.3))
-            pygame.draw.line(surface, (r, g, b), (0, y), (width, y))
-
-        # 外枠
-        pygame.draw.rect(surface, (50, 50, 50), (0, 0, width, height), 4)
-
-        # アクセントカラーの装飾
-        accent = pack["accent"]
-
-        # 上部の装飾バー
-        pygame.draw.rect(surface, accent, (10, 10, width - 20, 30))
-        pygame.draw.rect(surface, (255, 255, 255), (10, 10, width - 20, 30), 2)
-
-        # 中央のダイヤモンド形状
-        center_x = width // 2
-        center_y = height // 2
-        diamond_size = 60
-        diamond_points = [
-            (center_x, center_y - diamond_size),
-            (center_x + diamond_size, center_y),
-            (center_x, center_y + diamond_size),
-            (center_x - diamond_size, center_y)
-        ]
-        pygame.draw.polygon(surface, accent, diamond_points)
-        pygame.draw.polygon(surface, (255, 255, 255), diamond_points, 3)
-
-        # 内側の光沢効果
-        inner_diamond_size = 40
-        inner_points = [
-            (center_x, center_y - inner_diamond_size),
-            (center_x + inner_diamond_size, center_y),
-            (center_x, center_y + inner_diamond_size),
-            (center_x - inner_diamond_size, center_y)
-        ]
-        highlight_color = (
-            min(255, accent[0] + 50),
-            min(255, accent[1] + 50),
-            min(255, accent[2] + 50)
-        )
-        pygame.draw.polygon(surface, highlight_color, inner_points)
-
-        # 下部の装飾バー
-        pygame.draw.rect(surface, accent, (10, height - 40, width - 20, 30))
-        pygame.draw.rect(surface, (255, 255, 255), (10, height - 40, width - 20, 30), 2)
-
-        # 角の装飾
-        corner_size = 15
-        for corner_x, corner_y in [(10, 50), (width - 25, 50), (10, height - 65), (width - 25, height - 65)]:
-            pygame.draw.rect(surface, (255, 255, 255, 128), (corner_x, corner_y, corner_size, corner_size), 2)
-
-        # 光沢効果（斜めのライン）
-        for offset in range(0, width + height, 30):
-            start_x = offset
-            start_y = 0
-            end_x = offset - height
-            end_y = height
-            if start_x > width:
-                start_y = start_x - width
-                start_x = width
-            if end_x < 0:
-                end_y = height + end_x
-                end_x = 0
-            pygame.draw.line(surface, (255, 255, 255, 50), (start_x, start_y), (end_x, end_y), 1)
-
-        # ファイル名を生成して保存
-        filename = f"pack_{i+1:03d}_{pack['name']}.png"
-        filepath = os.path.join(images_dir, filename)
-
-        pygame.image.save(surface, filepath)
-        generated_count += 1
-        print(f"生成完了: {filepath} ({pack['label']})")
-
-    # 追加のバリエーションを生成（異なるパターン）
-    additional_packs = [
-        {"name": "fire", "base_color": (200, 50, 30), "accent": (255, 150, 0)},
-        {"name": "water", "base_color": (30, 100, 200), "accent": (100, 200, 255)},
-        {"name": "grass", "base_color": (50, 150, 50), "accent": (150, 255, 100)},
-        {"name": "electric", "base_color": (255, 200, 0), "accent": (255, 255, 100)},
-        {"name": "psychic", "base_color": (200, 50, 150), "accent": (255, 150, 200)},
-        {"name": "fighting", "base_color": (180, 100, 50), "accent": (255, 180, 100)},
-        {"name": "dark", "base_color": (50, 50, 80), "accent": (100, 100, 150)},
-        {"name": "steel", "base_color": (150, 150, 180), "accent": (200, 200, 230)},
-        {"name": "dragon", "base_color": (100, 50, 200), "accent": (150, 100, 255)},
-        {"name": "fairy", "base_color": (255, 150, 200), "accent": (255, 200, 230)},
-    ]
-
-    for i, pack in enumerate(additional_packs):
-        surface = pygame.Surface((width, height))
-
-        # 背景
-        base_color = pack["base_color"]
-        surface.fill(base_color)
-
-        # 円形グラデーション効果
-        for radius in range(min(width, height) // 2, 0, -5):
-            factor = radius / (min(width, height) // 2)
-            r = int(base_color[0] + (255 - base_color[0]) * (1 - factor) * 0.3)
-            g = int(base_color[1] + (255 - base_color[1]) * (1 - factor) * 0.3)
-            b = int(base_color[2] + (255 - base_color[2]) * (1 - factor) * 0.3)
-            pygame.draw.circle(surface, (r, g, b), (width // 2, height // 2), radius)
-
-        # 外枠
-        pygame.draw.rect(surface, (30, 30, 30), (0, 0, width, height), 5)
-
-        # 上部装飾
-        accent = pack["accent"]
-        pygame.draw.rect(surface, accent, (15, 15, width - 30, 25))
-
-        # 中央の星形
-        center_x = width // 2
-        center_y = height // 2
-        star_points = []
-        for j in range(10):
-            angle = j * 36 - 90
-            if j % 2 == 0:
-                r = 50
-            else:
-                r = 25
-            import math
-            x = center_x + r * math.cos(math.radians(angle))
-            y = center_y + r * math.sin(math.radians(angle))
-            star_points.append((x, y))
-        pygame.draw.polygon(surface, accent, star_points)
-        pygame.draw.polygon(surface, (255, 255, 255), star_points, 2)
-
-        # 下部装飾
-        pygame.draw.rect(surface, accent, (15, height - 40, width - 30, 25))
-
-        # ファイル保存
-        filename = f"pack_{len(packs) + i + 1:03d}_{pack['name']}.png"
-        filepath = os.path.join(images_dir, filename)
-
-        pygame.image.save(surface, filepath)
-        generated_count += 1
-        print(f"生成完了: {filepath}")
-
-    pygame.quit()
-    print(f"\n完了: {generated_count} 枚のパック画像を生成しました")
-    return generated_count
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from constants import BAKED_ASSETS_DIR, BAKED_ATLAS_FILE
+from bake_assets import DEFAULT_SCALES, PACK_ROLES, baked_path, load_index, plan_sizes, save_index
+from texture_atlas import build_atlas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# デザインの基準の大きさ（座標はこの大きさで決め、出力の大きさに合わせて伸縮する）
+BASE_WIDTH = 200
+BASE_HEIGHT = 280
+PACK_IMAGES_DIR = "pack_images"
+# 1つのワーカーにまとめて渡す枚数
+CHUNK_SIZE = 16
+
+# テーマごとの配色（名前, 基本色, アクセント色）
+THEMES = {
+    "classic": [
+        ("charizard", (255, 100, 50), (255, 200, 0)),
+        ("pikachu", (255, 220, 50), (255, 150, 50)),
+        ("mewtwo", (180, 100, 255), (255, 100, 255)),
+        ("mew", (255, 150, 200), (255, 200, 230)),
+        ("gyarados", (50, 100, 200), (100, 200, 255)),
+        ("dragonite", (255, 180, 100), (255, 220, 150)),
+        ("snorlax", (100, 150, 180), (200, 230, 255)),
+        ("gengar", (100, 50, 150), (180, 100, 255)),
+        ("eevee", (180, 150, 100), (230, 200, 150)),
+        ("lucario", (50, 100, 180), (100, 180, 255)),
+    ],
+    "type": [
+        ("fire", (200, 50, 30), (255, 150, 0)),
+        ("water", (30, 100, 200), (100, 200, 255)),
+        ("grass", (50, 150, 50), (150, 255, 100)),
+        ("electric", (255, 200, 0), (255, 255, 100)),
+        ("psychic", (200, 50, 150), (255, 150, 200)),
+        ("fighting", (180, 100, 50), (255, 180, 100)),
+        ("dark", (50, 50, 80), (100, 100, 150)),
+        ("steel", (150, 150, 180), (200, 200, 230)),
+        ("dragon", (100, 50, 200), (150, 100, 255)),
+        ("fairy", (255, 150, 200), (255, 200, 230)),
+    ],
+    "spring": [
+        ("sakura", (250, 170, 200), (255, 230, 240)),
+        ("wakaba", (120, 200, 90), (220, 255, 170)),
+        ("nanohana", (240, 220, 60), (255, 250, 190)),
+    ],
+    "summer": [
+        ("umi", (20, 120, 210), (120, 230, 255)),
+        ("hanabi", (40, 30, 90), (255, 120, 60)),
+        ("himawari", (255, 190, 20), (255, 240, 120)),
+    ],
+    "autumn": [
+        ("momiji", (200, 60, 30), (255, 170, 60)),
+        ("kuri", (130, 80, 40), (220, 170, 110)),
+        ("tsukimi", (40, 50, 100), (255, 230, 150)),
+    ],
+    "winter": [
+        ("yuki", (170, 200, 230), (255, 255, 255)),
+        ("hiiragi", (30, 110, 60), (220, 40, 50)),
+        ("kouri", (60, 120, 170), (200, 240, 255)),
+    ],
+}
+# 中央の模様（ひし形は縦のグラデーション、星形は円形のグラデーションと組み合わせる）
+STYLES = ("diamond", "star")
+
+
+def pack_design(seed, index, theme="all"):
+    """index 番目のパックのデザイン（色や模様の大きさ）を決める
+
+    同じ seed と index なら、どのワーカーで作っても同じデザインになる。
+    """
+    palettes = [palette for name, palettes in THEMES.items() if theme in ("all", name) for palette in palettes]
+    if not palettes:
+        raise ValueError(f"不明なテーマです: {theme}")
+    rng = np.random.default_rng([seed, index])
+    # 最初の一巡は配色を順番に使い、全色がそろうようにする
+    name, base, accent = palettes[index % len(palettes)]
+    if index >= len(palettes):
+        jitter = rng.uniform(0.85, 1.15, 3)
+        base = tuple(int(min(255, c * j)) for c, j in zip(base, jitter))
+    return {
+        "name": name,
+        "style": STYLES[(index // len(palettes) + int(rng.integers(2))) % len(STYLES)],
+        "base": base,
+        "accent": accent,
+        "emblem": float(rng.uniform(45, 65)),
+        "points": int(rng.integers(4, 8)),
+        "gloss_spacing": float(rng.uniform(22, 38)),
+        "gloss_center": float(rng.uniform(0.25, 0.55)),
+        "gloss_strength": float(rng.uniform(0.15, 0.35)),
+    }
+
+
+def _grid(width, height):
+    """基準の大きさで測った各画素の中心の座標（surfarray と同じ (x, y) の順）"""
+    x = (np.arange(width, dtype=np.float32) + 0.5) * (BASE_WIDTH / width)
+    y = (np.arange(height, dtype=np.float32) + 0.5) * (BASE_HEIGHT / height)
+    return x[:, None], y[None, :]
+
+
+def _shade(weight, color, target):
+    """0〜1 の重みの配列から、color と target を混ぜた色の配列（幅 x 高さ x 3, uint8）を作る
+
+    重みを256段階にして色の表を引くので、3色ぶんの浮動小数点演算をしなくてよい。
+    表の1色を4バイトの整数にまとめておくと、1画素を1回で引ける。
+    """
+    levels = np.linspace(0, 1, 256, dtype=np.float32)[:, None]
+    color = np.asarray(color, dtype=np.float32)
+    table = np.zeros((256, 4), dtype=np.uint8)
+    table[:, :3] = color + (np.asarray(target, dtype=np.float32) - color) * levels
+    packed = np.take(table.view(np.uint32).ravel(), (weight * 255 + 0.5).astype(np.uint8))
+    return packed.view(np.uint8).reshape(weight.shape + (4,))[:, :, :3]
+
+
+def linear_gradient(width, height, color, darken=0.3):
+    """上から下へ暗くなるグラデーション（幅 x 高さ x 3 の配列）"""
+    factor = 1 - np.arange(height, dtype=np.float32) / height * darken
+    rows = (factor[:, None] * np.asarray(color, dtype=np.float32)).astype(np.uint8)
+    return np.broadcast_to(rows[None, :, :], (width, height, 3))
+
+
+def radial_gradient(width, height, color, lighten=0.3):
+    """中心ほど明るくなる円形のグラデーション（幅 x 高さ x 3 の配列）"""
+    x, y = _grid(width, height)
+    radius = min(BASE_WIDTH, BASE_HEIGHT) / 2
+    distance = np.sqrt((x - BASE_WIDTH / 2) ** 2 + (y - BASE_HEIGHT / 2) ** 2) * np.float32(1 / radius)
+    center_color = tuple(c + (255 - c) * lighten for c in color)
+    return _shade(1 - np.minimum(distance, 1), color, center_color)
+
+
+def gloss_alpha(width, height, spacing=30, center=0.4, strength=0.25):
+    """斜めの細い光沢線と、やわらかい反射の帯の不透明度（幅 x 高さ, uint8）"""
+    x, y = _grid(width, height)
+    diagonal = x + y
+    # 線の太さは出力の1画素ぶん（np.mod より floor の方が速い）
+    line_width = BASE_WIDTH / width
+    lines = (diagonal - spacing * np.floor(diagonal / spacing) < line_width) * np.float32(50)
+    band = np.exp(-((diagonal / (BASE_WIDTH + BASE_HEIGHT) - center) / 0.08) ** 2) * np.float32(255 * strength)
+    return np.maximum(lines, band).astype(np.uint8)
+
+
+def render_pack(design, size=(BASE_WIDTH, BASE_HEIGHT)):
+    """デザインを size の大きさで描く（縮小せずに直接その大きさで描く）"""
+    width, height = size
+    sx = width / BASE_WIDTH
+    sy = height / BASE_HEIGHT
+
+    def point(x, y):
+        return (round(x * sx), round(y * sy))
+
+    def rect(x, y, w, h):
+        return pygame.Rect(point(x, y), (max(1, round(w * sx)), max(1, round(h * sy))))
+
+    def thickness(value):
+        return max(1, round(value * min(sx, sy)))
+
+    surface = pygame.Surface((width, height), 0, 24)
+    base = design["base"]
+    accent = design["accent"]
+    if design["style"] == "diamond":
+        background = linear_gradient(width, height, base)
+    else:
+        background = radial_gradient(width, height, base)
+    pygame.surfarray.blit_array(surface, background)
+
+    # 上下の装飾バー
+    for bar in (rect(10, 10, BASE_WIDTH - 20, 30), rect(10, BASE_HEIGHT - 40, BASE_WIDTH - 20, 30)):
+        pygame.draw.rect(surface, accent, bar)
+        pygame.draw.rect(surface, (255, 255, 255), bar, thickness(2))
+
+    # 中央の模様
+    cx, cy = BASE_WIDTH / 2, BASE_HEIGHT / 2
+    emblem = design["emblem"]
+    if design["style"] == "diamond":
+        outer = [point(cx, cy - emblem), point(cx + emblem, cy), point(cx, cy + emblem), point(cx - emblem, cy)]
+        inner_size = emblem * 2 / 3
+        inner = [point(cx, cy - inner_size), point(cx + inner_size, cy),
+                 point(cx, cy + inner_size), point(cx - inner_size, cy)]
+        pygame.draw.polygon(surface, accent, outer)
+        pygame.draw.polygon(surface, (255, 255, 255), outer, thickness(3))
+        pygame.draw.polygon(surface, tuple(min(255, c + 50) for c in accent), inner)
+    else:
+        count = design["points"]
+        star = []
+        for j in range(count * 2):
+            angle = math.radians(j * 180 / count - 90)
+            radius = emblem if j % 2 == 0 else emblem / 2
+            star.append(point(cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+        pygame.draw.polygon(surface, accent, star)
+        pygame.draw.polygon(surface, (255, 255, 255), star, thickness(2))
+
+    # 角の装飾
+    for corner_x, corner_y in [(10, 50), (BASE_WIDTH - 25, 50), (10, BASE_HEIGHT - 65), (BASE_WIDTH - 25, BASE_HEIGHT - 65)]:
+        pygame.draw.rect(surface, (255, 255, 255), rect(corner_x, corner_y, 15, 15), thickness(2))
+
+    # 光沢は模様の上から重ねる（不透明度だけを配列で作り、合成は blit に任せる）
+    gloss = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+    gloss.fill((255, 255, 255, 0))
+    alpha = pygame.surfarray.pixels_alpha(gloss)
+    alpha[...] = gloss_alpha(width, height, design["gloss_spacing"], design["gloss_center"], design["gloss_strength"])
+    del alpha
+    surface.blit(gloss, (0, 0))
+
+    # 外枠
+    pygame.draw.rect(surface, (50, 50, 50), (0, 0, width, height), thickness(4))
+    return surface
+
+
+def pack_filename(index, design):
+    return f"pack_{index + 1:05d}_{design['name']}.png"
+
+
+def _save(surface, path):
+    """書きかけのファイルを読まれないよう、一時ファイルに書いてから置き換える
+
+    一時ファイルは . で始めて、ゲームの画像探し（glob）に拾われないようにする。
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.tmp.png")
+    pygame.image.save(surface, temp_path)
+    os.replace(temp_path, path)
+
+
+def generate_one(seed, index, theme, size, output_dir, baked_dir=None, scales=DEFAULT_SCALES):
+    """1枚のパック画像を書き出す（ワーカープロセスで実行）
+
+    baked_dir を指定すると、ゲームで使う大きさの画像も縮小せずに直接描いて書き出し、
+    焼き込みインデックスの項目を返す。
+    """
+    design = pack_design(seed, index, theme)
+    path = os.path.join(output_dir, pack_filename(index, design))
+    _save(render_pack(design, size), path)
+    if baked_dir is None:
+        return path, None
+
+    # 縮小画像は元画像より後に書く（元画像より古いと作り直しの対象になる）
+    variants = []
+    for variant_size in plan_sizes(size, PACK_ROLES, scales):
+        variant_path = baked_path(baked_dir, path, variant_size)
+        os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+        _save(render_pack(design, variant_size), variant_path)
+        variants.append({"path": variant_path, "size": list(variant_size)})
+    entry = {"mtime_ns": os.stat(path).st_mtime_ns, "size": list(size), "variants": variants}
+    return path, entry
+
+
+def _generate_chunk(seed, indices, theme, size, output_dir, baked_dir, scales):
+    return [generate_one(seed, index, theme, size, output_dir, baked_dir, scales) for index in indices]
+
+
+def generate_pack_images(count=20, seed=0, theme="all", size=(BASE_WIDTH, BASE_HEIGHT),
+                         output_dir=PACK_IMAGES_DIR, jobs=None, bake=False, baked_dir=BAKED_ASSETS_DIR,
+                         scales=DEFAULT_SCALES):
+    """パック画像を count 枚生成して output_dir に書き出し、書き出したパスのリストを返す
+
+    bake=True なら、ゲームで使う大きさの画像も直接描いて baked_dir に書き出し、
+    焼き込みインデックスとアトラスを更新する（bake_assets.py で縮小し直さなくてよい）。
+    """
+    if np is None:
+        print("パック画像の生成にはNumPyが必要です")
+        return []
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    baked = baked_dir if bake else None
+    chunks = [range(i, min(i + CHUNK_SIZE, count)) for i in range(0, count, CHUNK_SIZE)]
+
+    results = []
+    if len(chunks) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_generate_chunk, seed, chunk, theme, size, output_dir, baked, scales)
+                       for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    print(f"生成エラー: {chunk.start + 1}〜{chunk.stop} 枚目 ({e})")
+    else:
+        for chunk in chunks:
+            results.extend(_generate_chunk(seed, chunk, theme, size, output_dir, baked, scales))
+
+    if bake and results:
+        index = load_index(baked_dir)
+        for path, entry in results:
+            index[os.path.normpath(path)] = entry
+        save_index(baked_dir, index)
+        atlas_path = os.path.join(baked_dir, BAKED_ATLAS_FILE)
+        atlas_bytes = build_atlas(index, atlas_path)
+        print(f"アトラスを作成しました: {atlas_path} ({atlas_bytes / 1024 / 1024:.1f}MB)")
+
+    elapsed = time.perf_counter() - start
+    print(f"完了: {len(results)} 枚のパック画像を生成しました ({output_dir}, {elapsed:.1f}秒, "
+          f"{len(results) / max(elapsed, 1e-9):.0f} 枚/秒)")
+    return [path for path, _ in results]
+
+
+def _parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="カードパック画像を生成する")
+    parser.add_argument("--count", type=int, default=20, help="生成する枚数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種（同じ種なら同じ画像になる）")
+    parser.add_argument("--theme", default="all", choices=["all"] + list(THEMES), help="配色のテーマ")
+    parser.add_argument("--size", type=_parse_size, default=(BASE_WIDTH, BASE_HEIGHT), help="画像の大きさ（幅x高さ）")
+    parser.add_argument("--output", default=PACK_IMAGES_DIR, help="出力先フォルダ")
+    parser.add_argument("--jobs", type=int, default=None, help="ワーカープロセス数（省略時はCPU数）")
+    parser.add_argument("--bake", action="store_true", help="ゲームで使う大きさの画像も直接描いて baked/ に書き出す")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("パック画像の生成にはNumPyが必要です")
+        return 1
+    generate_pack_images(args.count, args.seed, args.theme, args.size, args.output, args.jobs, args.bake)
+    return 0
+
 
 if __name__ == "__main__":
-    generate_pack_images()
+    sys.exit(main())
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+import pygame
+from font_cache import font_cache, text_cache
+
+
+# HUDで使う可変文字（数字など）と固定のひらがな・カタカナ
+HUD_GLYPHS = "0123456789.:/ のこりたまゲットしたパックじかんびょう"
+# まとめて焼き込む固定ラベル（blit回数を減らす）
+HUD_WORDS = ["のこりのたま: ", "ゲットしたパック: ", "のこりじかん: ", "びょう"]
+
+
+class GlyphAtlas:
+    """フォント1サイズ分の文字を1枚のサーフェスに焼き込んだアトラス"""
+    def __init__(self, font, color, chars=HUD_GLYPHS, words=HUD_WORDS, antialias=True):
+        self.font = font
+        self.color = color
+        self.height = font.get_height()
+        self.glyphs = {}
+        # 先頭文字 -> その文字で始まる固定ラベル（長い順）
+        self.words = {}
+
+        entries = []
+        for entry in list(words) + list(chars):
+            if entry not in entries:
+                entries.append(entry)
+        for word in sorted(words, key=len, reverse=True):
+            self.words.setdefault(word[0], []).append(word)
+
+        # 各ラベル・文字を描画して横一列に並べる
+        rendered = [(entry, font.render(entry, antialias, color)) for entry in entries]
+        total_width = max(1, sum(surface.get_width() for _, surface in rendered))
+        self.height = max([self.height] + [surface.get_height() for _, surface in rendered])
+        self.surface = pygame.Surface((total_width, max(1, self.height)), pygame.SRCALPHA)
+
+        x = 0
+        for char, surface in rendered:
+            # 透明なアトラスへはブレンドせずそのまま書き込む
+            self.surface.blit(surface, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.glyphs[char] = pygame.Rect(x, 0, surface.get_width(), surface.get_height())
+            x += surface.get_width()
+
+        # 画面があれば表示フォーマットに変換しておく（blitが速くなる）
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+    def split_text(self, text):
+        """文字列を固定ラベルと1文字ずつに分割（描画できなければNone）"""
+        parts = []
+        i = 0
+        while i < len(text):
+            for word in self.words.get(text[i], ()):
+                if text.startswith(word, i):
+                    parts.append(word)
+                    i += len(word)
+                    break
+            else:
+                if text[i] not in self.glyphs:
+                    return None
+                parts.append(text[i])
+                i += 1
+        return parts
+
+    def can_draw(self, text):
+        """アトラスだけで描画できる文字列か"""
+        return self.split_text(text) is not None
+
+    def draw(self, screen, text, pos):
+        """文字列をアトラスからまとめてblitし、描画範囲を返す"""
+        return self.draw_parts(screen, self.split_text(text), pos)
+
+    def draw_parts(self, screen, parts, pos):
+        """分割済みの文字列をアトラスからまとめてblitする"""
+        x, y = pos
+        start_x = x
+        blit_sequence = []
+        for part in parts:
+            area = self.glyphs[part]
+            blit_sequence.append((self.surface, (x, y), area))
+            x += area.width
+        screen.blits(blit_sequence, doreturn=False)
+        return pygame.Rect(start_x, y, x - start_x, self.height)
+
+
+class GlyphAtlasCache:
+    """(フォント, 色) ごとにGlyphAtlasを保持するキャッシュ
+
+    アトラスを使うのは速くなる場合だけで、それ以外は font.render の結果をテキストキャッシュから描く。
+    """
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._atlases = OrderedDict()
+
+    def get(self, font, color):
+        """アトラスを返す（なければ作成）"""
+        key = (font, tuple(color))
+        atlas = self._atlases.get(key)
+        if atlas is not None:
+            self._atlases.move_to_end(key)
+            return atlas
+
+        atlas = GlyphAtlas(font, color)
+        self._atlases[key] = atlas
+        if len(self._atlases) > self.max_entries:
+            self._atlases.popitem(last=False)
+        return atlas
+
+    def uses_atlas(self, font, text):
+        """アトラスで描いた方が速い文字列か
+
+        1文字ずつの blit はカーニングが効かず、欧文フォントではどの大きさでもテキストキャッシュより遅い。
+        描画の重い日本語フォントで、日本語が半分以上の文字列だけアトラスを使う。
+        """
+        if font_cache.font_path() is None:
+            return False
+        cjk = sum(1 for char in text if char >= "\u3000")
+        return cjk * 2 >= len(text)
+
+    def _parts(self, font, text, color):
+        """アトラスで描くなら (アトラス, 分割した文字列)、そうでなければ (None, None)"""
+        if not self.uses_atlas(font, text):
+            return None, None
+        atlas = self.get(font, color)
+        return atlas, atlas.split_text(text)
+
+    def draw_text(self, screen, font, text, color, pos):
+        """文字列を描画（アトラスを使わないときと未登録の文字があるときはテキストキャッシュから）"""
+        atlas, parts = self._parts(font, text, color)
+        if parts is not None:
+            return atlas.draw_parts(screen, parts, pos)
+        return screen.blit(text_cache.render(font, text, color), pos)
+
+    def text_rect(self, font, text, color, pos):
+        """draw_textで描画される範囲を返す（描画はしない）"""
+        atlas, parts = self._parts(font, text, color)
+        if parts is not None:
+            width = sum(atlas.glyphs[part].width for part in parts)
+            return pygame.Rect(pos[0], pos[1], width, atlas.height)
+        return pygame.Rect(pos, text_cache.render(font, text, color).get_size())
+
+    def clear(self):
+        """キャッシュを破棄（画面スケール変更時など）"""
+        self._atlases.clear()
+
+
+# プロセス全体で共有するHUD用アトラス
+glyph_atlases = GlyphAtlasCache()
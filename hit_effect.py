@@ -1,40 +1,167 @@
+from collections import OrderedDict
 import pygame
-from constants import YELLOW
-from utils import get_japanese_font
+from constants import YELLOW, HIT_EFFECT_POOL_SIZE
+from asset_manager import to_display_format
+from utils import get_japanese_font, render_text
+
+
+# フェードアウトの各段階を縦に並べた画像（フォントサイズごと、画面スケールが変わると増える）
+_strips = OrderedDict()
+MAX_STRIPS = 4
+
+
+class _FrameStrip:
+    """「ゲット！」のフェードアウトを1フレームずつ縦に並べた画像
+
+    アルファは作るときに焼き込むので、描画はフレームの範囲を1回 blit するだけで済む。
+    """
+    def __init__(self, font_size, lifetime):
+        text = render_text(get_japanese_font(font_size), "ゲット！", YELLOW)
+        self.width, self.height = text.get_size()
+        strip = pygame.Surface((self.width, self.height * lifetime), pygame.SRCALPHA, 32)
+        self.frames = []
+        for age in range(lifetime):
+            area = pygame.Rect(0, age * self.height, self.width, self.height)
+            opacity = max(0, 255 - int(255 * age / lifetime))
+            # 透明な領域に文字をそのまま写してから、アルファだけを不透明度倍する
+            strip.blit(text, area, special_flags=pygame.BLEND_RGBA_MAX)
+            strip.fill((255, 255, 255, opacity), area, special_flags=pygame.BLEND_RGBA_MULT)
+            self.frames.append(area)
+        self.surface = to_display_format(strip)
+
+
+def frame_strip(font_size, lifetime):
+    """フォントサイズに合ったフレーム画像（最初の1回だけ作る）"""
+    key = (font_size, lifetime)
+    strip = _strips.get(key)
+    if strip is None:
+        strip = _FrameStrip(font_size, lifetime)
+        _strips[key] = strip
+        while len(_strips) > MAX_STRIPS:
+            _strips.popitem(last=False)
+    else:
+        _strips.move_to_end(key)
+    return strip
 
 
 class HitEffect:
-    """GET!表示エフェクトクラス"""
+    """GET!表示エフェクトクラス（HitEffectPool で使い回す）"""
+    LIFETIME = 60  # フレーム数
+
     def __init__(self, x, y, scale=1.0):
+        self.slot = -1  # プールの使用中リストでの位置
+        self.rect = pygame.Rect(0, 0, 0, 0)  # 描画位置（毎フレーム使い回す）
+        self.reset(x, y, scale)
+
+    @classmethod
+    def idle(cls):
+        """プール用の空きエフェクト（spawn されるまで画像は用意しない）"""
+        effect = cls.__new__(cls)
+        effect.slot = -1
+        effect.rect = pygame.Rect(0, 0, 0, 0)
+        effect.strip = None
+        effect.active = False
+        return effect
+
+    def reset(self, x, y, scale=1.0):
+        """新しいエフェクトとして初期化する"""
         self.x = x
         self.y = y
+        self.prev_y = y  # 描画補間用の前ステップの位置
         self.scale = scale
-        self.lifetime = 60  # フレーム数
+        self.lifetime = self.LIFETIME
         self.age = 0
         self.font_size = int(48 * scale)
-        self.font = get_japanese_font(self.font_size)
+        self.strip = frame_strip(self.font_size, self.lifetime)
+        self.rect.size = (self.strip.width, self.strip.height)
         self.active = True
 
     def update(self):
         """エフェクトを更新"""
         self.age += 1
+        self.prev_y = self.y
         self.y -= 2 * self.scale  # 上に浮かぶ
 
         if self.age >= self.lifetime:
             self.active = False
 
-    def draw(self, screen):
+    def render_y(self, alpha=1.0):
+        """前ステップと現ステップの間を補間した描画位置"""
+        return self.prev_y + (self.y - self.prev_y) * alpha
+
+    def _place(self, alpha):
+        # 文字の中心を (x, 補間したy) に置く
+        self.rect.center = (self.x, self.render_y(alpha))
+        return self.rect
+
+    def get_draw_rect(self, alpha=1.0):
+        """描画される範囲を返す"""
+        return self._place(alpha).copy()
+
+    def draw(self, screen, alpha=1.0):
         """エフェクトを描画"""
         if not self.active:
             return
+        # フェードアウトは焼き込み済みのフレームを選ぶだけ
+        screen.blit(self.strip.surface, self._place(alpha), self.strip.frames[self.age])
+
+
+class HitEffectPool:
+    """決まった数の HitEffect を使い回すプール
+
+    使っていないエフェクトは空きリスト（スタック）に、使用中のものは active に持つ。
+    取り出しも返却も末尾の出し入れだけなので O(1)。使用中リストからは末尾と入れ替えて外す。
+    """
+    def __init__(self, capacity=HIT_EFFECT_POOL_SIZE):
+        self.capacity = capacity
+        self.active = []
+        self._free = [HitEffect.idle() for _ in range(capacity)]
+        self.dropped = 0
 
-        # フェードアウト効果
-        alpha = max(0, 255 - int(255 * self.age / self.lifetime))
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def spawn(self, x, y, scale=1.0):
+        """エフェクトを1つ出す（全部使用中なら出さずにNone）"""
+        if not self._free:
+            self.dropped += 1
+            return None
+        effect = self._free.pop()
+        effect.reset(x, y, scale)
+        effect.slot = len(self.active)
+        self.active.append(effect)
+        return effect
+
+    def release(self, effect):
+        """エフェクトをプールに返す"""
+        last = self.active.pop()
+        if last is not effect:
+            # 末尾のエフェクトを空いた位置に移す
+            self.active[effect.slot] = last
+            last.slot = effect.slot
+        effect.slot = -1
+        effect.active = False
+        self._free.append(effect)
+
+    def update(self):
+        """全エフェクトを1ステップ進め、終わったものをプールに返す"""
+        active = self.active
+        # 後ろから回せば、入れ替えで移ってくるのは更新済みのエフェクトだけ
+        for i in range(len(active) - 1, -1, -1):
+            effect = active[i]
+            effect.update()
+            if not effect.active:
+                self.release(effect)
 
-        # テキストを描画
-        text_surface = self.font.render("ゲット！", True, YELLOW)
-        text_surface.set_alpha(alpha)
+    def draw(self, screen, alpha=1.0):
+        """使用中のエフェクトを描画（1つにつき blit 1回）"""
+        for effect in self.active:
+            effect.draw(screen, alpha)
 
-        # 中央に配置
-        text_rect = text_surface.get_rect(center=(self.x, self.y))
-        screen.blit(text_surface, text_rect)
+    def clear(self):
+        """すべてのエフェクトをプールに返す"""
+        while self.active:
+            self.release(self.active[-1])
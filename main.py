@@ -1,13 +1,35 @@
-import pygame
+from startup_profile import startup_profile
+
+startup_profile.start()
+
+import argparse
 import sys
 
-# 初期化
-pygame.init()
+with startup_profile.stage("import", "pygame"):
+    import pygame
 
-from game import Game
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="カードパックをうちおとせ！")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="起動時間の内訳（import / init / scan / decode）を表示する")
+    args = parser.parse_args(argv)
+    startup_profile.enabled = args.profile_startup
 
-if __name__ == "__main__":
+    # 使うモジュールだけ初期化する（pygame.init() はミキサーなども初期化するので遅い）
+    with startup_profile.stage("init", "pygame.display"):
+        pygame.display.init()
+    with startup_profile.stage("init", "pygame.font"):
+        pygame.font.init()
+
+    with startup_profile.stage("import", "game"):
+        from game import Game
+
+    # 画像の一覧と読み込みはスタート画面の裏で行う
     game = Game()
     game.run()
-    sys.exit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+from constants import CARD_MASTER_DATA, CARD_CATALOG_FILE, PACK_SLOT_TABLE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 同じパックに同じカードが入ったときに、同じレアリティの中で引き直す回数
+# （それでも重なったら、まだ入っていないカードから選ぶ。レアリティのカードが足りなければ重複を許す）
+MAX_REDRAWS = 16
+# シミュレーションで一度に生成するパック数（メモリ使用量は 枠数 x 8バイト x この数）
+CHUNK_PACKS = 1_000_000
+
+
+class AliasTable:
+    """Walker のエイリアス法による重みつき抽選（1回の抽選は重みの数によらず O(1)）"""
+    def __init__(self, weights):
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("重みが空です")
+        self.probabilities = [weight / total for weight in weights]
+
+        # 平均より軽いものに重いものの余りを割り当てて、各箱を「自分か、割り当てられた相手か」にする
+        scaled = [p * count for p in self.probabilities]
+        self.accept = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.accept[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.accept)
+
+    def draw(self, rng=random):
+        i = int(rng.random() * len(self.accept))
+        return i if rng.random() < self.accept[i] else self.alias[i]
+
+    def draw_many(self, count, generator):
+        """NumPyの乱数生成器で count 回まとめて抽選する"""
+        if self._arrays is None:
+            self._arrays = (np.array(self.accept, dtype=np.float32), np.array(self.alias, dtype=np.int32))
+        accept, alias = self._arrays
+        i = generator.integers(0, len(accept), size=count, dtype=np.int32)
+        return np.where(generator.random(count, dtype=np.float32) < accept[i], i, alias[i])
+
+
+class PackGenerator:
+    """レアリティの枠の表に従ってパックの中身を決める
+
+    各枠ではまずエイリアス法でレアリティを選び、そのレアリティのカードから一様に1枚選ぶ。
+    同じパックに同じカードが入ったときは、レアリティはそのままでカードだけ引き直すので、
+    レアリティごとの出現率は表のとおりになる。
+    pools は レアリティ -> カードの並び（リストや range）の辞書。
+    """
+    def __init__(self, pools, slot_table=PACK_SLOT_TABLE, unique=True):
+        self.rarities = [rarity for rarity, cards in pools.items() if len(cards)]
+        if not self.rarities:
+            raise ValueError("カードがありません")
+        self.pools = [pools[rarity] for rarity in self.rarities]
+        self.counts = [len(cards) for cards in self.pools]
+        self.offsets = [0]
+        for count in self.counts[:-1]:
+            self.offsets.append(self.offsets[-1] + count)
+        self.card_count = sum(self.counts)
+        self.unique = unique
+
+        rarity_index = {rarity: i for i, rarity in enumerate(self.rarities)}
+        self.slots = []
+        for weights in slot_table:
+            available = [(rarity_index[rarity], weight) for rarity, weight in weights.items()
+                         if rarity in rarity_index and weight > 0]
+            if not available:
+                # 表のレアリティがどれもなければ、全カードから一様に選ぶ
+                available = [(i, count) for i, count in enumerate(self.counts)]
+            rarity_ids, slot_weights = zip(*available)
+            self.slots.append((AliasTable(slot_weights), list(rarity_ids)))
+        self._arrays = None
+
+    @classmethod
+    def from_cards(cls, cards, slot_table=PACK_SLOT_TABLE, unique=True):
+        """'rarity' を持つカードの辞書のリストから作る（CARD_MASTER_DATA など）"""
+        pools = {}
+        for card in cards:
+            pools.setdefault(card.get('rarity') or "", []).append(card)
+        return cls(pools, slot_table, unique)
+
+    def card(self, index):
+        """通し番号（レアリティ順にカードを並べたときの位置）のカード"""
+        rarity = 0
+        while rarity + 1 < len(self.offsets) and self.offsets[rarity + 1] <= index:
+            rarity += 1
+        return self.pools[rarity][index - self.offsets[rarity]]
+
+    def rarity_of(self, index):
+        rarity = 0
+        while rarity + 1 < len(self.offsets) and self.offsets[rarity + 1] <= index:
+            rarity += 1
+        return self.rarities[rarity]
+
+    def slot_probabilities(self):
+        """枠ごとの {レアリティ: 確率}"""
+        return [{self.rarities[rarity_id]: p for rarity_id, p in zip(rarity_ids, table.probabilities)}
+                for table, rarity_ids in self.slots]
+
+    def expected_card_rates(self):
+        """カード1枚あたりの1パックでの期待枚数（レアリティ順）"""
+        per_rarity = [0.0] * len(self.rarities)
+        for table, rarity_ids in self.slots:
+            for rarity_id, p in zip(rarity_ids, table.probabilities):
+                per_rarity[rarity_id] += p / self.counts[rarity_id]
+        return per_rarity
+
+    def draw_indices(self, rng=random):
+        """1パック分のカードの通し番号"""
+        picks = []
+        for table, rarity_ids in self.slots:
+            rarity = rarity_ids[table.draw(rng)]
+            for _ in range(MAX_REDRAWS):
+                index = self.offsets[rarity] + int(rng.random() * self.counts[rarity])
+                if not self.unique or index not in picks:
+                    break
+            else:
+                index = self._pick_unused(rarity, picks, rng, index)
+            picks.append(index)
+        return picks
+
+    def _pick_unused(self, rarity, picks, rng, fallback):
+        """レアリティのカードのうち、まだパックに入っていないものから選ぶ（なければ fallback）"""
+        first = self.offsets[rarity]
+        unused = [index for index in range(first, first + self.counts[rarity]) if index not in picks]
+        return rng.choice(unused) if unused else fallback
+
+    def draw_pack(self, rng=random):
+        """1パック分のカード"""
+        return [self.card(index) for index in self.draw_indices(rng)]
+
+    def _arrays_for_batch(self):
+        if self._arrays is None:
+            self._arrays = (np.array(self.offsets, dtype=np.int32), np.array(self.counts, dtype=np.int32),
+                            [np.array(rarity_ids, dtype=np.int32) for _, rarity_ids in self.slots])
+        return self._arrays
+
+    def _draw_cards(self, rarity, generator):
+        """レアリティの配列に対して、それぞれのレアリティのカードを一様に選ぶ"""
+        offsets, counts, _ = self._arrays_for_batch()
+        return offsets[rarity] + (generator.random(len(rarity)) * counts[rarity]).astype(np.int32)
+
+    def draw_batch(self, packs, generator):
+        """packs 個のパックをまとめて生成し、(パック数, 枠数) の通し番号の配列を返す"""
+        if np is None:
+            raise RuntimeError("まとめて生成するにはNumPyが必要です")
+        _, _, slot_rarities = self._arrays_for_batch()
+        cards = np.empty((packs, len(self.slots)), dtype=np.int32)
+        for slot, (table, _) in enumerate(self.slots):
+            rarity = slot_rarities[slot][table.draw_many(packs, generator)]
+            cards[:, slot] = self._draw_cards(rarity, generator)
+            if not self.unique or slot == 0:
+                continue
+            # 前の枠と同じカードになったパックだけ、同じレアリティの中で引き直す
+            rows = np.flatnonzero((cards[:, :slot] == cards[:, slot, None]).any(axis=1))
+            for _ in range(MAX_REDRAWS - 1):
+                if not len(rows):
+                    break
+                cards[rows, slot] = self._draw_cards(rarity[rows], generator)
+                duplicate = (cards[rows, :slot] == cards[rows, slot, None]).any(axis=1)
+                rows = rows[duplicate]
+            # ごくまれに残ったパックは1つずつ選ぶ
+            for row in rows.tolist():
+                picks = cards[row, :slot].tolist()
+                cards[row, slot] = self._pick_unused(int(rarity[row]), picks, generator, cards[row, slot])
+        return cards
+
+    def simulate(self, packs, seed=None, chunk_packs=CHUNK_PACKS):
+        """packs 個のパックを生成して、カードごと・レアリティごとの出現回数を数える
+
+        返り値の辞書:
+          card_counts   カードごとの出現回数（通し番号順）
+          rarity_sum    レアリティごとの出現回数
+          rarity_sumsq  レアリティごとの「1パックでの枚数」の2乗和（信頼区間用）
+          rarity_any    レアリティごとの「1枚以上入っていたパック」の数
+        """
+        generator = np.random.default_rng(seed)
+        card_rarity = np.repeat(np.arange(len(self.rarities), dtype=np.int16), self.counts)
+        card_counts = np.zeros(self.card_count, dtype=np.int64)
+        rarity_count = len(self.rarities)
+        rarity_sum = np.zeros(rarity_count, dtype=np.int64)
+        rarity_sumsq = np.zeros(rarity_count, dtype=np.int64)
+        rarity_any = np.zeros(rarity_count, dtype=np.int64)
+
+        done = 0
+        while done < packs:
+            count = min(chunk_packs, packs - done)
+            cards = self.draw_batch(count, generator)
+            card_counts += np.bincount(cards.ravel(), minlength=self.card_count)
+            # パックごとのレアリティ別の枚数
+            pack_rarities = card_rarity[cards]
+            for rarity in range(rarity_count):
+                per_pack = np.count_nonzero(pack_rarities == rarity, axis=1)
+                rarity_sum[rarity] += per_pack.sum()
+                rarity_sumsq[rarity] += (per_pack * per_pack).sum()
+                rarity_any[rarity] += np.count_nonzero(per_pack)
+            done += count
+
+        return {
+            "packs": packs,
+            "card_counts": card_counts,
+            "rarity_sum": rarity_sum,
+            "rarity_sumsq": rarity_sumsq,
+            "rarity_any": rarity_any,
+        }
+
+
+def wilson_interval(successes, trials, z):
+    """二項分布の割合の信頼区間（Wilson）"""
+    if trials == 0:
+        return 0.0, 0.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return center - half, center + half
+
+
+def generator_for(source="auto", slot_table=PACK_SLOT_TABLE, unique=True):
+    """カードの出どころ（catalog / images / master / auto）に合わせた PackGenerator と、カード名を返す関数"""
+    from card_catalog import CardCatalog
+    from utils import load_card_images
+
+    if source in ("auto", "catalog"):
+        catalog = CardCatalog.open(os.path.join("images", CARD_CATALOG_FILE))
+        if catalog and len(catalog):
+            def label(number):
+                record = catalog.get(number)
+                return f"{record['name']} ({record['id']})"
+            return PackGenerator(catalog.by_rarity, slot_table, unique), label
+        if source == "catalog":
+            raise RuntimeError("カードカタログがありません（python scrape_cards.py で作成します）")
+    if source in ("auto", "images"):
+        files = load_card_images()
+        if files:
+            return PackGenerator({"": files}, slot_table, unique), os.path.basename
+        if source == "images":
+            raise RuntimeError("カード画像がありません")
+    return PackGenerator.from_cards(CARD_MASTER_DATA, slot_table, unique), lambda card: card['name']
+
+
+def print_report(generator, result, label, confidence=0.95, top=10):
+    """シミュレーション結果をレアリティ別・カード別に表示する"""
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    packs = result["packs"]
+    percent = f"{confidence * 100:g}%"
+
+    print(f"\nレアリティ別（1パックあたりの枚数, {percent}信頼区間）")
+    expected_rates = generator.expected_card_rates()
+    for i, rarity in enumerate(generator.rarities):
+        mean = result["rarity_sum"][i] / packs
+        variance = max(0.0, result["rarity_sumsq"][i] / packs - mean * mean)
+        half = z * math.sqrt(variance / packs)
+        expected = expected_rates[i] * generator.counts[i]
+        low, high = wilson_interval(int(result["rarity_any"][i]), packs, z)
+        print(f"  {rarity or '(なし)':<12} {generator.counts[i]:>6} 種  期待 {expected:.5f}  "
+              f"観測 {mean:.5f} ± {half:.5f}  1枚以上入る確率 {result['rarity_any'][i] / packs:.5f} "
+              f"[{low:.5f}, {high:.5f}]")
+
+    # カード別（1パックに入る割合）
+    counts = result["card_counts"]
+    order = sorted(range(generator.card_count), key=lambda index: counts[index])
+    shown = order if top <= 0 or 2 * top >= len(order) else order[-top:][::-1] + order[:top]
+    outside = 0
+    for index in range(generator.card_count):
+        rarity_id = generator.rarities.index(generator.rarity_of(index))
+        low, high = wilson_interval(int(counts[index]), packs, z)
+        if not low <= expected_rates[rarity_id] <= high:
+            outside += 1
+
+    print(f"\nカード別（1パックに入る割合, {percent}信頼区間）")
+    for index in shown:
+        rarity = generator.rarity_of(index)
+        expected = expected_rates[generator.rarities.index(rarity)]
+        low, high = wilson_interval(int(counts[index]), packs, z)
+        mark = "" if low <= expected <= high else "  *"
+        print(f"  {label(generator.card(index))[:40]:<40} {rarity or '(なし)':<10} 期待 {expected:.6f}  "
+              f"観測 {counts[index] / packs:.6f} [{low:.6f}, {high:.6f}]{mark}")
+    print(f"期待値が信頼区間の外にあるカード: {outside} / {generator.card_count} 種"
+          f"（{percent}区間なので、偏りがなくても約 {(1 - confidence) * 100:g}% は外れます）")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="パックの中身の出現率をシミュレーションで確かめる")
+    parser.add_argument("--packs", type=int, default=10_000_000, help="生成するパック数")
+    parser.add_argument("--source", choices=("auto", "catalog", "images", "master"), default="auto",
+                        help="カードの出どころ（autoはカタログ→画像→マスターデータの順）")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--confidence", type=float, default=0.95, help="信頼区間の信頼度")
+    parser.add_argument("--top", type=int, default=10, help="出現率の高い・低いカードを何枚ずつ表示するか（0で全部）")
+    parser.add_argument("--allow-duplicates", action="store_true", help="同じパックに同じカードが入るのを許す")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("シミュレーションにはNumPyが必要です")
+        return 1
+
+    generator, label = generator_for(args.source, unique=not args.allow_duplicates)
+    print(f"カード {generator.card_count} 種, 枠 {len(generator.slots)} 枚")
+    for i, probabilities in enumerate(generator.slot_probabilities()):
+        text = ", ".join(f"{rarity or '(なし)'} {p:.3f}" for rarity, p in probabilities.items())
+        print(f"  枠{i + 1}: {text}")
+
+    start = time.perf_counter()
+    result = generator.simulate(args.packs, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"\n{args.packs:,} パックを生成しました（{elapsed:.2f}秒, {args.packs / elapsed:,.0f} パック/秒）")
+    print_report(generator, result, label, args.confidence, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,57 @@
 import pygame
 import random
 import os
+from concurrent.futures import ThreadPoolExecutor
 from constants import (
     DEFAULT_SCREEN_WIDTH, DEFAULT_SCREEN_HEIGHT,
     BLACK, WHITE, BLUE, GREEN, YELLOW,
     CARDS_PER_PACK, CARD_MASTER_DATA
 )
+from asset_manager import assets
+from collection_view import CollectionView
+from pack_generator import PackGenerator
 from utils import (
-    get_japanese_font, create_dummy_pack_image,
+    get_japanese_font, render_text, create_dummy_pack_image,
     load_and_scale_card_image, create_dummy_card_image
 )
 
 
+# 次のパックの画像を先読みするワーカースレッド
+_prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pack-prefetch")
+
+
+def _card_image_path(item):
+    """パックに入れるカードの画像パス（マスターデータのカードならNone）"""
+    if isinstance(item, dict):
+        return item.get('path')
+    return item
+
+
+def _decode_pack_contents(card_paths, pack_path, card_size, pack_size):
+    """ワーカースレッドでカード画像とパック画像をデコード・リサイズする
+
+    フォント描画はスレッドセーフではないので、ダミー画像の生成はメインスレッドで行う。
+    """
+    card_images = {}
+    for image_path in card_paths:
+        try:
+            card_images[image_path] = assets.load(image_path, card_size)
+        except Exception as e:
+            print(f"画像先読みエラー ({image_path}): {e}")
+
+    pack_image = None
+    if pack_path:
+        try:
+            pack_image = assets.load(pack_path, pack_size)
+        except Exception as e:
+            print(f"パック画像先読みエラー ({pack_path}): {e}")
+    return card_images, pack_image
+
+
 class PackOpening:
     """パック開封シーンクラス"""
-    def __init__(self, destroyed_packs_count, screen_width, screen_height, card_image_files, pack_image_files=None):
+    def __init__(self, destroyed_packs_count, screen_width, screen_height, card_image_files, pack_image_files=None,
+                 card_catalog=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.destroyed_packs_count = destroyed_packs_count
@@ -22,39 +59,65 @@ class PackOpening:
         self.opening_progress = 0
         self.is_opened = False
         self.card_image_files = card_image_files
+        self.card_catalog = card_catalog
+        self.pack_generator = self._create_pack_generator()
         self.pack_image_files = pack_image_files or []
 
-        # スケール計算
-        scale = min(screen_width / DEFAULT_SCREEN_WIDTH, screen_height / DEFAULT_SCREEN_HEIGHT)
-        self.pack_width = int(200 * scale)
-        self.pack_height = int(280 * scale)
-        self.pack_x = screen_width // 2 - self.pack_width // 2
-        self.pack_y = screen_height // 2 - self.pack_height // 2
+        # 大きさと配置
+        self._update_layout()
 
         # パック画像
         self.pack_image = self._load_random_pack_image()
 
-        # カードサイズ
-        self.card_height = int(self.screen_height * 0.35)
-        self.card_width = int(self.card_height * 2 / 3)
-
         # カード裏面画像
         self.card_back_image = self._load_card_back_image()
 
         self.current_cards = self._generate_cards()
         self.all_cards = []
+        self.collection_view = CollectionView()
+
+        # 次のパックの先読み
+        self.prefetch_hits = 0
+        self.prefetch_fallbacks = 0
+        self._prefetch = None
+        self._start_prefetch()
+
+    def _update_layout(self):
+        """画面サイズからパック・カードの大きさと配置、フォントを決める"""
+        scale = min(self.screen_width / DEFAULT_SCREEN_WIDTH, self.screen_height / DEFAULT_SCREEN_HEIGHT)
+        self.pack_width = int(200 * scale)
+        self.pack_height = int(280 * scale)
+        self.pack_x = self.screen_width // 2 - self.pack_width // 2
+        self.pack_y = self.screen_height // 2 - self.pack_height // 2
+
+        # カードサイズ
+        self.card_height = int(self.screen_height * 0.35)
+        self.card_width = int(self.card_height * 2 / 3)
 
         # フォント
         self.font = get_japanese_font(int(28 * scale))
         self.small_font = get_japanese_font(int(18 * scale))
 
+    def resize(self, screen_width, screen_height):
+        """画面サイズの変更に合わせて大きさと配置を変える（開封中のパック・カードはそのまま）"""
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self._update_layout()
+        # 同じ画像を新しい大きさで読み直す（元画像はアセットマネージャにある）
+        self.pack_image = self._load_random_pack_image(self.pack_path)
+        self.card_back_image = self._load_card_back_image()
+        for card in self.current_cards:
+            if 'image_path' in card:
+                card['image'] = load_and_scale_card_image(card['image_path'], self.card_width, self.card_height)
+            else:
+                card['image'] = create_dummy_card_image(self.card_width, self.card_height, card['color'], card['name'])
+
     def _load_card_back_image(self):
         """カード裏面画像を読み込む"""
         try:
             back_image_path = os.path.join("images", "card_ura.jpg")
             if os.path.exists(back_image_path):
-                img = pygame.image.load(back_image_path)
-                return pygame.transform.scale(img, (self.card_width, self.card_height))
+                return assets.load(back_image_path, (self.card_width, self.card_height))
         except Exception as e:
             print(f"カード裏面画像読み込みエラー: {e}")
 
@@ -64,36 +127,58 @@ class PackOpening:
         pygame.draw.rect(surface, WHITE, (0, 0, self.card_width, self.card_height), 3)
         return surface
 
-    def _load_random_pack_image(self):
-        """ランダムにパック画像を読み込む"""
+    def _choose_pack_image(self):
+        """ランダムにパック画像のパスを選ぶ"""
         if self.pack_image_files:
+            return random.choice(self.pack_image_files)
+        return None
+
+    def _load_random_pack_image(self, pack_path=None, pack_image=None):
+        """ランダムにパック画像を読み込む（先読み済みの画像があればそれを使う）"""
+        if pack_image is not None:
+            self.pack_path = pack_path
+            return pack_image
+        if pack_path is None:
+            pack_path = self._choose_pack_image()
+        # 画面サイズが変わったときに同じ画像を読み直せるよう覚えておく
+        self.pack_path = pack_path
+        if pack_path:
             try:
-                pack_path = random.choice(self.pack_image_files)
-                img = pygame.image.load(pack_path)
-                return pygame.transform.scale(img, (self.pack_width, self.pack_height))
+                return assets.load(pack_path, (self.pack_width, self.pack_height))
             except Exception as e:
                 print(f"パック画像読み込みエラー: {e}")
         return create_dummy_pack_image(self.pack_width, self.pack_height)
 
-    def _generate_cards(self):
-        """ランダムにカードを生成"""
-        cards = []
+    def _choose_cards(self):
+        """パックに入れるカードを選ぶ（カタログのカード、画像パスまたはマスターデータ）"""
+        cards = self.pack_generator.draw_pack()
+        if self._draws_from_catalog:
+            # カタログのカードは番号で選ばれるので、名前とパスをまとめて引く
+            return self.card_catalog.get_many(cards)
+        return cards
 
+    def _create_pack_generator(self):
+        """カードの出どころ（カタログ・画像ファイル・マスターデータ）に合わせた抽選器を作る"""
+        self._draws_from_catalog = False
+        if self.card_catalog and len(self.card_catalog) >= CARDS_PER_PACK:
+            self._draws_from_catalog = True
+            return PackGenerator(self.card_catalog.by_rarity)
         if self.card_image_files and len(self.card_image_files) >= CARDS_PER_PACK:
-            selected_images = random.sample(self.card_image_files, CARDS_PER_PACK)
+            # 画像ファイルにはレアリティがないので、全カードから選ぶ
+            return PackGenerator({"": self.card_image_files})
+        return PackGenerator.from_cards(CARD_MASTER_DATA)
+
+    def _generate_cards(self, selection=None, card_images=None):
+        """ランダムにカードを生成（先読み済みの画像があればそれを使う）"""
+        if selection is None:
+            selection = self._choose_cards()
+        card_images = card_images or {}
+        cards = []
 
-            for i, image_path in enumerate(selected_images):
-                card_image = load_and_scale_card_image(image_path, self.card_width, self.card_height)
-                cards.append({
-                    'id': i + 1,
-                    'name': os.path.basename(image_path),
-                    'image': card_image,
-                    'image_path': image_path,
-                    'flipped': False
-                })
-        else:
-            selected_cards = random.sample(CARD_MASTER_DATA, min(CARDS_PER_PACK, len(CARD_MASTER_DATA)))
-            for card_data in selected_cards:
+        for i, item in enumerate(selection):
+            image_path = _card_image_path(item)
+            if image_path is None:
+                card_data = item
                 cards.append({
                     'id': card_data['id'],
                     'name': card_data['name'],
@@ -102,9 +187,81 @@ class PackOpening:
                     'image': create_dummy_card_image(self.card_width, self.card_height, card_data['color'], card_data['name']),
                     'flipped': False
                 })
+            else:
+                card_image = card_images.get(image_path)
+                if card_image is None:
+                    card_image = load_and_scale_card_image(image_path, self.card_width, self.card_height)
+                card = {
+                    'id': i + 1,
+                    'name': os.path.basename(image_path),
+                    'image': card_image,
+                    'image_path': image_path,
+                    'flipped': False
+                }
+                if isinstance(item, dict):
+                    # カタログのカードは名前とレアリティも分かる
+                    card.update(id=item['id'], name=item['name'] or card['name'], rarity=item['rarity'])
+                cards.append(card)
 
         return cards
 
+    def _start_prefetch(self):
+        """次のパックのカードとパック画像をワーカースレッドで読み込み始める"""
+        self._prefetch = None
+        if self.current_pack_index >= self.destroyed_packs_count - 1:
+            return
+
+        # 乱数はメインスレッドで引いておく
+        selection = self._choose_cards()
+        pack_path = self._choose_pack_image()
+        card_paths = [path for path in map(_card_image_path, selection) if path]
+        card_size = (self.card_width, self.card_height)
+        pack_size = (self.pack_width, self.pack_height)
+        future = _prefetch_executor.submit(_decode_pack_contents, card_paths, pack_path, card_size, pack_size)
+        self._prefetch = {
+            'selection': selection,
+            'pack_path': pack_path,
+            'card_size': card_size,
+            'pack_size': pack_size,
+            'future': future,
+        }
+
+    def _take_prefetch(self):
+        """先読み結果を取り出す（間に合わなければブロッキングで読み込む）"""
+        prefetch = self._prefetch
+        self._prefetch = None
+        if prefetch is None:
+            self.prefetch_fallbacks += 1
+            return self._generate_cards(), self._load_random_pack_image()
+
+        future = prefetch['future']
+        card_images, pack_image = {}, None
+        if future.done():
+            self.prefetch_hits += 1
+            card_images, pack_image = future.result()
+        else:
+            self.prefetch_fallbacks += 1
+            # 未着手ならキャンセルしてこのスレッドで読み込む、実行中なら完了を待つ
+            if not future.cancel():
+                card_images, pack_image = future.result()
+
+        # 先読み中に画面サイズが変わっていたら読み直す
+        if prefetch['card_size'] != (self.card_width, self.card_height):
+            card_images = {}
+        if prefetch['pack_size'] != (self.pack_width, self.pack_height):
+            pack_image = None
+
+        cards = self._generate_cards(prefetch['selection'], card_images)
+        pack_image = self._load_random_pack_image(prefetch['pack_path'], pack_image)
+        return cards, pack_image
+
+    def prefetch_stats(self):
+        """先読みのヒット数とブロッキング読み込みになった回数を返す"""
+        return {
+            'hits': self.prefetch_hits,
+            'fallbacks': self.prefetch_fallbacks,
+        }
+
     def handle_input(self, keys):
         """キー入力処理"""
         if not self.is_opened:
@@ -129,7 +286,7 @@ class PackOpening:
         scale = min(self.screen_width / DEFAULT_SCREEN_WIDTH, self.screen_height / DEFAULT_SCREEN_HEIGHT)
 
         # タイトル
-        title_text = self.font.render(f"Pack {self.current_pack_index + 1}/{self.destroyed_packs_count}", True, WHITE)
+        title_text = render_text(self.font, f"Pack {self.current_pack_index + 1}/{self.destroyed_packs_count}", WHITE)
         title_rect = title_text.get_rect(center=(self.screen_width // 2, int(30 * scale)))
         screen.blit(title_text, title_rect)
 
@@ -152,7 +309,7 @@ class PackOpening:
                 screen.blit(top_surface, (self.pack_x, top_y))
 
         # 操作案内
-        guide_text = self.small_font.render("やじるしキーでひらこう！", True, WHITE)
+        guide_text = render_text(self.small_font, "やじるしキーでひらこう！", WHITE)
         guide_rect = guide_text.get_rect(center=(self.screen_width // 2, self.screen_height - int(50 * scale)))
         screen.blit(guide_text, guide_rect)
 
@@ -166,7 +323,7 @@ class PackOpening:
 
     def _draw_opened_cards(self, screen):
         """開封後のカード表示"""
-        title_text = self.font.render("パックがあいたよ！", True, YELLOW)
+        title_text = render_text(self.font, "パックがあいたよ！", YELLOW)
         scale = min(self.screen_width / DEFAULT_SCREEN_WIDTH, self.screen_height / DEFAULT_SCREEN_HEIGHT)
         title_rect = title_text.get_rect(center=(self.screen_width // 2, int(50 * scale)))
         screen.blit(title_text, title_rect)
@@ -191,14 +348,14 @@ class PackOpening:
         all_flipped = self.all_cards_flipped()
 
         if not all_flipped:
-            click_text = self.small_font.render("カードをクリックしてめくろう！", True, YELLOW)
+            click_text = render_text(self.small_font, "カードをクリックしてめくろう！", YELLOW)
             click_rect = click_text.get_rect(center=(self.screen_width // 2, int(80 * scale)))
             screen.blit(click_text, click_rect)
         else:
             if self.current_pack_index < self.destroyed_packs_count - 1:
-                next_text = self.small_font.render("スペースキーでつぎのパック", True, GREEN)
+                next_text = render_text(self.small_font, "スペースキーでつぎのパック", GREEN)
             else:
-                next_text = self.small_font.render("スペースキーでけっかをみる", True, GREEN)
+                next_text = render_text(self.small_font, "スペースキーでけっかをみる", GREEN)
             next_rect = next_text.get_rect(center=(self.screen_width // 2, self.screen_height - int(50 * scale)))
             screen.blit(next_text, next_rect)
 
@@ -225,8 +382,8 @@ class PackOpening:
             self.current_pack_index += 1
             self.opening_progress = 0
             self.is_opened = False
-            self.current_cards = self._generate_cards()
-            self.pack_image = self._load_random_pack_image()
+            self.current_cards, self.pack_image = self._take_prefetch()
+            self._start_prefetch()
             return True
         return False
 
@@ -234,6 +391,10 @@ class PackOpening:
         """全パックの開封が完了したか"""
         return self.is_opened and self.current_pack_index >= self.destroyed_packs_count - 1
 
+    def scroll_collection(self, amount):
+        """獲得カード一覧をスクロール（ピクセル）"""
+        self.collection_view.scroll_by(amount)
+
     def draw_card_collection(self, screen):
         """獲得カード一覧を描画"""
         screen.fill(BLACK)
@@ -241,71 +402,22 @@ class PackOpening:
         scale = min(self.screen_width / DEFAULT_SCREEN_WIDTH, self.screen_height / DEFAULT_SCREEN_HEIGHT)
 
         # タイトル
-        title_text = self.font.render("ゲットしたカード！", True, YELLOW)
+        title_text = render_text(self.font, "ゲットしたカード！", YELLOW)
         title_rect = title_text.get_rect(center=(self.screen_width // 2, int(30 * scale)))
         screen.blit(title_text, title_rect)
 
         # カード総数
-        total_text = self.small_font.render(f"ぜんぶで {len(self.all_cards)}まい", True, WHITE)
+        total_text = render_text(self.small_font, f"ぜんぶで {len(self.all_cards)}まい", WHITE)
         total_rect = total_text.get_rect(center=(self.screen_width // 2, int(70 * scale)))
         screen.blit(total_text, total_rect)
 
         if len(self.all_cards) == 0:
             return
 
-        # レイアウト計算
-        header_height = int(90 * scale)
-        footer_height = int(50 * scale)
-        available_height = self.screen_height - header_height - footer_height
-        available_width = self.screen_width - int(30 * scale)
-
-        card_count = len(self.all_cards)
-        card_aspect_ratio = 2 / 3
-
-        best_card_height = 0
-        best_cards_per_row = 1
-        best_spacing = 10
-
-        for test_cards_per_row in range(1, card_count + 1):
-            rows = (card_count + test_cards_per_row - 1) // test_cards_per_row
-            spacing = int(10 * scale)
-
-            max_width_per_card = (available_width - spacing * (test_cards_per_row - 1)) / test_cards_per_row
-            height_from_width = max_width_per_card / card_aspect_ratio
-            max_height_per_card = (available_height - spacing * (rows - 1)) / rows
-            card_height = min(height_from_width, max_height_per_card)
-
-            if card_height > best_card_height:
-                best_card_height = card_height
-                best_cards_per_row = test_cards_per_row
-                best_spacing = spacing
-
-        display_card_height = int(best_card_height)
-        display_card_width = int(display_card_height * card_aspect_ratio)
-        spacing = best_spacing
-        cards_per_row = best_cards_per_row
-
-        min_card_height = int(60 * scale)
-        if display_card_height < min_card_height:
-            display_card_height = min_card_height
-            display_card_width = int(display_card_height * card_aspect_ratio)
-
-        total_rows = (card_count + cards_per_row - 1) // cards_per_row
-        actual_row_width = cards_per_row * display_card_width + (cards_per_row - 1) * spacing
-        actual_col_height = total_rows * display_card_height + (total_rows - 1) * spacing
-        start_x = (self.screen_width - actual_row_width) // 2
-        start_y = header_height + (available_height - actual_col_height) // 2
-
-        for i, card in enumerate(self.all_cards):
-            row = i // cards_per_row
-            col = i % cards_per_row
-            x = start_x + col * (display_card_width + spacing)
-            y = start_y + row * (display_card_height + spacing)
-
-            scaled_image = pygame.transform.scale(card['image'], (display_card_width, display_card_height))
-            screen.blit(scaled_image, (x, y))
+        # カードの格子（レイアウトと縮小画像はキャッシュ済み）
+        self.collection_view.draw(screen, self.all_cards, scale)
 
         # 案内
-        next_text = self.small_font.render("スペースキーでスタートにもどる", True, WHITE)
+        next_text = render_text(self.small_font, "スペースキーでスタートにもどる", WHITE)
         next_rect = next_text.get_rect(center=(self.screen_width // 2, self.screen_height - int(25 * scale)))
         screen.blit(next_text, next_rect)
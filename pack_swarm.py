@@ -0,0 +1,188 @@
+import random
+import pygame
+from constants import BLUE, WHITE, YELLOW
+from asset_manager import assets
+from card_pack import CardPack
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def swarm_available():
+    """スウォームモードが使えるか（NumPyが必要）"""
+    return np is not None
+
+
+class PackSwarm:
+    """大量のカードパックの状態をNumPy配列で持ち、まとめて動かすクラス
+
+    移動と方向転換は1ステップにつき1回のベクトル演算で行い、描画は screen.blits を1回呼ぶだけ。
+    個々のパックには CardPack と同じAPIの SwarmCardPack（配列へのビュー）でアクセスできる。
+    """
+    def __init__(self, positions, scale=1.0, pack_image_paths=None):
+        if np is None:
+            raise RuntimeError("スウォームモードにはNumPyが必要です")
+
+        count = len(positions)
+        self.count = count
+        self.scale = scale
+        self.destroyed_count = 0
+
+        # パック画像（同じ画像は1枚だけ持つ）
+        self.image_paths = []
+        image_slots = {}
+        image_index = []
+        for i in range(count):
+            path = pack_image_paths[i] if pack_image_paths else None
+            if path not in image_slots:
+                image_slots[path] = len(self.image_paths)
+                self.image_paths.append(path)
+            image_index.append(image_slots[path])
+        self.image_index = np.array(image_index, dtype=np.int32)
+        self._load_images()
+
+        # 位置と動き（CardPackと同じ分布。乱数はrandomモジュールから引いて再現性を保つ）
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.x = positions[:, 0].copy()
+        self.y = positions[:, 1].copy()
+        self.prev_x = self.x.copy()
+        self.initial_x = self.x.copy()
+        rng = np.random.default_rng(random.getrandbits(64))
+        self.speed = rng.uniform(1, 3, count) * scale
+        self.direction = rng.choice(np.array([-1.0, 1.0]), count)
+        self.move_range = rng.integers(int(30 * scale), int(80 * scale), count, endpoint=True).astype(np.float64)
+        self.destroyed = np.zeros(count, dtype=bool)
+
+        self.packs = [SwarmCardPack(self, i) for i in range(count)]
+
+    def _load_images(self):
+        """パック画像を今のスケールで読み込み、パックごとの大きさを決める"""
+        self.images = [self._load_image(path) for path in self.image_paths]
+        sizes = np.array([image.get_size() for image in self.images], dtype=np.int32).reshape(-1, 2)
+        self.width = sizes[self.image_index, 0]
+        self.height = sizes[self.image_index, 1]
+
+    def rescale(self, positions, scale):
+        """画面サイズの変更に合わせて位置と大きさを変える（画像・破壊状態・動きはそのまま）"""
+        ratio = scale / self.scale
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        new_x = positions[:, 0]
+        # 初期位置からのずれと動きの速さ・幅もスケールに合わせる
+        self.x = new_x + (self.x - self.initial_x) * ratio
+        self.prev_x = new_x + (self.prev_x - self.initial_x) * ratio
+        self.initial_x = new_x.copy()
+        self.y = positions[:, 1].copy()
+        self.speed *= ratio
+        self.move_range *= ratio
+        self.scale = scale
+        for pack in self.packs:
+            pack.scale = scale
+        # 同じ画像は1回だけ縮小し直す（元画像はアセットマネージャにある）
+        self._load_images()
+
+    def _load_image(self, path):
+        """パック画像を読み込む（なければダミー画像を作る）"""
+        if path:
+            try:
+                return assets.load_with_height(path, int(80 * self.scale))
+            except Exception as e:
+                print(f"パック画像読み込みエラー: {e}")
+
+        # フォールバック: CardPackのダミー描画と同じ見た目を1枚だけ作る
+        width = max(1, int(60 * self.scale))
+        height = max(1, int(80 * self.scale))
+        surface = pygame.Surface((width, height))
+        surface.fill(BLUE)
+        pygame.draw.rect(surface, WHITE, (0, 0, width, height), int(3 * self.scale))
+        font = pygame.font.Font(None, max(1, int(40 * self.scale)))
+        star = font.render("★", True, YELLOW)
+        surface.blit(star, star.get_rect(center=(width // 2, height // 2)))
+        return surface
+
+    def step(self):
+        """全パックを1ステップ動かす"""
+        alive = ~self.destroyed
+        self.prev_x[:] = self.x
+        self.x += self.speed * self.direction * alive
+
+        # 初期位置から一定範囲を超えたら方向転換
+        flip = alive & (np.abs(self.x - self.initial_x) > self.move_range)
+        self.direction[flip] *= -1
+
+    def render_x(self, alpha=1.0):
+        """補間した描画位置の配列"""
+        return self.prev_x + (self.x - self.prev_x) * alpha
+
+    def draw(self, screen, alpha=1.0):
+        """残っているパックをまとめて描画"""
+        alive = np.flatnonzero(~self.destroyed)
+        if len(alive) == 0:
+            return
+        # blitと同じく小数点以下は切り捨て
+        xs = self.render_x(alpha)[alive].astype(np.int64).tolist()
+        ys = self.y[alive].astype(np.int64).tolist()
+        images = self.images
+        image_index = self.image_index[alive].tolist()
+        screen.blits([(images[i], (x, y)) for i, x, y in zip(image_index, xs, ys)], doreturn=False)
+
+    def hit_test(self, rect):
+        """矩形に重なる残っているパックのうち、最初のもののインデックス（なければ-1）"""
+        # pygame.Rectと同じく位置は切り捨て
+        left = np.trunc(self.x)
+        top = np.trunc(self.y)
+        hits = ((~self.destroyed)
+                & (left < rect.right) & (left + self.width > rect.left)
+                & (top < rect.bottom) & (top + self.height > rect.top)
+                & (self.width > 0) & (self.height > 0))
+        index = int(np.argmax(hits))
+        return index if hits[index] else -1
+
+    def destroy(self, index):
+        """パックを破壊"""
+        if not self.destroyed[index]:
+            self.destroyed[index] = True
+            self.destroyed_count += 1
+
+
+def _array_property(name, convert):
+    """スウォームの配列の1要素を属性として見せるプロパティ"""
+    def getter(self):
+        return convert(getattr(self.swarm, name)[self.index])
+
+    def setter(self, value):
+        getattr(self.swarm, name)[self.index] = value
+    return property(getter, setter)
+
+
+class SwarmCardPack(CardPack):
+    """PackSwarmの1要素を CardPack として扱うためのビュー"""
+    x = _array_property("x", float)
+    y = _array_property("y", float)
+    prev_x = _array_property("prev_x", float)
+    initial_x = _array_property("initial_x", float)
+    speed = _array_property("speed", float)
+    direction = _array_property("direction", int)
+    move_range = _array_property("move_range", float)
+    width = _array_property("width", int)
+    height = _array_property("height", int)
+
+    def __init__(self, swarm, index):
+        self.swarm = swarm
+        self.index = index
+        self.scale = swarm.scale
+        self.color = BLUE
+        self.pack_image_path = None
+
+    @property
+    def destroyed(self):
+        return bool(self.swarm.destroyed[self.index])
+
+    @property
+    def pack_image(self):
+        return self.swarm.images[self.swarm.image_index[self.index]]
+
+    def destroy(self):
+        """カードパックを破壊"""
+        self.swarm.destroy(self.index)
@@ -1,107 +1,65 @@
-import requests
+import argparse
 import os
-import time
-import json
 
-def scrape_card_images_from_json():
-    """JSONファイルからカード画像をダウンロード"""
+from card_catalog import build_catalog
+from card_downloader import CardDownloader
+from card_pipeline import BakePipeline
+from card_sync import MANIFEST_FILE, SyncManifest, forget_files, sync_cards
+from catalog_stream import CardFilter, load_catalog_cards
+from dedup_cards import dedup_cards
+
+CATALOG_URL = "https://assets.game8.jp/tools/script_template/pokemon_card.json"
+
+
+def scrape_card_images_from_json(catalog_url=CATALOG_URL, images_dir="images", workers=8, rate=8.0,
+                                 card_filter=None, bake=True, dedup=True):
+    """JSONファイルからカード画像をダウンロード
+
+    workers 本のスレッドで同時にダウンロードし、リクエストは毎秒 rate 回までに抑える。
+    card_filter を省略すると、col_19 に "ex" が含まれるカード（レアカード）だけを対象にする。
+    bake=True なら、ダウンロードと並行してゲームで使う大きさへの縮小（bake_assets.py と同じ）も行う。
+    dedup=True なら、新しくダウンロードした画像があったときに重複をまとめる（dedup_cards.py と同じ）。
+    """
     print("カード画像のダウンロードを開始します")
 
     # imagesフォルダを作成
-    images_dir = "images"
     if not os.path.exists(images_dir):
         os.makedirs(images_dir)
         print(f"フォルダを作成しました: {images_dir}")
 
-    # ヘッダーを設定（ブラウザのように振る舞う）
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
+    downloader = CardDownloader(workers=workers, rate=rate)
     try:
-        # JSONファイルを取得
-        json_url = "https://assets.game8.jp/tools/script_template/pokemon_card.json"
-        print(f"JSONデータを取得中: {json_url}")
-
-        response = requests.get(json_url, headers=headers)
-        response.raise_for_status()
-
-        # JSONをパース
-        categories = response.json()
-        print(f"カテゴリデータを取得しました: {len(categories)} 件")
-
-        # 画像URLを抽出（ネストされた構造を処理）
-        # レアカード（exカード）のみをフィルタリング
-        image_urls = []
-        total_cards = 0
-        for category in categories:
-            if 'db_data' in category:
-                for card in category['db_data']:
-                    total_cards += 1
-                    # col_19に"ex"が含まれるカードのみ（レアカード）
-                    col_19 = card.get('col_19', '') or ''
-                    col_19 = col_19.strip() if col_19 else ''
-                    if col_19 and 'ex' in col_19.lower():
-                        if 'image_url' in card and card['image_url']:
-                            # /show を /original に置き換えて高解像度版を取得
-                            img_url = card['image_url'].replace('/show', '/original')
-
-                            # HTTPSに統一
-                            if img_url.startswith('//'):
-                                img_url = 'https:' + img_url
-                            elif not img_url.startswith('http'):
-                                img_url = 'https://' + img_url
-
-                            image_urls.append({
-                                'url': img_url,
-                                'name': card.get('title', 'Unknown'),
-                                'id': card.get('id', 'unknown'),
-                                'rarity': col_19
-                            })
+        # カード一覧を取得（前回から変わっていなければ解析もしない）
+        print(f"JSONデータを取得中: {catalog_url}")
+        image_urls, total_cards = load_catalog_cards(downloader, catalog_url, images_dir, card_filter)
 
         print(f"全カード数: {total_cards} 件")
 
         print(f"カード画像を {len(image_urls)} 枚見つけました")
 
-        # 画像をダウンロード
-        downloaded = 0
-        for i, card_info in enumerate(image_urls):
-            try:
-                img_url = card_info['url']
-                card_name = card_info['name']
-                print(f"ダウンロード中 ({i+1}/{len(image_urls)}): {card_name}")
-
-                # 画像を取得
-                img_response = requests.get(img_url, headers=headers, timeout=10)
-                img_response.raise_for_status()
-
-                # ファイル名を生成（レアカードのみ）
-                card_id = card_info['id']
-                rarity = card_info.get('rarity', 'rare')
-
-                # 拡張子を判定
-                ext = '.jpg'
-                if '.png' in img_url.lower():
-                    ext = '.png'
-                elif '.webp' in img_url.lower():
-                    ext = '.webp'
-
-                filename = f"rare_card_{i+1:03d}_{card_id}{ext}"
-                filepath = os.path.join(images_dir, filename)
-
-                # 画像を保存
-                with open(filepath, 'wb') as f:
-                    f.write(img_response.content)
-
-                downloaded += 1
-                print(f"保存完了: {filepath}")
-
-                # サーバーに負荷をかけないよう少し待つ
-                time.sleep(0.3)
-
-            except Exception as e:
-                print(f"画像のダウンロードに失敗: {img_url}")
-                print(f"エラー: {e}")
+        # 前回からの差分だけダウンロードし、終わったものから縮小に回す
+        manifest = SyncManifest(os.path.join(images_dir, MANIFEST_FILE))
+        pipeline = BakePipeline() if bake else None
+        on_complete = None
+        if pipeline:
+            def on_complete(filepath, result):
+                pipeline.submit(filepath, result["size"], result["status"] == "downloaded")
+        try:
+            counts = sync_cards(image_urls, images_dir, downloader, manifest, on_complete=on_complete)
+        finally:
+            if pipeline:
+                invalid = pipeline.close()
+                if invalid:
+                    forget_files(manifest, images_dir, invalid)
+                    print(f"壊れていた画像 {len(invalid)} 枚を削除しました（次回ダウンロードし直します）")
+        downloaded = counts["downloaded"] + counts["updated"]
+        if dedup and downloaded:
+            dedup_cards(images_dir, manifest=manifest)
+        # ゲームが読むカードカタログ（ID・名前・レアリティ・収録セット・画像パス）
+        catalog_count = build_catalog(manifest, images_dir)
+        print(f"カードカタログを作成しました: {catalog_count} 枚")
+        print(f"新規 {counts['downloaded']} 枚, 更新 {counts['updated']} 枚, 変更なし {counts['unchanged']} 枚, "
+              f"削除 {counts['removed']} 枚, 失敗 {counts['failed']} 枚")
 
         print(f"\n完了: {downloaded} 枚の画像をダウンロードしました")
         return downloaded
@@ -111,6 +69,21 @@ def scrape_card_images_from_json():
         import traceback
         traceback.print_exc()
         return 0
+    finally:
+        downloader.close()
+
 
 if __name__ == "__main__":
-    scrape_card_images_from_json()
+    parser = argparse.ArgumentParser(description="カード画像をダウンロードする")
+    parser.add_argument("--catalog-url", default=CATALOG_URL, help="カード一覧JSONのURL")
+    parser.add_argument("--images-dir", default="images", help="保存先フォルダ")
+    parser.add_argument("--workers", type=int, default=8, help="同時ダウンロード数")
+    parser.add_argument("--rate", type=float, default=8.0, help="1秒あたりの最大リクエスト数（0で無制限）")
+    parser.add_argument("--filter-field", default="col_19", help="カードを選ぶ項目")
+    parser.add_argument("--filter-contains", default="ex", help="この文字列を含むカードだけをダウンロードする")
+    parser.add_argument("--no-bake", action="store_true", help="ダウンロード後の縮小を行わない")
+    parser.add_argument("--no-dedup", action="store_true", help="重複した画像をまとめない")
+    args = parser.parse_args()
+    scrape_card_images_from_json(args.catalog_url, args.images_dir, args.workers, args.rate,
+                                 CardFilter(args.filter_field, args.filter_contains), not args.no_bake,
+                                 not args.no_dedup)
@@ -0,0 +1,40 @@
+from constants import SIMULATION_HZ
+
+
+class FixedTimestep:
+    """描画のフレームレートと関係なく、固定間隔でシミュレーションを進めるクロック"""
+    # 浮動小数点の誤差でステップを取りこぼさないための余裕（ミリ秒）
+    EPSILON_MS = 1e-6
+
+    def __init__(self, hz=SIMULATION_HZ, max_steps_per_frame=10):
+        self.step_ms = 1000 / hz
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator_ms = 0.0
+        self.ticks = 0
+
+    def advance(self, frame_ms):
+        """経過時間を加え、このフレームで進めるステップ数を返す"""
+        self.accumulator_ms += frame_ms
+        steps = int((self.accumulator_ms + self.EPSILON_MS) // self.step_ms)
+
+        # 処理落ちが続いたときに追いつこうとして更に重くなるのを防ぐ
+        if steps > self.max_steps_per_frame:
+            steps = self.max_steps_per_frame
+            self.accumulator_ms = steps * self.step_ms
+
+        self.accumulator_ms = max(0.0, self.accumulator_ms - steps * self.step_ms)
+        return steps
+
+    def tick(self):
+        """シミュレーションを1ステップ進める（updateの直前に呼ぶ）"""
+        self.ticks += 1
+
+    @property
+    def alpha(self):
+        """前ステップと現ステップの間の補間係数（0〜1）"""
+        return min(1.0, self.accumulator_ms / self.step_ms)
+
+    @property
+    def time_ms(self):
+        """シミュレーション上の経過時間（ミリ秒）"""
+        return self.ticks * self.step_ms
@@ -0,0 +1,99 @@
+import pygame
+
+
+class UniformGrid:
+    """一様グリッドで矩形を管理する空間インデックス
+
+    各要素は自分の矩形が重なるセルすべてに登録される。移動してもセルの範囲が
+    変わらなければ登録はそのままなので、少しずつ動く要素の更新は安い。
+    検索結果は登録順に並ぶ。
+    """
+    def __init__(self, cell_size):
+        self.cell_size = max(1, int(cell_size))
+        self._cells = {}
+        # 要素 -> [登録順, 矩形, セル範囲]
+        self._entries = {}
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def _add_to_cells(self, item, cell_range):
+        x0, y0, x1, y1 = cell_range
+        cells = self._cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = cell = set()
+                cell.add(item)
+
+    def _remove_from_cells(self, item, cell_range):
+        x0, y0, x1, y1 = cell_range
+        cells = self._cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(item)
+                    if not cell:
+                        del cells[(cx, cy)]
+
+    def insert(self, item, rect):
+        """要素を登録"""
+        if item in self._entries:
+            self.update(item, rect)
+            return
+        rect = pygame.Rect(rect)
+        cell_range = self._cell_range(rect)
+        self._entries[item] = [self._next_order, rect, cell_range]
+        self._next_order += 1
+        self._add_to_cells(item, cell_range)
+
+    def update(self, item, rect):
+        """要素の矩形を更新（セルの範囲が変わったときだけ登録し直す）"""
+        entry = self._entries[item]
+        rect = pygame.Rect(rect)
+        cell_range = self._cell_range(rect)
+        if cell_range != entry[2]:
+            self._remove_from_cells(item, entry[2])
+            self._add_to_cells(item, cell_range)
+            entry[2] = cell_range
+        entry[1] = rect
+
+    def remove(self, item):
+        """要素を削除"""
+        entry = self._entries.pop(item, None)
+        if entry is not None:
+            self._remove_from_cells(item, entry[2])
+
+    def clear(self):
+        """すべての要素を削除"""
+        self._cells.clear()
+        self._entries.clear()
+        self._next_order = 0
+
+    def query(self, rect):
+        """矩形に重なる要素を登録順に返す"""
+        rect = pygame.Rect(rect)
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self._cells
+        candidates = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    candidates.update(cell)
+
+        entries = self._entries
+        hits = [item for item in candidates if rect.colliderect(entries[item][1])]
+        hits.sort(key=lambda item: entries[item][0])
+        return hits
@@ -0,0 +1,100 @@
+import threading
+import time
+
+
+# 起動時間の内訳の分類（表示順）
+CATEGORIES = ("import", "init", "scan", "decode")
+
+
+class _Stage:
+    """with文で起動処理の1区間を計測するためのオブジェクト"""
+    __slots__ = ("profile", "category", "name", "start")
+
+    def __init__(self, profile, category, name):
+        self.profile = profile
+        self.category = category
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profile.record(self.category, self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class StartupProfile:
+    """起動にかかった時間を分類（import / init / scan / decode）ごとに記録する
+
+    記録は常に行い（区間は数十個なので軽い）、enabled のときだけ最初のフレームと
+    バックグラウンドの読み込みがそろった時点で内訳を表示する。
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.first_frame = None
+        self.loaded = None
+        self._stages = []
+        self._reported = False
+        # バックグラウンドの読み込みスレッドからも記録する
+        self._lock = threading.Lock()
+
+    def start(self):
+        """起動の開始時刻を今にする（main.py の先頭で呼ぶ）"""
+        self.origin = time.perf_counter()
+
+    def stage(self, category, name):
+        """with startup_profile.stage("scan", "パック画像"): のように使う"""
+        return _Stage(self, category, name)
+
+    def record(self, category, name, start, duration):
+        with self._lock:
+            self._stages.append((category, name, start - self.origin, duration, threading.current_thread().name))
+
+    def mark_first_frame(self):
+        """最初のフレームを表示した"""
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.origin
+            self._maybe_report()
+
+    def mark_loaded(self):
+        """バックグラウンドの読み込みが終わった"""
+        if self.loaded is None:
+            self.loaded = time.perf_counter() - self.origin
+            self._maybe_report()
+
+    def _maybe_report(self):
+        if self.enabled and not self._reported and self.first_frame is not None and self.loaded is not None:
+            self._reported = True
+            print(self.format_report())
+
+    def totals(self):
+        """分類ごとの合計時間（秒）"""
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        with self._lock:
+            for category, _, _, duration, _ in self._stages:
+                totals[category] = totals.get(category, 0.0) + duration
+        return totals
+
+    def format_report(self):
+        """内訳の表（分類ごとの合計と、各区間の開始時刻・時間・スレッド）"""
+        lines = ["起動時間の内訳:"]
+        with self._lock:
+            stages = sorted(self._stages, key=lambda stage: stage[2])
+        for category, total in self.totals().items():
+            lines.append(f"  {category:<7} {total * 1000:8.1f}ms")
+            for stage_category, name, start, duration, thread in stages:
+                if stage_category == category:
+                    where = "" if thread == "MainThread" else f"  [{thread}]"
+                    lines.append(f"    {start * 1000:8.1f}ms から {duration * 1000:7.1f}ms  {name}{where}")
+        if self.first_frame is not None:
+            lines.append(f"  最初のフレームまで {self.first_frame * 1000:.1f}ms")
+        if self.loaded is not None:
+            lines.append(f"  読み込み完了まで   {self.loaded * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+# プロセス全体で共有する起動プロファイル
+startup_profile = StartupProfile()
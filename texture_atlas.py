@@ -0,0 +1,123 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import pygame
+
+
+# ファイル形式:
+#   マジック(8バイト) + バージョン, ヘッダ長 (uint32 x2, リトルエンディアン)
+#   + JSONヘッダ（元画像ごとの大きさと、縮小画像の (名前, 大きさ, オフセット, ピッチ)）
+#   + 画素データ（BGRA。一般的な画面と同じ並びなので変換せずにblitできる）
+ATLAS_MAGIC = b"CPSATLAS"
+ATLAS_VERSION = 1
+ATLAS_FORMAT = "BGRA"
+_PREFIX = struct.Struct("<8sII")
+# 画素データの先頭をそろえる境界（バイト）
+DATA_ALIGNMENT = 4096
+ENTRY_ALIGNMENT = 64
+
+
+def _align(value, alignment):
+    return (value + alignment - 1) // alignment * alignment
+
+
+def build_atlas(index_entries, atlas_path):
+    """焼き込みインデックスに載っている縮小画像を1つのアトラスファイルにまとめる
+
+    index_entries は bake_assets.py のインデックス（元画像パス -> 項目）。
+    画素データは一時ファイルに書き出しながら集めるので、全画像をメモリに持たない。
+    """
+    entries = {}
+    offset = 0
+    data_path = atlas_path + ".data.tmp"
+    with open(data_path, "wb") as data_file:
+        for key, entry in index_entries.items():
+            variants = []
+            for variant in entry["variants"]:
+                try:
+                    surface = pygame.image.load(variant["path"])
+                except Exception as e:
+                    print(f"アトラス読み込みエラー: {variant['path']} ({e})")
+                    continue
+                width, height = surface.get_size()
+                pitch = width * 4
+                padding = _align(offset, ENTRY_ALIGNMENT) - offset
+                data_file.write(b"\0" * padding)
+                offset += padding
+                variants.append({
+                    "name": variant["path"],
+                    "size": [width, height],
+                    "offset": offset,
+                    "pitch": pitch,
+                })
+                data_file.write(pygame.image.tobytes(surface, ATLAS_FORMAT))
+                offset += pitch * height
+            entries[key] = {"mtime_ns": entry["mtime_ns"], "size": entry["size"], "variants": variants}
+
+    header = json.dumps({"format": ATLAS_FORMAT, "entries": entries}, ensure_ascii=False).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header), DATA_ALIGNMENT)
+
+    # 書きかけのファイルを読まれないよう、一時ファイルに書いてから置き換える
+    temp_path = atlas_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f, open(data_path, "rb") as data_file:
+            f.write(_PREFIX.pack(ATLAS_MAGIC, ATLAS_VERSION, len(header)))
+            f.write(header)
+            f.write(b"\0" * (data_start - _PREFIX.size - len(header)))
+            shutil.copyfileobj(data_file, f, 1024 * 1024)
+        os.replace(temp_path, atlas_path)
+    finally:
+        os.remove(data_path)
+    return data_start + offset
+
+
+class TextureAtlas:
+    """アトラスファイルをメモリマップし、画素をコピーせずにサーフェスとして見せるクラス
+
+    サーフェスはファイルのページを直接参照する。書き込まれたページだけがコピーされる
+    （ACCESS_COPY）ので、ファイルは書き換わらない。
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, version, header_length = _PREFIX.unpack_from(self._map, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            self._map.close()
+            raise ValueError(f"アトラスの形式が違います: {path}")
+        header = json.loads(bytes(self._map[_PREFIX.size:_PREFIX.size + header_length]).decode("utf-8"))
+        self.format = header["format"]
+        self.entries = header["entries"]
+        self.data_start = _align(_PREFIX.size + header_length, DATA_ALIGNMENT)
+        self._view = memoryview(self._map)
+
+        # 途中で切れたファイルを開いたまま、範囲外を読まないように確認しておく
+        for entry in self.entries.values():
+            for variant in entry["variants"]:
+                end = self.data_start + variant["offset"] + variant["pitch"] * variant["size"][1]
+                if end > len(self._map):
+                    raise ValueError(f"アトラスが途中で切れています: {path}")
+
+    @classmethod
+    def open(cls, path):
+        """アトラスを開く（なければ、または壊れていればNone）"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except Exception as e:
+            print(f"アトラス読み込みエラー: {e}")
+            return None
+
+    def surface(self, variant):
+        """縮小画像1枚分のサーフェス（デコードもコピーもしない）"""
+        width, height = variant["size"]
+        pitch = variant["pitch"]
+        if pitch != width * 4:
+            # frombufferは行の詰め物を扱えない
+            raise ValueError(f"未対応のピッチです: {variant['name']}")
+        start = self.data_start + variant["offset"]
+        return pygame.image.frombuffer(self._view[start:start + pitch * height], (width, height), self.format)
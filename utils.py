@@ -1,56 +1,20 @@
 import pygame
 import os
 import glob
-from constants import WHITE, BLUE, YELLOW
+from constants import WHITE, BLUE, YELLOW, CARD_CATALOG_FILE
+from font_cache import font_cache, text_cache
+from asset_manager import assets
+from card_catalog import CardCatalog
 
 
 def get_japanese_font(size):
-    """日本語対応フォントを取得"""
-    # プロジェクト内のフォントを優先
-    project_font = os.path.join(os.path.dirname(__file__), "fonts", "NotoSansCJKjp-Regular.otf")
-    if os.path.exists(project_font):
-        try:
-            return pygame.font.Font(project_font, size)
-        except:
-            pass
-
-    # 試すフォントファイルのパス
-    font_paths = [
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
-        "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
-        "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
-    ]
-
-    for font_path in font_paths:
-        if os.path.exists(font_path):
-            try:
-                return pygame.font.Font(font_path, size)
-            except:
-                continue
-
-    # フォールバック: システムフォントを試す
-    font_names = [
-        "notosanscjkjp",
-        "notosansjp",
-        "takaopgothic",
-        "ipaexgothic",
-        "ipagothic",
-        "meiryo",
-        "msgothic",
-        "yugothic"
-    ]
-
-    for font_name in font_names:
-        try:
-            font = pygame.font.SysFont(font_name, size)
-            if font.get_height() > 0:
-                return font
-        except:
-            continue
-
-    # フォールバック: デフォルトフォント
-    return pygame.font.Font(None, size)
+    """日本語対応フォントを取得（フォントキャッシュ経由）"""
+    return font_cache.get(size)
+
+
+def render_text(font, text, color, antialias=True):
+    """変化しない文字列を描画（テキストキャッシュ経由）"""
+    return text_cache.render(font, text, color, antialias)
 
 
 def load_images_from_dir(images_dir, patterns, label="画像"):
@@ -73,6 +37,15 @@ def load_card_images():
     return load_images_from_dir("images", patterns, "カード画像")
 
 
+def load_card_catalog():
+    """images/ のカードカタログを開く（scrape_cards.py で作っていなければNone）"""
+    catalog = CardCatalog.open(os.path.join("images", CARD_CATALOG_FILE))
+    if catalog:
+        rarities = ", ".join(f"{rarity or '不明'} {count}" for rarity, count in sorted(catalog.rarities().items()))
+        print(f"カードカタログから {len(catalog)} 枚のカードを読み込みました（{rarities}）")
+    return catalog
+
+
 def load_pack_images():
     """pack_images/フォルダからパック画像を読み込む"""
     patterns = ['*.png', '*.jpg', '*.webp']
@@ -101,9 +74,7 @@ def create_dummy_pack_image(width, height):
 def load_and_scale_card_image(image_path, width, height):
     """カード画像を読み込んでリサイズする"""
     try:
-        image = pygame.image.load(image_path)
-        image = pygame.transform.scale(image, (width, height))
-        return image
+        return assets.load(image_path, (width, height))
     except Exception as e:
         print(f"画像読み込みエラー ({image_path}): {e}")
         return create_dummy_card_image_fallback(width, height)